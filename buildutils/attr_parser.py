@@ -38,6 +38,9 @@
     attr_parser.py will parse xml files also called master attribute files 
 containing all the members of both server and ecl files,and will generate 
 two corresponding files one for server and one for ecl 
+
+    Optionally (-p), a Python module fragment is also generated holding the
+attribute specs used by the pbs.v1 hook module to set up its classes.
 """
 import sys
 import os
@@ -50,6 +53,10 @@ import pdb
 
 list_ecl = []
 list_svr = []
+
+# Python class name for each object type having attribute specs generated
+PY_SPEC_OBJECTS = {'job': 'job', 'server': 'server', 'queue': 'queue',
+                   'node': 'vnode', 'resv': 'resv'}
 global e_flag
 global s_flag
 
@@ -846,6 +853,132 @@ def resc_attr(masterf, svrf, eclf):
     getText(eclf, svrf)
 
 
+def header_strings(incdir):
+    """
+    header_strings function - (returns the string value of every
+    '#define NAME "value"' macro in the headers of incdir, following
+    '#define NAME OTHER_NAME' aliases)
+    """
+    import glob
+
+    strs = {}
+    aliases = {}
+    for hdr in sorted(glob.glob(os.path.join(incdir, '*.h'))):
+        f = open(hdr)
+        for line in f:
+            m = re.match(r'\s*#\s*define\s+(\w+)\s+"([^"]*)"', line)
+            if m:
+                strs.setdefault(m.group(1), m.group(2))
+                continue
+            m = re.match(r'\s*#\s*define\s+(\w+)\s+(\w+)\s*$', line)
+            if m:
+                aliases.setdefault(m.group(1), m.group(2))
+        f.close()
+    for name, target in aliases.items():
+        while target in aliases and target not in strs:
+            target = aliases[target]
+        if target in strs:
+            strs.setdefault(name, strs[target])
+    return strs
+
+
+def member_value(node, tag):
+    """
+    member_value function - (returns the server side value of <Tag>, that is
+    its <both> or <SVR> sub tag if any, else its own text, None for an
+    ECL only <Tag>)
+    """
+    tags = node.getElementsByTagName(tag)
+    if not tags:
+        return None
+    subs = tags[0].getElementsByTagName('both') + \
+        tags[0].getElementsByTagName('SVR')
+    if subs:
+        return subs[0].childNodes[0].nodeValue.strip(' \t\n')
+    if tags[0].getElementsByTagName('ECL'):
+        return None
+    return tags[0].childNodes[0].nodeValue.strip(' \t\n')
+
+
+def py_value_type(at_type, decode, encode):
+    """
+    py_value_type function - (returns the key in pbs.v1 EXPORTED_TYPES_DICT
+    of the Python type of an attribute, mirroring
+    pbs_python_setup_attr_get_value_type() in Libpython)
+    """
+    # decode and encode may hold #ifdef'ed alternatives
+    encodes = re.findall(r'\w+', encode)
+    decodes = re.findall(r'\w+', decode)
+    if 'encode_time' in encodes:
+        return 'generic_time'
+    if at_type == 'ATR_TYPE_RESC' or \
+            (at_type == 'ATR_TYPE_ENTITY' and 'decode_entlim_res' in decodes):
+        return 'pbs_resource'
+    for case in switch(at_type):
+        if case('ATR_TYPE_SIZE'):
+            return 'size'
+        if case('ATR_TYPE_ACL'):
+            return 'generic_acl'
+        if case('ATR_TYPE_BOOL'):
+            return 'pbs_bool'
+        if case('ATR_TYPE_ARST'):
+            return 'pbs_list'
+        if case('ATR_TYPE_LONG', 'ATR_TYPE_SHORT', 'ATR_TYPE_CHAR'):
+            return 'pbs_int'
+        if case('ATR_TYPE_STR', 'ATR_TYPE_JINFOP'):
+            return 'pbs_str'
+        if case('ATR_TYPE_FLOAT'):
+            return 'pbs_float'
+        if case('ATR_TYPE_ENTITY'):
+            return 'pbs_entity'
+    return 'generic_type'
+
+
+def py_attr_specs(masterf, obj, pyf, incdir):
+    """
+    py_attr_specs function - (writes to pyf the <OBJ>_ATTR_SPECS tuple of
+    (name, type, default, ordinal, is_entity) records of the server side
+    attributes in masterf, ordinal being the attribute's index in the
+    generated C table)
+    """
+    from xml.dom import minidom
+
+    strs = header_strings(incdir)
+    doc = minidom.parse(masterf)
+    specs = []
+    for i in doc.getElementsByTagName('attributes'):
+        if i.getAttribute('flag') == 'ECL':
+            continue
+        name = member_value(i, 'member_name')
+        if name is None:
+            continue
+        if name.startswith('"'):
+            name = name.strip('"')
+        elif name in strs:
+            name = strs[name]
+        else:
+            sys.exit("member_name cannot be resolved! for Attribute -> " +
+                     name)
+        at_type = member_value(i, 'member_at_type')
+        vtype = py_value_type(at_type, member_value(i, 'member_at_decode'),
+                              member_value(i, 'member_at_encode'))
+        if vtype == 'pbs_resource':
+            # resource lists get a pbs_resource named after them
+            default = name
+            is_entity = int(at_type == 'ATR_TYPE_ENTITY')
+        else:
+            default = None
+            is_entity = 0
+        specs.append("    (%r, %r, %r, %d, %d),\n" %
+                     (str(name), vtype, default, len(specs), is_entity))
+
+    pyf.write("# Disclaimer: This is a machine generated file.\n")
+    pyf.write("# For modifying any attribute change corresponding XML file\n")
+    pyf.write("%s_ATTR_SPECS = (\n" % PY_SPEC_OBJECTS[obj].upper())
+    pyf.write("".join(specs))
+    pyf.write(")\n")
+
+
 def main(argv):
     """
     The Main Module starts here-
@@ -855,13 +988,20 @@ def main(argv):
     global ECL_FILE
     global MASTER_FILE
     global ATTRIBUTE_SCRIPT_ARG
+    global PY_FILE
+    global INCLUDE_DIR
+
+    PY_FILE = None
+    INCLUDE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               os.pardir, 'src', 'include')
 
     if len(sys.argv) == 2:
         usage()
         sys.exit(1)
     try:
         opts, args = getopt.getopt(
-            argv, "m:s:e:a:h", ["master=", "svr=", "ecl=", "attr=", "help"])
+            argv, "m:s:e:a:p:i:h", ["master=", "svr=", "ecl=", "attr=",
+                                    "python=", "include=", "help"])
     except getopt.error, err:
         print str(err)
         usage()
@@ -878,6 +1018,10 @@ def main(argv):
             ECL_FILE = arg
         elif opt in ("-a", "--attr"):
             ATTRIBUTE_SCRIPT_ARG = arg
+        elif opt in ("-p", "--python"):
+            PY_FILE = arg
+        elif opt in ("-i", "--include"):
+            INCLUDE_DIR = arg
         else:
             print "Invalid Option!"
             sys.exit(1)
@@ -935,12 +1079,26 @@ def main(argv):
     s_file.close()
     e_file.close()
 
+    if PY_FILE is not None:
+        if n not in PY_SPEC_OBJECTS:
+            print "No Python attribute specs for Object " + n
+            sys.exit(1)
+        try:
+            p_file = open(PY_FILE, 'w')
+        except IOError, err:
+            print str(err)
+            print 'Cannot Open Python File!'
+            sys.exit(1)
+        py_attr_specs(MASTER_FILE, n, p_file, INCLUDE_DIR)
+        p_file.close()
+
 
 def usage():
     """
     Usage (depicts the usage of the script)
     """
     print "usage: prog -m <MASTER_FILE> -s <svr_attr_file> -e <ecl_attr_file> -a <object>"
+    print "            [-p <python_specs_file> [-i <include_dir>]]"
 
 
 if __name__ == "__main__":
@@ -76,6 +76,15 @@
 #define PBS_PYTHON_V1_MODULE "pbs.v1"
 #endif
 
+/* The pbs.v1 module holding the memo tables of hook runs */
+#define PBS_PYTHON_V1_MODULE_BASE_TYPES	PBS_PYTHON_V1_MODULE "._base_types"
+
+/* The pbs.v1 module buffering the log messages of hooks */
+#define PBS_PYTHON_V1_MODULE_HOOK_LOG	PBS_PYTHON_V1_MODULE "._hook_log"
+
+/* The pbs.v1 module profiling hooks and counting their runs */
+#define PBS_PYTHON_V1_MODULE_HOOK_PROFILE	PBS_PYTHON_V1_MODULE "._hook_profile"
+
 /* this is the dictionary containing all the types for the embedded interp */
 #define   PBS_PYTHON_V1_TYPES_DICTIONARY   "EXPORTED_TYPES_DICT"
 
@@ -122,7 +122,8 @@ struct pbs_config pbs_conf = {
 	0,					/* default comm logevent mask */
 	4,					/* default number of threads */
 	NULL,					/* mom short name override */
-	0					/* high resolution timestamp logging */
+	0,					/* high resolution timestamp logging */
+	NULL					/* hooks to profile */
 #ifdef WIN32
 	,NULL					/* remote viewer launcher executable along with launch options */
 #endif
@@ -569,6 +570,10 @@ pbs_loadconf(int reload)
 				if (sscanf(conf_value, "%u", &uvalue) == 1)
 					pbs_conf.pbs_log_highres_timestamp = ((uvalue > 0) ? 1 : 0);
 			}
+			else if (!strcmp(conf_name, PBS_CONF_HOOK_PROFILE)) {
+				free(pbs_conf.pbs_hook_profile);
+				pbs_conf.pbs_hook_profile = strdup(conf_value);
+			}
 #ifdef WIN32
 			else if (!strcmp(conf_name, PBS_CONF_REMOTE_VIEWER)) {
 				free(pbs_conf.pbs_conf_remote_viewer);
@@ -800,6 +805,10 @@ pbs_loadconf(int reload)
 		if (sscanf(gvalue, "%u", &uvalue) == 1)
 			pbs_conf.pbs_log_highres_timestamp = ((uvalue > 0) ? 1 : 0);
 	}
+	if ((gvalue = getenv(PBS_CONF_HOOK_PROFILE)) != NULL) {
+		free(pbs_conf.pbs_hook_profile);
+		pbs_conf.pbs_hook_profile = strdup(gvalue);
+	}
 
 #ifdef WIN32
 	if ((gvalue = getenv(PBS_CONF_REMOTE_VIEWER)) != NULL) {
@@ -723,6 +723,63 @@ const char pbsv1mod_meth_logmsg_doc[] =
 	 (val == PBSEVENT_DEBUG4) || (val == PBSEVENT_FORCE) || \
 	 (val == PBSEVENT_ADMIN))
 
+/**
+ * @brief
+ *	Maps the 'loglevel' given to pbs.logmsg() to the 'eventtype' and
+ *	'severity' arguments of log_event().
+ *
+ * @param[in]	loglevel - pbs.LOG_DEBUG, pbs.EVENT_DEBUG4, etc...
+ * @param[out]	p_eventtype - the event type to log the message with
+ * @param[out]	p_severity - the syslog severity of the message
+ *
+ * @return int
+ * @retval 0	- success
+ * @retval -1	- 'loglevel' is not a valid severity or event type
+ */
+static int
+hook_log_event_args(int loglevel, int *p_eventtype, int *p_severity)
+{
+	int   severity = -1;
+	int   eventtype = -1;
+
+	if (!VALID_SEVERITY_VALUE(loglevel) &&
+		!VALID_EVENTTYPE_VALUE(loglevel))
+		return (-1);
+
+	if (VALID_SEVERITY_VALUE(loglevel)) {
+		if (loglevel == SEVERITY_LOG_DEBUG)
+			severity = LOG_DEBUG;
+		else if (loglevel == SEVERITY_LOG_ERR)
+			severity = LOG_ERR;
+		else if (loglevel == SEVERITY_LOG_WARNING)
+			severity = LOG_WARNING;
+	}
+	if (VALID_EVENTTYPE_VALUE(loglevel)) {
+		eventtype = loglevel;
+	}
+
+	/* This usually means what got passed are the old
+	 * loglevel values (pbs.LOG_DEBUG, pbs.LOG_ERROR, pbs.LOG_WARNING).
+	 * These values were actually the 'severity' values for syslog.
+	 * so we use the same default as before for 'eventtype' argument
+	 * to log_event().
+	 */
+	if (eventtype == -1) {
+		eventtype = (PBSEVENT_ADMIN | PBSEVENT_SYSTEM);
+	}
+	/* This means what got passed are the new log level values
+	 * (ex .pbs.EVENT_DEBUG4) which really maps to the 'eventtype'
+	 * argument to log_event(). So we'll use a default LOG_DEBUG
+	 * 'severity' value for syslog.
+	 */
+	if (severity == -1) {
+		severity = LOG_DEBUG;
+	}
+	*p_eventtype = eventtype;
+	*p_severity = severity;
+	return (0);
+}
+
 /**
  * @brief
  *	This is the wrapper function to the pbs.logmsg() call in the hook world.
@@ -769,48 +826,16 @@ pbsv1mod_meth_logmsg(PyObject *self, PyObject *args, PyObject *kwds)
 		return NULL;
 	}
 
-	if (!VALID_SEVERITY_VALUE(loglevel) &&
-		!VALID_EVENTTYPE_VALUE(loglevel)) {
+	if (hook_log_event_args(loglevel, &eventtype, &severity) != 0) {
 		PyErr_Format(PyExc_TypeError, "Invalid severity or eventtype value <%d>",
 			loglevel);
 		return NULL;
 	}
-	/* log the message */
-	if (VALID_SEVERITY_VALUE(loglevel)) {
-		if (loglevel == SEVERITY_LOG_DEBUG)
-			severity = LOG_DEBUG;
-		else if (loglevel == SEVERITY_LOG_ERR)
-			severity = LOG_ERR;
-		else if (loglevel == SEVERITY_LOG_WARNING)
-			severity = LOG_WARNING;
-	}
-	if (VALID_EVENTTYPE_VALUE(loglevel)) {
-		eventtype = loglevel;
-	}
-
-	/* This usually means what got passed are the old
-	 * loglevel values (pbs.LOG_DEBUG, pbs.LOG_ERROR, pbs.LOG_WARNING).
-	 * These values were actually the 'severity' values for syslog.
-	 * so we use the same default as before for 'eventtype' argument
-	 * to log_event().
-	 */
-	if (eventtype == -1) {
-		eventtype = (PBSEVENT_ADMIN | PBSEVENT_SYSTEM);
-	}
-	/* This means what got passed are the new log level values
-	 * (ex .pbs.EVENT_DEBUG4) which really maps to the 'eventtype'
-	 * argument to log_event(). So we'll use a default LOG_DEBUG
-	 * 'severity' value for syslog.
-	 */
-	if (severity == -1) {
-		severity = LOG_DEBUG;
-	}
 
 	log_event(eventtype, PBS_EVENTCLASS_HOOK,
 		severity, pbs_python_daemon_name, emsg);
 	Py_RETURN_NONE;
 }
-#undef  VALID_SEVERITY_VALUE
 
 /*
  * logjobmsg module method implementation and documentation
@@ -862,3 +887,102 @@ pbsv1mod_meth_logjobmsg(PyObject *self, PyObject *args, PyObject *kwds)
 
 	Py_RETURN_NONE;
 }
+
+/*
+ * get_log_event_mask module method implementation and documentation
+ *
+ */
+
+const char pbsv1mod_meth_get_log_event_mask_doc[] =
+"get_log_event_mask()\n\
+\n\
+  returns:\n\
+         the mask of the event types written to the log of the daemon\n\
+         running the hook.\n\
+";
+
+PyObject *
+pbsv1mod_meth_get_log_event_mask(void)
+{
+	return (PyInt_FromLong(*log_event_mask));
+}
+
+/*
+ * _log_records module method implementation and documentation
+ *
+ */
+
+const char pbsv1mod_meth_log_records_doc[] =
+"_log_records(listRecords)\n\
+  where:\n\
+\n\
+   listRecords:  list of (loglevel, jobid, message) tuples, logged as by\n\
+                 logjobmsg(jobid, message) if jobid is not None, else as\n\
+                 by logmsg(loglevel, message).\n\
+\n\
+  returns:\n\
+         None\n\
+";
+
+/**
+ * @brief
+ *	Writes the messages buffered by the pbs.logmsg() and pbs.logjobmsg()
+ *	wrappers of the pbs.v1 module in one call.
+ *
+ * @param[in]	self - parent object
+ * @param[in]	args - args[0] = list of (loglevel, jobid, message) tuples
+ *
+ * @return PyObject *
+ * @retval Py_None	- for success
+ * @retval NULL		- which causes an exception to the executing hook script.
+ */
+PyObject *
+pbsv1mod_meth_log_records(PyObject *self, PyObject *args, PyObject *kwds)
+{
+	static char *kwlist[] = {"records", NULL};
+
+	PyObject *py_records = NULL;
+	PyObject *py_rec;
+	Py_ssize_t i;
+	Py_ssize_t nrecs;
+	int   loglevel;
+	int   severity;
+	int   eventtype;
+	char *jobid;
+	char *msg;
+	int   msg_len;
+
+	if (!PyArg_ParseTupleAndKeywords(args, kwds,
+		"O!:_log_records",
+		kwlist,
+		&PyList_Type,
+		&py_records
+		)
+		) {
+		return NULL;
+	}
+
+	nrecs = PyList_Size(py_records);
+	for (i = 0; i < nrecs; i++) {
+		py_rec = PyList_GET_ITEM(py_records, i);	/* borrowed */
+		if (!PyArg_ParseTuple(py_rec, "izs#:_log_records",
+			&loglevel, &jobid, &msg, &msg_len))
+			return NULL;
+		if (jobid != NULL) {
+			log_event(PBSEVENT_JOB, PBS_EVENTCLASS_JOB,
+				LOG_DEBUG, jobid, msg);
+			continue;
+		}
+		if (hook_log_event_args(loglevel, &eventtype, &severity) != 0) {
+			PyErr_Format(PyExc_TypeError,
+				"Invalid severity or eventtype value <%d>",
+				loglevel);
+			return NULL;
+		}
+		log_event(eventtype, PBS_EVENTCLASS_HOOK,
+			severity, pbs_python_daemon_name, msg);
+	}
+
+	Py_RETURN_NONE;
+}
+#undef  VALID_SEVERITY_VALUE
@@ -78,6 +78,13 @@ extern PyObject * pbsv1mod_meth_logjobmsg(PyObject *self,
 	PyObject *args, PyObject *kwds
 	);
 
+extern char pbsv1mod_meth_log_records_doc[]; /* common_python_utils.c */
+extern PyObject * pbsv1mod_meth_log_records(PyObject *self,
+	PyObject *args, PyObject *kwds);
+
+extern char pbsv1mod_meth_get_log_event_mask_doc[]; /* common_python_utils.c */
+extern PyObject * pbsv1mod_meth_get_log_event_mask(void);
+
 /* pbs_python_svr_internal.c */
 extern char pbsv1mod_meth_get_queue_doc[];
 extern PyObject * pbsv1mod_meth_get_queue(PyObject *self,
@@ -475,6 +482,11 @@ static PyMethodDef pbs_v1_module_methods[] = {
 		METH_KEYWORDS, pbsv1mod_meth_logmsg_doc},
 	{PY_LOGJOBMSG_METHOD, (PyCFunction) pbsv1mod_meth_logjobmsg,
 		METH_KEYWORDS, pbsv1mod_meth_logjobmsg_doc},
+	{"_log_records", (PyCFunction) pbsv1mod_meth_log_records,
+		METH_KEYWORDS, pbsv1mod_meth_log_records_doc},
+	{"get_log_event_mask",
+		(PyCFunction) pbsv1mod_meth_get_log_event_mask,
+		METH_NOARGS, pbsv1mod_meth_get_log_event_mask_doc},
 	{PY_GET_PYTHON_DAEMON_NAME_METHOD,
 		(PyCFunction) pbsv1mod_meth_get_python_daemon_name,
 		METH_NOARGS, pbsv1mod_meth_get_python_daemon_name_doc},
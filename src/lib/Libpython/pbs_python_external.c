@@ -67,6 +67,42 @@ static struct _inittab pbs_python_inittab_modules[] = {
 	{NULL, NULL}                    /* sentinel */
 };
 
+/**
+ * @brief
+ *	Calls function 'func' of the pbs.v1 module 'module' around the run of
+ *	a hook script: the hook run modules end the log buffering of the hook
+ *	(see pbs.log_buffer_enable()), profile the hook when asked to (see
+ *	PBS_HOOK_PROFILE) and empty the memo tables of the run. Nothing is
+ *	done if 'module' was never loaded, and errors are logged rather than
+ *	passed on to the hook.
+ *
+ * @param[in]	module - name of the module
+ * @param[in]	func - name of the function
+ * @param[in]	arg - integer argument to 'func', or -1 to pass none
+ */
+static void
+pbs_python_hook_module_call(const char *module, char *func, int arg)
+{
+	PyObject *py_mod;	/* borrowed */
+	PyObject *py_ret;
+	char	 emsg[256];
+
+	py_mod = PyDict_GetItemString(PyImport_GetModuleDict(), module);
+	if (py_mod == NULL)
+		return;
+	if (arg == -1)
+		py_ret = PyObject_CallMethod(py_mod, func, NULL);
+	else
+		py_ret = PyObject_CallMethod(py_mod, func, "i", arg);
+	if (py_ret == NULL) {
+		snprintf(emsg, sizeof(emsg), "Failed to call %s.%s", module, func);
+		pbs_python_write_error_to_log(emsg);
+		PyErr_Clear();
+		return;
+	}
+	Py_DECREF(py_ret);
+}
+
 static PyObject *
 _pbs_python_compile_file(const char *file_name,
 	const char *compiled_code_file_name);
@@ -658,6 +694,7 @@ pbs_python_run_code_in_namespace(struct python_interpreter_data *interp_data,
 	PyObject *pobjStr;
 	char      *pStr;
 	int rc=0;
+	int errored;
 
 	if (!interp_data || !py_script) {
 		log_err(-1, func_id, "Either interp_data or py_script is NULL");
@@ -725,9 +762,22 @@ pbs_python_run_code_in_namespace(struct python_interpreter_data *interp_data,
 	py_script->global_dict = pdict;
 
 	PyErr_Clear(); /* clear any exceptions before starting code */
+	pbs_python_hook_module_call(PBS_PYTHON_V1_MODULE_HOOK_PROFILE,
+		"_hook_run_start", -1);
 	/* precompile strings of code to bytecode objects */
 	(void) PyEval_EvalCode((PyCodeObject *)py_script->py_code_obj,
 		pdict, pdict);
+	/* end the hook run in pbs.v1, without losing the script's exit status */
+	PyErr_Fetch(&ptype, &pvalue, &ptraceback);
+	errored = (ptype != NULL) &&
+		!PyErr_GivenExceptionMatches(ptype, PyExc_SystemExit);
+	pbs_python_hook_module_call(PBS_PYTHON_V1_MODULE_HOOK_PROFILE,
+		"_hook_run_end", errored);
+	pbs_python_hook_module_call(PBS_PYTHON_V1_MODULE_HOOK_LOG,
+		"_hook_run_end", -1);
+	pbs_python_hook_module_call(PBS_PYTHON_V1_MODULE_BASE_TYPES,
+		"_hook_run_end", -1);
+	PyErr_Restore(ptype, pvalue, ptraceback);
 	/* check for exception */
 	if (PyErr_Occurred()) {
 		if (PyErr_ExceptionMatches(PyExc_KeyboardInterrupt)) {
@@ -766,7 +766,11 @@ pbs_python_setup_vnode_class_attributes(void)
 		py_value_type = pbs_python_setup_attr_get_value_type(attr_def_p,
 			PY_TYPE_VNODE);
 		/* create a brand new default value from value type */
-		if (ATTR_IS_RESC(attr_def_p)) {
+		/* no default value needed if already set up from the specs */
+		/* of pbs.v1 (see _export_types.py) */
+		if (ATTR_IS_RESC(attr_def_p) &&
+			!PyObject_HasAttrString(py_pbs_vnode_klass,
+			attr_def_p->at_name)) {
 			py_default_args = Py_BuildValue("(s)", attr_def_p->at_name);
 			if (py_default_args == NULL) {
 				log_err(-1, attr_def_p->at_name, "could not build args for default value");
@@ -847,7 +851,11 @@ pbs_python_setup_resv_class_attributes(void)
 		py_value_type = pbs_python_setup_attr_get_value_type(attr_def_p,
 			PY_TYPE_RESV);
 		/* create a brand new default value from value type */
-		if (ATTR_IS_RESC(attr_def_p)) {
+		/* no default value needed if already set up from the specs */
+		/* of pbs.v1 (see _export_types.py) */
+		if (ATTR_IS_RESC(attr_def_p) &&
+			!PyObject_HasAttrString(py_pbs_resv_klass,
+			attr_def_p->at_name)) {
 			py_default_args = Py_BuildValue("(s)", attr_def_p->at_name);
 			if (!py_default_args) {
 				/* TODO, continuing instead of fatal error */
@@ -932,7 +940,11 @@ pbs_python_setup_server_class_attributes(void)
 		py_value_type = pbs_python_setup_attr_get_value_type(attr_def_p,
 			PY_TYPE_SERVER);
 		/* create a brand new default value from value type */
-		if (ATTR_IS_RESC(attr_def_p)) {
+		/* no default value needed if already set up from the specs */
+		/* of pbs.v1 (see _export_types.py) */
+		if (ATTR_IS_RESC(attr_def_p) &&
+			!PyObject_HasAttrString(py_pbs_svr_klass,
+			attr_def_p->at_name)) {
 			py_default_args = Py_BuildValue("(s)", attr_def_p->at_name);
 			if (!py_default_args) {
 				/* TODO, continuing instead of fatal error */
@@ -1017,7 +1029,11 @@ pbs_python_setup_job_class_attributes(void)
 		py_value_type = pbs_python_setup_attr_get_value_type(attr_def_p,
 			PY_TYPE_JOB);
 		/* create a brand new default value from value type */
-		if (ATTR_IS_RESC(attr_def_p)) {
+		/* no default value needed if already set up from the specs */
+		/* of pbs.v1 (see _export_types.py) */
+		if (ATTR_IS_RESC(attr_def_p) &&
+			!PyObject_HasAttrString(py_pbs_job_klass,
+			attr_def_p->at_name)) {
 			py_default_args = Py_BuildValue("(s)", attr_def_p->at_name);
 			if (!py_default_args) {
 				/* TODO, continuing instead of fatal error */
@@ -1103,7 +1119,11 @@ pbs_python_setup_queue_class_attributes(void)
 		py_value_type = pbs_python_setup_attr_get_value_type(attr_def_p,
 			PY_TYPE_QUEUE);
 		/* create a brand new default value from value type */
-		if (ATTR_IS_RESC(attr_def_p)) {
+		/* no default value needed if already set up from the specs */
+		/* of pbs.v1 (see _export_types.py) */
+		if (ATTR_IS_RESC(attr_def_p) &&
+			!PyObject_HasAttrString(py_pbs_que_klass,
+			attr_def_p->at_name)) {
 			py_default_args = Py_BuildValue("(s)", attr_def_p->at_name);
 			if (!py_default_args) {
 				/* TODO, continuing instead of fatal error */
@@ -2668,8 +2688,8 @@ pbs_python_populate_svrattrl_from_python_class(PyObject *py_instance,
 
 		if (py_attr_hookset_dict) {
 
-			py_attr_hookset_dict0=PyDict_GetItem(py_attr_hookset_dict,
-				py_instance);
+			/* the object's own dictionary of set attributes */
+			py_attr_hookset_dict0 = py_attr_hookset_dict;
 			if ((py_attr_hookset_dict0 != NULL) &&
 				!PyDict_Check(py_attr_hookset_dict0))
 				py_attr_hookset_dict0 = NULL; /* don't use */
@@ -2835,8 +2855,8 @@ pbs_python_populate_svrattrl_from_python_class(PyObject *py_instance,
 
 				if (py_resc_hookset_dict) {
 
-					py_resc_hookset_dict0 =
-						PyDict_GetItem(py_resc_hookset_dict, py_val);
+					/* the resource's own dictionary of set names */
+					py_resc_hookset_dict0 = py_resc_hookset_dict;
 
 					if ((py_resc_hookset_dict0 != NULL) &&
 						!PyDict_Check(py_resc_hookset_dict0))
@@ -3057,6 +3077,7 @@ pbs_python_populate_svrattrl_from_python_class(PyObject *py_instance,
 		Py_CLEAR(py_keys_dict);
 		Py_CLEAR(py_keys_dict2);
 		Py_CLEAR(py_resc_hookset_dict);
+		py_resc_hookset_dict0 = NULL;	/* borrowed from the above */
 		free(name_str_dup);
 		name_str_dup = NULL;
 
@@ -8444,9 +8465,8 @@ _pbs_python_event_job_getval_hookset(char *attrib_name, char *opval,
 		goto getval_exit;
 	}
 
-	/* here returns py_attr_hookset_dict[py_job] value - list py_job */
-	/* attributes set by hook. 					 */
-	py_attr_hookset_dict0=PyDict_GetItem(py_attr_hookset_dict, py_job);
+	/* py_job's own dictionary of attributes set by hook. */
+	py_attr_hookset_dict0 = py_attr_hookset_dict;
 
 	if ((py_attr_hookset_dict0 == NULL) ||
 		!PyDict_Check(py_attr_hookset_dict0)) {
@@ -9784,10 +9804,8 @@ _pbs_python_event_jobresc_getval_hookset(char *attr_name, char *resc_name)
 		goto jobresc_getval_hookset_exit;
 	}
 
-	/* Returns: (kind of convoluted but this is how got this to work:
-	 Ex. pbs.event().job.Resource_List[]._attributes_hook_set[<pbs.event().job.Resource_List[]'s instance>]
-	 */
-	py_attr_hookset_dict0=PyDict_GetItem(py_attr_hookset_dict, py_jobresc);
+	/* The dictionary is kept in the resource instance itself */
+	py_attr_hookset_dict0 = py_attr_hookset_dict;
 
 	if ((py_attr_hookset_dict0 == NULL) ||
 		!PyDict_Check(py_attr_hookset_dict0)) {
@@ -9795,9 +9813,7 @@ _pbs_python_event_jobresc_getval_hookset(char *attr_name, char *resc_name)
 		goto jobresc_getval_hookset_exit;
 	}
 
-	/* And this all boils down to (whew!):
-	 Ex. pbs.event().job.Resource_List[]._attributes_hook_set[<pbs.event().job.Resource_List[]'s instance>][<resc_name>] = <resc_val>
-	 */
+	/* Ex. pbs.event().job.Resource_List[]._attributes_hook_set[<resc_name>] */
 
 	if (PyDict_GetItemString(py_attr_hookset_dict0,
 		resc_name) != NULL) {
@@ -11646,7 +11662,7 @@ const char pbsv1mod_meth_get_pbs_conf_doc[] =
 PyObject *
 pbsv1mod_meth_get_pbs_conf(void)
 {
-	return (Py_BuildValue( "{s:s,s:s,s:s,s:s,s:s,s:s,s:s,s:s,s:s,s:s,s:s}",
+	return (Py_BuildValue( "{s:s,s:s,s:s,s:s,s:s,s:s,s:s,s:s,s:s,s:s,s:s,s:s}",
 		"PBS_HOME", pbs_conf.pbs_home_path?pbs_conf.pbs_home_path:"",
 		"PBS_EXEC", pbs_conf.pbs_exec_path?pbs_conf.pbs_exec_path:"",
 		"PBS_ENVIRONMENT", pbs_conf.pbs_environment?pbs_conf.pbs_environment:"",
@@ -11657,7 +11673,8 @@ pbsv1mod_meth_get_pbs_conf(void)
 		"PBS_SERVER", pbs_conf.pbs_server_name?pbs_conf.pbs_server_name:"",
 		"PBS_SERVER_HOST_NAME", pbs_conf.pbs_server_host_name?pbs_conf.pbs_server_host_name:"",
 		"PBS_PRIMARY", pbs_conf.pbs_primary?pbs_conf.pbs_primary:"",
-		"PBS_SECONDARY", pbs_conf.pbs_secondary?pbs_conf.pbs_secondary:""));
+		"PBS_SECONDARY", pbs_conf.pbs_secondary?pbs_conf.pbs_secondary:"",
+		"PBS_HOOK_PROFILE", pbs_conf.pbs_hook_profile?pbs_conf.pbs_hook_profile:""));
 }
 
 const char pbsv1mod_meth_load_resource_value_doc[] =
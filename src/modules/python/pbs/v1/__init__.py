@@ -47,6 +47,10 @@ from _pbs_v1 import *
 from _base_types import *
 from _exc_types import *
 from _svr_types import *
+from _hook_cache import *
+from _hook_store import *
+from _hook_log import *
+from _hook_profile import *
 
 #: this is Power Management Infrastructure which may not exist on all system types yet
 try:
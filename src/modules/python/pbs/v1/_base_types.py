@@ -57,6 +57,7 @@ __all__ = [ '_generic_attr',
             'pbs_float',
             'acl', 
             'select', 
+            'select_chunk',
             'place', 
             'exec_host', 
             'exec_vnode',
@@ -90,7 +91,10 @@ __all__ = [ '_generic_attr',
 	    'vchunk',
 	    'vnode_state',
 	    'vnode_sharing',
-	    'vnode_ntype'
+	    'vnode_ntype',
+            'value_cache_enable',
+            'value_cache_disable',
+            'value_cache_stats'
           ]
 
 import _pbs_v1
@@ -99,6 +103,147 @@ _size = _pbs_v1.svr_types._size
 _LOG  = _pbs_v1.logmsg
 _IS_SETTABLE = _pbs_v1.is_attrib_val_settable
 
+# memo tables that only live for the duration of a hook run, see _hook_memo()
+_hook_memo_event = None
+_hook_memo_tables = {}
+
+def _hook_memo(table):
+    """
+    Returns the dictionary named 'table' that can be used to memoize values
+    for the duration of the current hook run. All the tables are emptied
+    at the end of the run, or as soon as a different hook event is seen.
+    Outside of a hook run (e.g. in a pbs_python script), a new dictionary
+    is returned each time, so that nothing is memoized.
+    """
+    global _hook_memo_event
+
+    ev = _pbs_v1.event()
+    if ev is None:
+        return {}
+    if ev is not _hook_memo_event:
+        _hook_memo_event = ev
+        _hook_memo_tables.clear()
+    if table not in _hook_memo_tables:
+        _hook_memo_tables[table] = {}
+    return _hook_memo_tables[table]
+
+def _hook_run_end():
+    """
+    Called by PBS when a hook run ends, however it ends, to empty the memo
+    tables and drop the event of the run.
+    """
+    global _hook_memo_event
+
+    _hook_memo_event = None
+    _hook_memo_tables.clear()
+#: m(_hook_run_end)
+
+class _value_cache(object):
+    """
+    A bounded cache mapping (value type, raw string) to the value parsed
+    from the string. Once it holds more than 'maxsize' values, the least
+    recently used quarter of them is evicted.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._tick = 0
+        self._values = {}
+
+    def get(self, vtype, raw):
+        self._tick += 1
+        key = (vtype, raw)
+        entry = self._values.get(key)
+        if entry is not None:
+            self.hits += 1
+            entry[1] = self._tick
+            return entry[0]
+        self.misses += 1
+        v = vtype(raw)
+        self._values[key] = [v, self._tick]
+        if len(self._values) > self.maxsize:
+            self._evict()
+        return v
+
+    def _evict(self):
+        keep = self.maxsize * 3 // 4
+        by_use = sorted(self._values.items(), key=lambda kv: kv[1][1])
+        for (key, _) in by_use[:len(by_use) - keep]:
+            del self._values[key]
+
+#: the value cache, None unless enabled by value_cache_enable()
+_value_cache_obj = None
+
+def value_cache_enable(maxsize=4096):
+    """
+    Enables caching of the values parsed from strings by the immutable
+    types pbs.size, pbs.duration, pbs.pbs_int, pbs.pbs_float, pbs.pbs_str
+    and pbs.pbs_bool when attributes and resources are set, keeping at most
+    'maxsize' values. The cache lives as long as the interpreter, so it is
+    shared by the hooks run in the same daemon.
+    """
+    global _value_cache_obj
+    if maxsize <= 0:
+        raise ValueError("value cache size must be positive")
+    if _value_cache_obj is None:
+        _value_cache_obj = _value_cache(maxsize)
+    else:
+        _value_cache_obj.maxsize = maxsize
+#: m(value_cache_enable)
+
+def value_cache_disable():
+    """
+    Disables the value cache and drops the values it holds.
+    """
+    global _value_cache_obj
+    _value_cache_obj = None
+#: m(value_cache_disable)
+
+def value_cache_stats():
+    """
+    Returns a dictionary with the number of 'hits' and 'misses' of the
+    value cache, its 'hit_rate', current 'size' and 'maxsize', or None if
+    the cache is not enabled.
+    """
+    c = _value_cache_obj
+    if c is None:
+        return None
+    lookups = c.hits + c.misses
+    if lookups:
+        rate = float(c.hits) / lookups
+    else:
+        rate = 0.0
+    return {'hits': c.hits, 'misses': c.misses, 'hit_rate': rate,
+            'size': len(c._values), 'maxsize': c.maxsize}
+#: m(value_cache_stats)
+
+def _typed_value(vtype, value):
+    """
+    Returns 'value' converted to type 'vtype', through the value cache if
+    it is enabled and 'value' is a string to be parsed into an immutable
+    type.
+    """
+    c = _value_cache_obj
+    if (c is None) or (type(value) is not str) or \
+            (vtype not in _VALUE_CACHE_TYPES):
+        return vtype(value)
+    return c.get(vtype, value)
+
+def _mark_hook_set(obj, name):
+    """
+    Records that attribute 'name' of 'obj' has been set in a hook script.
+    The names are kept in a dictionary stored in the object itself, which
+    shadows the empty class level _attributes_hook_set, so that the C side
+    only looks at the attributes that changed in the objects it copies back.
+    """
+    d = obj.__dict__.get("_attributes_hook_set")
+    if d is None:
+        d = {}
+        obj.__dict__["_attributes_hook_set"] = d
+    d[name] = None
+
 class PbsAttributeDescriptor(object):
     """This class wraps evey PBS attribute into a *DATA* descriptor AND is
     maintained per instance instead of the default per class.
@@ -150,6 +295,38 @@ class PbsAttributeDescriptor(object):
         
     #: m(__init__)
 
+    @classmethod
+    def _set_from_specs(descr_cls, cls, specs, value_type_of):
+        """
+        Sets up in bulk the descriptors of class 'cls' from the attribute
+        'specs' generated by buildutils/attr_parser.py, that is a sequence
+        of (name, type key, default, ordinal, is_entity) records, the
+        ordinal is not used here.
+        'value_type_of(name, type key)' returns the attribute's value type.
+        Attributes already set up in 'cls' are left alone.
+        """
+        names = []
+        for (name, type_key, default, _, is_entity) in specs:
+            if hasattr(cls, name):
+                continue
+            value_type = value_type_of(name, type_key)
+            descr = object.__new__(descr_cls)
+            descr._name = name
+            if default is None:
+                descr._value = None
+            else:
+                descr._value = value_type(default)
+            descr._class_name = cls.__name__
+            descr._is_entity = is_entity
+            descr._is_resource = False
+            descr._resc_attribute = None
+            descr._value_type = (value_type,)
+            descr.__per_instance = {}
+            setattr(cls, name, descr)
+            names.append(name)
+        getattr(cls, _ATTRIBUTES_KEY_NAME).update(dict.fromkeys(names))
+    #: m(_set_from_specs)
+
     def __get__(self, obj, cls=None):
         """__get__ 
         """
@@ -202,7 +379,7 @@ class PbsAttributeDescriptor(object):
                 # an indirect resource
                 set_value = value
             else:
-                set_value = self._value_type[0](value)
+                set_value = _typed_value(self._value_type[0], value)
         #:
         self.__per_instance[obj] = set_value
     #: m(__set__)
@@ -589,19 +766,32 @@ def replace_char_not_before(str, chr, repl_substr, chr_after_list):
 	 str= \\ab\,c\\d\'\e\"\f\
 	rstr= \\ab\,c\\d\'\\e\"\\f\\
     """
-    i = 0
-    l = len(str)
-    end_index = l-1
-    s = ""
-    while i < l:
-        if (str[i] != chr) or \
-            ((i > 0) and (str[i-1] == chr) and (str[i] in chr_after_list)) or \
-            ((i < end_index) and (str[i+1] in chr_after_list)):	
-            s += str[i]
+    if chr not in str:
+        return str
+    # Work on the pieces between occurrences of 'chr' so the result is
+    # built with a single join: occurrence k sits between parts[k] and
+    # parts[k+1], an empty parts[k] (k > 0) means it directly follows
+    # another 'chr', and an empty parts[k+1] means it is directly
+    # followed by one (or ends 'str' if k is the last occurrence).
+    parts = str.split(chr)
+    last = len(parts) - 2
+    chr_after_chr = chr in chr_after_list
+    s = [parts[0]]
+    for k in range(last + 1):
+        nxt = parts[k+1]
+        if chr_after_chr and (k > 0) and (parts[k] == ""):
+            s.append(chr)
+        elif nxt != "":
+            if nxt[0] in chr_after_list:
+                s.append(chr)
+            else:
+                s.append(repl_substr)
+        elif (k < last) and chr_after_chr:
+            s.append(chr)
         else:
-            s += repl_substr
-        i = i+1
-    return s
+            s.append(repl_substr)
+        s.append(nxt)
+    return "".join(s)
 
 
 class pbs_env(dict):
@@ -692,11 +882,8 @@ class pbs_env(dict):
 
     def __str__(self):
         """String representation of the object"""
-        rv = ""
-        for k in self.keys():
-            if self[k] != None:
-                rv += "%s=%s," % (k, self[k])
-        return rv.rstrip(",")
+        return ",".join(["%s=%s" % (k, v) for (k, v) in self.items()
+                         if v != None]).rstrip(",")
     #: m(__str__)
 
 class email_list(_generic_attr):
@@ -889,11 +1076,59 @@ class select(_generic_attr):
 	s = s + "+5:scratch=10gb"  append to string
 	sel = pbs.select(s)  reset the value of sel
 
+    The chunks of the specification can be looked at without splitting
+    the string by hand:
+
+	sel.chunks returns a list of pbs.select_chunk objects, for instance
+	sel.chunks[1].count = 3
+	sel.chunks[1].resources = { 'ncpus' : 2, 'mem' : pbs.size('5gb') }
+	sel.total('ncpus') returns 8, and sel.totals() the totals of all the
+	numeric and size resources of the chunks, here
+	{ 'ncpus' : 8, 'mem' : pbs.size('25gb') }
+	pbs.select.from_chunks(chunks) builds back a pbs.select from a list
+	of (possibly modified) chunks.
+
     """
     _derived_types = (_generic_attr,)
     def __init__(self,value):
         _pbs_v1.validate_input("resc", "select", value)
         super(select,self).__init__(value)
+        self._chunks = None
+
+    def _get_chunks(self):
+        if self._chunks is None:
+            self._chunks = [select_chunk(count, rescs)
+                            for (count, rescs) in _parse_select(str(self))]
+        return self._chunks
+
+    chunks = property(_get_chunks)
+
+    def totals(self):
+        """
+        Returns a dictionary of the totals, over all the chunks and
+        accounting for the number of each chunk, of the resources with a
+        numeric or size value.
+        """
+        return dict(_select_totals(str(self)))
+    #: m(totals)
+
+    def total(self, rname):
+        """
+        Returns the total of resource 'rname' over all the chunks, or 0 if
+        no chunk requests it.
+        """
+        return _select_totals(str(self)).get(rname, 0)
+    #: m(total)
+
+    def from_chunks(chunks):
+        """
+        Returns the pbs.select made of the pbs.select_chunk objects in
+        'chunks'.
+        """
+        return select("+".join([str(c) for c in chunks]))
+    #: m(from_chunks)
+
+    from_chunks = staticmethod(from_chunks)
 
 class place(_generic_attr):
     """
@@ -1278,6 +1513,8 @@ class pbs_resource(object):
     
     __resources = PbsReadOnlyDescriptor('__resources', {})
     attributes = __resources
+    # shared empty default, shadowed by a per-object dictionary once a
+    # resource is set in a hook script (see _mark_hook_set())
     _attributes_hook_set = {}
     _attributes_unknown = {}
 
@@ -1412,16 +1649,14 @@ class pbs_resource(object):
         super(pbs_resource,self).__setattr__(name, value)
 
         # attributes that are set in python mode will be reflected in
-        # _attributes_hook_set dictionary.
-        # For example, 
-        # _attributes_hook_set[<pbs_resource object>]=['walltime', 'mem']
+        # this object's own _attributes_hook_set dictionary.
+        # For example,
+        # <pbs_resource object>._attributes_hook_set={'walltime':None,
+        #                                             'mem':None}
         # if 'walltime' or 'mem' has been assigned a value within the hook
         # script, or been unset.
         if _pbs_v1.in_python_mode():
-            if not self._attributes_hook_set.has_key(self):
-                self._attributes_hook_set[self] = {}
-            # using a dictionary value as easier to search for keys
-            self._attributes_hook_set[self].update({name : None})
+            _mark_hook_set(self, name)
     #: m(__setattr__)
 
     def keys(self):
@@ -1443,26 +1678,103 @@ class pbs_resource(object):
 pbs_resource._name = PbsAttributeDescriptor(pbs_resource, '_name',
                                            "<generic resource>", (str,))
 
+def _resc_typed_value(rname, rval):
+    """
+    Returns the value string 'rval' of resource 'rname' converted to the
+    resource's Python type. Converted values are memoized for the duration
+    of the hook run.
+    """
+    cache = _hook_memo("resc_typed_value")
+    key = (rname, rval)
+    if key not in cache:
+        descr = getattr(pbs_resource, rname)
+        cache[key] = _typed_value(descr._value_type[0], rval)
+    return cache[key]
+
+def _parse_vchunk(achunk):
+    """
+    Parses "<vnode>:<res1>=<val1>:...:<resN>=<valN>" into the compact record
+    (<vnode>, ((<res1>, <typed val1>), ..., (<resN>, <typed valN>))).
+    """
+    vnode_name = None
+    rescs = []
+    for c in achunk.split(":"):
+        rs = c.split("=", 1)
+        if len(rs) == 1:
+            vnode_name = c
+        else:
+            rescs.append((rs[0], _resc_typed_value(rs[0], rs[1])))
+    return (vnode_name, tuple(rescs))
+
+def _parse_exec_vnode(value):
+    """
+    Parses the exec_vnode string 'value' in a single pass, returning the
+    tuple (records, groups) where 'records' holds the _parse_vchunk()
+    record of each vnode chunk in order, and 'groups' holds, for each
+    parenthesized chunk (i.e. allocated from one host), the indices of
+    its records.
+    The result is memoized per 'value' for the duration of the hook run,
+    and 'value' is only validated the first time it is seen.
+    """
+    memo = _hook_memo("exec_vnode")
+    if value in memo:
+        return memo[value]
+
+    _pbs_v1.validate_input("job", "exec_vnode", value)
+    records = []
+    groups = []
+    grp = None
+    for v in value.split("+"):
+        if grp is None or v.startswith("("):
+            grp = []
+            groups.append(grp)
+        grp.append(len(records))
+        records.append(_parse_vchunk(v.strip("(").strip(")")))
+        if v.endswith(")"):
+            grp = None
+    result = (tuple(records), tuple([tuple(g) for g in groups]))
+    memo[value] = result
+    return result
+
 class vchunk(object):
     """
     This represents a resource chunk assigned to a job.
     Format: pbs.vchunk("<vnodeN>:<res1>=<val1>:<res2>=<val2>:...:<resN>=<valN>")
   	 where vnodeN is a name of a vnode.
+    The chunk_resources pbs_resource is only built when first accessed.
     """
-    def __init__(self, achunk):
+    def __init__(self, achunk, record=None):
         """__init__"""
 
-        ch = achunk.split(":")
-        self.chunk_resources = pbs_resource("Resource_List")
-        for c in ch:
-            if c.find("=") == -1:
-                self.vnode_name = c
-            else:
-                rs = c.split("=", 1)
-                descr = getattr(pbs_resource,rs[0])
-                self.chunk_resources[rs[0]] = descr._value_type[0](rs[1])
+        if record is None:
+            record = _parse_vchunk(achunk)
+        if record[0] is not None:
+            self.vnode_name = record[0]
+        self._record = record
+        self._chunk_resources = None
     #: m(__init__)
 
+    def _get_chunk_resources(self):
+        if self._chunk_resources is None:
+            r = pbs_resource("Resource_List")
+            for (rname, rval) in self._record[1]:
+                r[rname] = rval
+            self._chunk_resources = r
+        return self._chunk_resources
+
+    def _set_chunk_resources(self, value):
+        self._chunk_resources = value
+
+    chunk_resources = property(_get_chunk_resources, _set_chunk_resources)
+
+    def resources(self):
+        """
+        Returns the chunk's (resource name, typed value) pairs, without
+        building the chunk_resources object.
+        """
+        return self._record[1]
+    #: m(resources)
+
 class exec_vnode(_generic_attr):
     """
     Represents a PBS exec_vnodes
@@ -1479,14 +1791,145 @@ class exec_vnode(_generic_attr):
 	    ev.chunks[1].vnode_name = 'vnodeC'
 	    ev.chunks[1].vnode_resources = {  'mem' : pbs.size('Z') } 
 
+	    ev.groups returns the chunks grouped per parenthesized chunk, i.e.
+	    per host allocation:
+	    ev.groups = [ [ chunks[0] ], [ chunks[1], chunks[2] ] ]
+
+	    ev.vnode_chunks('vnodeB') returns the chunks assigned from vnodeB.
+
     """
     _derived_types = (_generic_attr,)
     def __init__(self,value):
-        _pbs_v1.validate_input("job", "exec_vnode", value)
+        (records, groups) = _parse_exec_vnode(value)
         super(exec_vnode,self).__init__(value)
-        self.chunks = list()
-        vals = value.split("+")
-        i = 0
-        for v in vals:
-            self.chunks.append(vchunk(v.strip("(").strip(")")))
+        self.chunks = [vchunk(None, r) for r in records]
+        self.groups = [[self.chunks[i] for i in g] for g in groups]
+        self._vnode_index = None
+
+    def vnode_chunks(self, vnode_name):
+        """
+        Returns the list of chunks assigned from vnode 'vnode_name'.
+        """
+        if self._vnode_index is None:
+            self._vnode_index = {}
+            for c in self.chunks:
+                self._vnode_index.setdefault(getattr(c, "vnode_name", None),
+                                             []).append(c)
+        return self._vnode_index.get(vnode_name, [])
+    #: m(vnode_chunks)
+
+def _split_unquoted(value, sep):
+    """
+    Splits 'value' on the 'sep' characters that are not inside a quoted
+    string.
+    """
+    if ('"' not in value) and ("'" not in value):
+        return value.split(sep)
+    parts = []
+    start = 0
+    quote = None
+    for i, ch in enumerate(value):
+        if quote is not None:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == sep:
+            parts.append(value[start:i])
+            start = i + 1
+    parts.append(value[start:])
+    return parts
+
+def _parse_select(value):
+    """
+    Parses the select string 'value' into a tuple holding, for each chunk,
+    the record (<count>, ((<res1>, <typed val1>), ..., (<resN>, <typed valN>))).
+    Values of resources unknown to the hook are kept as strings.
+    The result is memoized per 'value' for the duration of the hook run.
+    """
+    memo = _hook_memo("select")
+    if value in memo:
+        return memo[value]
+
+    chunks = []
+    for spec in _split_unquoted(value, "+"):
+        count = 1
+        rescs = []
+        for c in _split_unquoted(spec, ":"):
+            rs = c.split("=", 1)
+            if len(rs) == 1:
+                count = int(c)
+            elif hasattr(pbs_resource, rs[0]):
+                rescs.append((rs[0], _resc_typed_value(rs[0], rs[1])))
+            else:
+                rescs.append((rs[0], rs[1]))
+        chunks.append((count, tuple(rescs)))
+    result = tuple(chunks)
+    memo[value] = result
+    return result
+
+def _select_totals(value):
+    """
+    Returns the dictionary of the totals of the numeric and size resources
+    requested by the select string 'value', memoized per 'value' for the
+    duration of the hook run. Sizes are added up in kilobytes.
+    """
+    memo = _hook_memo("select_totals")
+    if value in memo:
+        return memo[value]
+
+    totals = {}
+    kbytes = {}
+    for (count, rescs) in _parse_select(value):
+        for (rname, rval) in rescs:
+            if isinstance(rval, _size):
+                kbytes[rname] = kbytes.get(rname, 0) + \
+                    count * size_to_kbytes(rval)
+            elif isinstance(rval, (int, long, float)) and \
+                    not isinstance(rval, bool):
+                totals[rname] = totals.get(rname, 0) + count * rval
+    for (rname, kb) in kbytes.items():
+        totals[rname] = size("%dkb" % kb)
+    memo[value] = totals
+    return totals
+
+class select_chunk(object):
+    """
+    This represents a chunk of a select specification.
+    Format: pbs.select_chunk(count, resources)
+	where 'count' is the number of such chunks requested and 'resources'
+	maps the names of the chunk's resources to their values, which can be
+	given as a dictionary or a list of (name, value) pairs.
+    Ex. c = pbs.select_chunk(2, [('ncpus', 1), ('mem', pbs.size('5gb'))])
+	str(c) returns '2:ncpus=1:mem=5gb'
+    """
+    def __init__(self, count=1, resources=()):
+        """__init__"""
+
+        self.count = int(count)
+        if isinstance(resources, dict):
+            self._names = sorted(resources.keys())
+        else:
+            self._names = [rname for (rname, rval) in resources]
+        self.resources = dict(resources)
+    #: m(__init__)
+
+    def __str__(self):
+        """String representation of the chunk, as found in a select"""
+        names = [n for n in self._names if n in self.resources]
+        if len(names) != len(self.resources):
+            names.extend(sorted([n for n in self.resources
+                                 if n not in self._names]))
+        return ":".join(["%d" % (self.count,)] +
+                        ["%s=%s" % (n, self.resources[n]) for n in names])
+    #: m(__str__)
+
+    __repr__ = __str__
+
+#: C(select_chunk)
+
+#: types whose values can be shared through the value cache, see _typed_value()
+_VALUE_CACHE_TYPES = frozenset([size, duration, pbs_int, pbs_float, pbs_str,
+                                pbs_bool])
+
 #: --------         EXPORTED TYPES DICTIONARY                      ---------
@@ -162,3 +162,42 @@ EXPORTED_TYPES_DICT = {
                       }
 
 
+
+#: The attribute specs generated at build time by buildutils/attr_parser.py
+#: let the job, server, queue, resv and vnode classes be set up in bulk here.
+#: The embedded interpreter then only has to set up the attributes that are
+#: not in the specs.
+try:
+    import _attr_specs
+except ImportError:
+    _attr_specs = None
+
+#: seconds taken to set up the classes from the specs, None if not done
+ATTR_SPECS_LOAD_SECS = None
+
+def _spec_value_type_of(py_type):
+    """
+    Returns the function mapping an attribute name and type key of a spec
+    to the attribute's value type, like pbs_python_setup_attr_get_value_type()
+    does for the C attribute tables.
+    """
+    def value_type_of(name, type_key):
+        # the vnode's Priority is an int, not the mapped pbs.priority
+        if (py_type != "vnode") or (name != "Priority"):
+            if name in EXPORTED_TYPES_DICT:
+                return EXPORTED_TYPES_DICT[name]
+        return EXPORTED_TYPES_DICT[type_key]
+    return value_type_of
+
+if _attr_specs is not None:
+    import time
+    _start = time.time()
+    for (_klass, _py_type, _specs) in (
+            (_queue, "queue", _attr_specs.QUEUE_ATTR_SPECS),
+            (_job, "job", _attr_specs.JOB_ATTR_SPECS),
+            (_server, "server", _attr_specs.SERVER_ATTR_SPECS),
+            (_resv, "resv", _attr_specs.RESV_ATTR_SPECS),
+            (_vnode, "vnode", _attr_specs.VNODE_ATTR_SPECS)):
+        pbs_types.PbsAttributeDescriptor._set_from_specs(_klass, _specs,
+                                              _spec_value_type_of(_py_type))
+    ATTR_SPECS_LOAD_SECS = time.time() - _start
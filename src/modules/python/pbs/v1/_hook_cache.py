@@ -0,0 +1,173 @@
+# coding: utf-8
+"""
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+"""
+__doc__ = """
+This module lets a hook keep its module namespace across the hook runs of
+the daemon it runs in, so that the module level code of the hook script
+(imports, helper and class definitions) is executed only once.
+
+A hook opts in by calling pbs.persistent_hook() right after 'import pbs',
+and doing all of its event processing in a handler function:
+
+    import pbs
+    pbs.persistent_hook()
+
+    import os
+    ...
+    def main(e):
+        ...
+        e.accept()
+
+The first run executes the whole script into a namespace kept by this
+module, then calls main(pbs.event()). The following runs only call main().
+The compiled code and the namespace are keyed by hook name and by a hash of
+the hook script content, so they are discarded as soon as a different
+script is imported (e.g. through qmgr).
+"""
+
+__all__ = ['persistent_hook']
+
+import _pbs_v1
+import os
+import sys
+import hashlib
+
+# hook name -> (stat key, content hash, code object)
+_code_cache = {}
+# hook name -> (content hash, namespace dictionary)
+_namespace_cache = {}
+# names of the hooks whose namespace is currently being set up
+_in_setup = {}
+
+def _hook_script_path(hook_name):
+    """
+    Returns the path to the script of hook 'hook_name' in the current
+    daemon's hooks directory, or None if not found.
+    """
+    pbs_home = _pbs_v1.get_pbs_conf().get('PBS_HOME', "")
+    if _pbs_v1.get_python_daemon_name() == "pbs_python":
+        priv = "mom_priv"
+    else:
+        priv = "server_priv"
+    path = os.path.join(pbs_home, priv, "hooks", hook_name + ".PY")
+    if not os.path.isfile(path):
+        return None
+    return path
+
+def _hook_code(hook_name, path):
+    """
+    Returns (content hash, code object) for the script 'path' of hook
+    'hook_name', compiling the script only when its content changed.
+    """
+    st = os.stat(path)
+    skey = (st.st_ino, st.st_size, st.st_mtime)
+    ent = _code_cache.get(hook_name)
+    if ent is not None and ent[0] == skey:
+        return ent[1:]
+
+    f = open(path, "rb")
+    try:
+        source = f.read()
+    finally:
+        f.close()
+    chash = hashlib.sha1(source).hexdigest()
+    if ent is not None and ent[1] == chash:
+        code = ent[2]
+    else:
+        code = compile(source, path, "exec")
+    _code_cache[hook_name] = (skey, chash, code)
+    return (chash, code)
+
+def _invalidate(hook_name):
+    """Discards the cached code and namespace of hook 'hook_name'."""
+    _code_cache.pop(hook_name, None)
+    _namespace_cache.pop(hook_name, None)
+
+def persistent_hook(handler="main"):
+    """
+    persistent_hook([handler])
+       Runs the calling hook out of a namespace kept across hook runs, by
+       calling the function named [handler] (default "main") of the hook
+       script with pbs.event() as argument, then terminating the hook
+       execution. The hook script is executed to set up the namespace on
+       the first run, or when its content has changed.
+
+       Under pbs_python (e.g. mom hooks), each hook run is a new process,
+       so this returns right away and the hook script runs as usual.
+    """
+    if _pbs_v1.get_python_daemon_name() == "pbs_python":
+        return
+    ev = _pbs_v1.event()
+    if ev is None:
+        return
+    hook_name = ev.hook_name
+    if hook_name in _in_setup:
+        # the hook script is being executed to set up its namespace
+        return
+    path = _hook_script_path(hook_name)
+    if path is None:
+        _invalidate(hook_name)
+        return
+
+    (chash, code) = _hook_code(hook_name, path)
+    ent = _namespace_cache.get(hook_name)
+    if ent is None or ent[0] != chash:
+        _namespace_cache.pop(hook_name, None)
+        caller = sys._getframe(1).f_globals
+        ns = {}
+        for k in ("__builtins__", "_pbs_v1"):
+            if k in caller:
+                ns[k] = caller[k]
+        _pbs_v1.logmsg(_pbs_v1.LOG_DEBUG,
+                       "%s: setting up persistent hook namespace" % \
+                                                            (hook_name,))
+        _in_setup[hook_name] = None
+        try:
+            exec code in ns
+        finally:
+            del _in_setup[hook_name]
+        if not callable(ns.get(handler)):
+            raise NameError("hook '%s' does not define a '%s' handler" % \
+                                                        (hook_name, handler))
+        _namespace_cache[hook_name] = (chash, ns)
+    else:
+        ns = ent[1]
+
+    ns[handler](ev)
+    # end the hook run here, the rest of the script is in the namespace
+    raise SystemExit("0")
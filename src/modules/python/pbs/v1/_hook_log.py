@@ -0,0 +1,256 @@
+# coding: utf-8
+"""
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+"""
+__doc__ = """
+This module wraps pbs.logmsg() and pbs.logjobmsg() so that a hook which
+logs a lot (hundreds of messages per event is not unusual for hooks
+managing cgroups) can buffer its messages and have them written in one go:
+
+    import pbs
+    pbs.log_buffer_enable()
+    ...
+    pbs.logmsg(pbs.EVENT_DEBUG4, "%s: limits %s", jobid, limits)
+
+Messages are checked against the event mask of the daemon when they are
+logged, so those that would not be written are dropped right away, and the
+optional arguments are only formatted into the message ('message % args')
+for the ones that are kept. This is true whether buffering is enabled or
+not.
+
+Buffered messages are written in the order they were logged when the hook
+calls pbs.event().accept() or pbs.event().reject(), when the hook run ends,
+when more than 'max_bytes' bytes of messages are pending, or when the
+oldest pending message was logged more than 'max_age' seconds ago. As PBS
+stamps a message with the time it is written, the latter bounds how far
+off the time stamps of buffered messages can be.
+
+Buffering only lasts for the hook run that enabled it.
+"""
+
+__all__ = ['logmsg', 'logjobmsg', 'log_buffer_enable', 'log_buffer_disable',
+           'log_flush', 'log_buffer_stats']
+
+import _pbs_v1
+import time
+
+_logmsg = _pbs_v1.logmsg
+_logjobmsg = _pbs_v1.logjobmsg
+
+# the pbs.LOG_* severities are logged with this event type
+_SEVERITY_EVENT = _pbs_v1.EVENT_ADMIN | _pbs_v1.EVENT_SYSTEM
+
+# loglevel -> event type that pbs.logmsg() logs the message with
+_LEVEL_EVENT = {
+    _pbs_v1.LOG_DEBUG: _SEVERITY_EVENT,
+    _pbs_v1.LOG_WARNING: _SEVERITY_EVENT,
+    _pbs_v1.LOG_ERROR: _SEVERITY_EVENT,
+}
+for _ev in (_pbs_v1.EVENT_ERROR, _pbs_v1.EVENT_SYSTEM, _pbs_v1.EVENT_ADMIN,
+            _pbs_v1.EVENT_JOB, _pbs_v1.EVENT_JOB_USAGE,
+            _pbs_v1.EVENT_SECURITY, _pbs_v1.EVENT_SCHED,
+            _pbs_v1.EVENT_DEBUG, _pbs_v1.EVENT_DEBUG2, _pbs_v1.EVENT_RESV,
+            _pbs_v1.EVENT_DEBUG3, _pbs_v1.EVENT_DEBUG4,
+            _pbs_v1.EVENT_FORCE):
+    _LEVEL_EVENT[_ev] = _ev
+del _ev
+
+class _log_buffer(object):
+    """
+    The messages logged since the last flush, as (loglevel, jobid, message)
+    tuples where jobid is None for the pbs.logmsg() ones and loglevel is 0
+    for the pbs.logjobmsg() ones.
+    """
+
+    def __init__(self, max_bytes, max_age):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.mask = _pbs_v1.get_log_event_mask()
+        self.records = []
+        self.nbytes = 0
+        self.since = None
+        self.logged = 0
+        self.dropped = 0
+        self.flushes = 0
+
+    def add(self, level, jobid, message):
+        if not self.records:
+            self.since = time.time()
+        self.records.append((level, jobid, message))
+        self.logged += 1
+        self.nbytes += len(message)
+        if (self.nbytes > self.max_bytes) or \
+           ((self.max_age is not None) and
+                (time.time() - self.since > self.max_age)):
+            self.flush()
+
+    def flush(self):
+        if self.records:
+            records = self.records
+            self.records = []
+            self.nbytes = 0
+            self.flushes += 1
+            _pbs_v1._log_records(records)
+#: C(_log_buffer)
+
+_buffer = None
+
+def _wanted(event_type, mask):
+    """
+    Returns True if a message of 'event_type' gets written with the event
+    'mask'.
+    """
+    return bool((event_type & _pbs_v1.EVENT_FORCE) or (event_type & mask))
+#: m(_wanted)
+
+def logmsg(loglevel, message, *args):
+    """
+    logmsg(loglevel, message[, args...])
+       Writes 'message' to the log of the daemon running the hook, where
+       'loglevel' is one of pbs.LOG_DEBUG, pbs.LOG_WARNING, pbs.LOG_ERROR or
+       one of the pbs.EVENT_* event types. If 'args' are given, the message
+       logged is 'message % args', formatted only if it gets logged.
+    """
+    buf = _buffer
+    if (buf is None) and not args:
+        return _logmsg(loglevel, message)
+
+    event_type = _LEVEL_EVENT.get(loglevel)
+    if event_type is None:
+        # let pbs.logmsg() complain about the log level
+        return _logmsg(loglevel, message)
+    if buf is None:
+        mask = _pbs_v1.get_log_event_mask()
+    else:
+        mask = buf.mask
+    if not _wanted(event_type, mask):
+        if buf is not None:
+            buf.dropped += 1
+        return
+    if args:
+        message = message % args
+    if (buf is None) or (type(message) is not str):
+        log_flush()
+        return _logmsg(loglevel, message)
+    buf.add(loglevel, None, message)
+#: m(logmsg)
+
+def logjobmsg(jobid, message, *args):
+    """
+    logjobmsg(jobid, message[, args...])
+       Writes 'message' to the log of the daemon running the hook, under the
+       class of messages related to job 'jobid'. If 'args' are given, the
+       message logged is 'message % args', formatted only if it gets logged.
+    """
+    buf = _buffer
+    if (buf is None) and not args:
+        return _logjobmsg(jobid, message)
+
+    if buf is None:
+        mask = _pbs_v1.get_log_event_mask()
+    else:
+        mask = buf.mask
+    if not _wanted(_pbs_v1.EVENT_JOB, mask):
+        if buf is not None:
+            buf.dropped += 1
+        return
+    if args:
+        message = message % args
+    if (buf is None) or (type(message) is not str) or \
+       (type(jobid) is not str) or not jobid:
+        log_flush()
+        return _logjobmsg(jobid, message)
+    buf.add(0, jobid, message)
+#: m(logjobmsg)
+
+def log_buffer_enable(max_bytes=65536, max_age=5):
+    """
+    Buffers the messages logged by pbs.logmsg() and pbs.logjobmsg() for the
+    rest of the hook run. The buffer is written once it holds more than
+    'max_bytes' bytes of messages, or once its oldest message is more than
+    'max_age' seconds old (None to only write it on size), and at the end
+    of the hook run.
+    """
+    global _buffer
+    if max_bytes < 0:
+        raise ValueError("max_bytes must not be negative")
+    if _buffer is None:
+        _buffer = _log_buffer(max_bytes, max_age)
+    else:
+        _buffer.max_bytes = max_bytes
+        _buffer.max_age = max_age
+#: m(log_buffer_enable)
+
+def log_buffer_disable():
+    """
+    Writes the buffered messages and stops buffering.
+    """
+    global _buffer
+    buf = _buffer
+    if buf is not None:
+        _buffer = None
+        buf.flush()
+#: m(log_buffer_disable)
+
+def log_flush():
+    """
+    Writes the buffered messages, if any.
+    """
+    if _buffer is not None:
+        _buffer.flush()
+#: m(log_flush)
+
+def log_buffer_stats():
+    """
+    Returns a dictionary with the number of messages 'logged' to and
+    'dropped' by the buffer, the number of 'flushes' and the number of
+    messages and bytes 'pending', or None if buffering is not enabled.
+    """
+    buf = _buffer
+    if buf is None:
+        return None
+    return {'logged': buf.logged, 'dropped': buf.dropped,
+            'flushes': buf.flushes, 'pending': len(buf.records),
+            'pending_bytes': buf.nbytes}
+#: m(log_buffer_stats)
+
+def _hook_run_end():
+    """
+    Called by PBS when a hook run ends, however it ends.
+    """
+    log_buffer_disable()
+#: m(_hook_run_end)
@@ -0,0 +1,303 @@
+# coding: utf-8
+"""
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+"""
+__doc__ = """
+This module counts the runs of hooks and, on request, profiles them, to
+find out which hook slows a daemon down before it hits its alarm.
+
+For each hook, the daemon running it keeps the number of its runs
+('invocations'), their total and longest wall time in seconds
+('total_wall_time', 'max_wall_time'), and how many of them accepted,
+rejected or failed with an error the event ('accepts', 'rejects',
+'errors'). pbs.hook_stats() returns those counters.
+
+So that tools can read them, the counters of each hook are also written, as
+"<counter>=<value>" lines, to PBS_HOME/server_priv/hooks/tmp/<hook>.stats
+(mom_priv for mom hooks). The server writes them every 20 runs of the hook
+and when it exits, pbs_python after every run. The counters written are
+added to those of the earlier runs found in the file, as under pbs_python,
+where each hook run is a new process, or after a restart of the daemon.
+pbs.hook_stats() does not count those earlier runs.
+
+Hooks are profiled when PBS_HOOK_PROFILE, in pbs.conf or the environment of
+the daemon, is "all" or a comma separated list of hook names holding their
+name. The cProfile statistics of all the runs of a profiled hook, earlier
+runs included, are then written after every run to <hook>.prof in the same
+directory as <hook>.stats, to be looked at with pstats:
+
+    import pstats
+    pstats.Stats("<hook>.prof").sort_stats("cumulative").print_stats(20)
+
+and the counters of a profiled hook are written after every run.
+"""
+
+__all__ = ['hook_stats']
+
+import _pbs_v1
+import os
+import time
+import atexit
+from _hook_store import _lock_file, _replace_file
+
+_COUNTERS = ('invocations', 'accepts', 'rejects', 'errors',
+             'total_wall_time', 'max_wall_time')
+
+# hook name -> counters of the hook, see hook_stats()
+_stats = {}
+# hook name -> cProfile.Profile of the profiled hook
+_profiles = {}
+# hook name -> pstats.Stats saved by earlier processes, for profiled hooks
+_saved_profiles = {}
+# hook name -> counters saved by earlier processes, or None, read on the
+# first save of the hook
+_saved_counters = {}
+# hook name -> number of runs of the hook not written to its .stats file
+_unsaved_runs = {}
+# the server writes the counters of a hook that is not profiled every
+# _SAVE_RUNS runs of the hook
+_SAVE_RUNS = 20
+# (PBS_HOOK_PROFILE value, set of hook names or None for all)
+_profile_conf = (None, frozenset())
+
+# the run in progress: [hook name, start time, rejected]
+_run = None
+
+def _profiled(hook_name):
+    """
+    Returns True if PBS_HOOK_PROFILE asks for 'hook_name' to be profiled.
+    """
+    global _profile_conf
+    value = _pbs_v1.get_pbs_conf().get('PBS_HOOK_PROFILE', "")
+    if value != _profile_conf[0]:
+        names = frozenset([n.strip() for n in value.split(",") if n.strip()])
+        if "all" in names:
+            names = None
+        _profile_conf = (value, names)
+    names = _profile_conf[1]
+    return (names is None) or (hook_name in names)
+#: m(_profiled)
+
+def _tmp_path(hook_name):
+    """
+    Returns the path, less its suffix, of the files of hook 'hook_name'.
+    """
+    pbs_home = _pbs_v1.get_pbs_conf().get('PBS_HOME', "")
+    if _pbs_v1.get_python_daemon_name() == "pbs_python":
+        priv = "mom_priv"
+    else:
+        priv = "server_priv"
+    return os.path.join(pbs_home, priv, "hooks", "tmp", hook_name)
+#: m(_tmp_path)
+
+def _read_counters(path):
+    """
+    Returns the counters in file 'path', or None if it cannot be read.
+    """
+    try:
+        f = open(path)
+    except IOError:
+        return None
+    counters = {}
+    try:
+        for line in f:
+            (name, sep, value) = line.strip().partition("=")
+            if name in _COUNTERS:
+                if name.endswith("_time"):
+                    counters[name] = float(value)
+                else:
+                    counters[name] = int(value)
+    finally:
+        f.close()
+    return counters
+#: m(_read_counters)
+
+def _write_file(path, write):
+    """
+    Has 'write' write the new content of file 'path' to an open file, then
+    renames the file into place.
+    """
+    tmp = "%s.%d" % (path, os.getpid())
+    f = open(tmp, "w")
+    try:
+        write(f)
+    finally:
+        f.close()
+    _replace_file(tmp, path)
+#: m(_write_file)
+
+def _save(hook_name, counters):
+    """
+    Writes the counters of hook 'hook_name', and its profile statistics if
+    it is profiled, added to those saved by earlier processes, which are
+    read the first time in a process. 'counters' is left as is.
+    """
+    path = _tmp_path(hook_name)
+    lock = open(path + ".lock", "a")
+    try:
+        _lock_file(lock)
+        if hook_name not in _saved_counters:
+            _saved_counters[hook_name] = _read_counters(path + ".stats")
+        totals = dict(counters)
+        old = _saved_counters[hook_name]
+        if old is not None:
+            for name in _COUNTERS:
+                if name == 'max_wall_time':
+                    totals[name] = max(totals[name], old.get(name, 0.0))
+                else:
+                    totals[name] += old.get(name, 0)
+
+        def write_counters(f):
+            for name in _COUNTERS:
+                f.write("%s=%r\n" % (name, totals[name]))
+        _write_file(path + ".stats", write_counters)
+        _unsaved_runs[hook_name] = 0
+
+        prof = _profiles.get(hook_name)
+        if prof is not None:
+            import pstats
+            if hook_name not in _saved_profiles:
+                try:
+                    _saved_profiles[hook_name] = pstats.Stats(path + ".prof")
+                except Exception:
+                    _saved_profiles[hook_name] = None
+            st = pstats.Stats(prof)
+            if _saved_profiles[hook_name] is not None:
+                st.add(_saved_profiles[hook_name])
+            st.dump_stats(path + ".prof")
+    finally:
+        lock.close()
+#: m(_save)
+
+def _hook_run_start():
+    """
+    Called by PBS before a hook script is run.
+    """
+    global _run
+    _run = None
+    try:
+        hook_name = _pbs_v1.event().hook_name
+    except Exception:
+        return
+    if not hook_name:
+        return
+    _run = [hook_name, time.time(), False]
+    if _profiled(hook_name):
+        prof = _profiles.get(hook_name)
+        if prof is None:
+            import cProfile
+            prof = _profiles[hook_name] = cProfile.Profile()
+        prof.enable()
+#: m(_hook_run_start)
+
+def _hook_rejected():
+    """
+    Called by pbs.event().reject() to count the run as a reject.
+    """
+    if _run is not None:
+        _run[2] = True
+#: m(_hook_rejected)
+
+def _hook_run_end(errored):
+    """
+    Called by PBS after a hook script is run, with 'errored' true if the
+    script ended with an error.
+    """
+    global _run
+    run = _run
+    if run is None:
+        return
+    _run = None
+    (hook_name, start, rejected) = run
+    prof = _profiles.get(hook_name)
+    if prof is not None:
+        prof.disable()
+    wall = time.time() - start
+
+    counters = _stats.get(hook_name)
+    if counters is None:
+        counters = _stats[hook_name] = dict.fromkeys(_COUNTERS, 0)
+        counters['total_wall_time'] = counters['max_wall_time'] = 0.0
+    counters['invocations'] += 1
+    counters['total_wall_time'] += wall
+    if wall > counters['max_wall_time']:
+        counters['max_wall_time'] = wall
+    if errored:
+        counters['errors'] += 1
+    elif rejected:
+        counters['rejects'] += 1
+    else:
+        counters['accepts'] += 1
+
+    _unsaved_runs[hook_name] = _unsaved_runs.get(hook_name, 0) + 1
+    if (prof is not None) or (_unsaved_runs[hook_name] >= _SAVE_RUNS) or \
+            (_pbs_v1.get_python_daemon_name() == "pbs_python"):
+        _save(hook_name, counters)
+#: m(_hook_run_end)
+
+def _save_unsaved():
+    """
+    Writes the counters of the hooks having runs not written yet, when the
+    interpreter exits.
+    """
+    for (hook_name, runs) in _unsaved_runs.items():
+        if runs > 0:
+            try:
+                _save(hook_name, _stats[hook_name])
+            except Exception:
+                pass
+#: m(_save_unsaved)
+
+atexit.register(_save_unsaved)
+
+def hook_stats(hook_name=None):
+    """
+    Returns the dictionary of the counters of the runs of hook 'hook_name'
+    seen by this daemon, or None if there were none. Without 'hook_name',
+    returns a dictionary of the counters of all the hooks run, by hook
+    name.
+    The counters are updated at the end of each run, and only cover the
+    runs of the current process: the <hook>.stats files also hold the
+    counters of the runs of earlier processes.
+    """
+    if hook_name is None:
+        return dict([(n, dict(c)) for (n, c) in _stats.items()])
+    c = _stats.get(hook_name)
+    if c is None:
+        return None
+    return dict(c)
+#: m(hook_stats)
@@ -0,0 +1,328 @@
+# coding: utf-8
+"""
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+"""
+__doc__ = """
+This module gives hooks a namespaced key/value store that persists across
+hook runs, so that periodic hooks can keep data they derived (node health,
+topology, license counts, ...) instead of recomputing it every interval:
+
+    import pbs
+    c = pbs.cache("health", max_entries=512, ttl=300)
+    state = c.get("node_state")
+    if state is None:
+        state = compute_node_state()
+        c.set("node_state", state)
+    runs = c.incr("runs")
+
+Entries expire after their time to live (in seconds, None for no expiry),
+and once a namespace holds more than max_entries entries, the least
+recently used ones are evicted.
+
+In the server, the store is kept in memory for the life of the daemon.
+Under pbs_python (e.g. mom hooks), where each hook run is a new process, the
+store is a file under PBS_HOME/mom_priv/hooks/tmp, updated under a lock so
+that concurrent hook processes can share it. Values must then be picklable,
+and an entry's use is tracked by its last update rather than its last read.
+A get() followed by a set() is not atomic across processes, update() and
+incr() are.
+"""
+
+__all__ = ['cache']
+
+import _pbs_v1
+import os
+import re
+import time
+import cPickle
+# the file backed store is locked with flock(), which only exists on Unix;
+# msvcrt.locking() is used on Windows instead
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# namespace -> {key: [expiry, last use, value]} for the in memory stores
+_stores = {}
+# store file path -> (stat key, entries) last read from that file
+_file_cache = {}
+
+_NAMESPACE_RE = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+def _store_path(namespace):
+    """
+    Returns the path of the file backing the store of 'namespace'.
+    """
+    pbs_home = _pbs_v1.get_pbs_conf().get('PBS_HOME', "")
+    if _pbs_v1.get_python_daemon_name() == "pbs_python":
+        priv = "mom_priv"
+    else:
+        priv = "server_priv"
+    return os.path.join(pbs_home, priv, "hooks", "tmp",
+                        "pbs_cache_" + namespace)
+
+def _lock_file(f):
+    """
+    Takes an exclusive lock on open file 'f', held until 'f' is closed.
+    """
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        # locks the first byte, retrying for 10 seconds before failing
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+def _replace_file(tmp, path):
+    """
+    Renames file 'tmp' to 'path', replacing 'path'.
+    """
+    if fcntl is None and os.path.exists(path):
+        # Windows cannot rename over an existing file
+        os.remove(path)
+    os.rename(tmp, path)
+
+def _read_file(path):
+    """
+    Returns the entries in store file 'path', reading the file only if it
+    changed since it was last read.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        _file_cache.pop(path, None)
+        return {}
+    skey = (st.st_ino, st.st_size, st.st_mtime)
+    ent = _file_cache.get(path)
+    if ent is not None and ent[0] == skey:
+        return ent[1]
+    try:
+        f = open(path, "rb")
+        try:
+            entries = cPickle.load(f)
+        finally:
+            f.close()
+    except Exception:
+        entries = {}
+    _file_cache[path] = (skey, entries)
+    return entries
+
+def _expired(entry, now):
+    return (entry[0] is not None) and (entry[0] <= now)
+
+def _evict(entries, max_entries, now):
+    """
+    Drops the expired entries, then the least recently used ones, until
+    'entries' holds at most 'max_entries' entries.
+    """
+    for key in [k for (k, e) in entries.items() if _expired(e, now)]:
+        del entries[key]
+    extra = len(entries) - max_entries
+    if extra > 0:
+        by_use = sorted(entries.items(), key=lambda kv: kv[1][1])
+        for (key, _) in by_use[:extra]:
+            del entries[key]
+
+class cache(object):
+    """
+    cache(namespace[, max_entries[, ttl[, shared]]])
+       A key/value store named 'namespace' persisting across hook runs.
+       'max_entries' bounds the number of entries (default 1024), 'ttl' is
+       the default time to live of the entries in seconds (default None,
+       no expiry). 'shared' selects the file backed store, which is the
+       default under pbs_python.
+    """
+
+    def __init__(self, namespace, max_entries=1024, ttl=None, shared=None):
+        if not _NAMESPACE_RE.match(str(namespace)):
+            raise ValueError("invalid cache namespace '%s'" % (namespace,))
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        if shared is None:
+            shared = (_pbs_v1.get_python_daemon_name() == "pbs_python")
+        if shared:
+            self._path = _store_path(namespace)
+        else:
+            self._path = None
+    #: m(__init__)
+
+    def _entries(self):
+        if self._path is not None:
+            return _read_file(self._path)
+        return _stores.setdefault(self.namespace, {})
+
+    def _update(self, func):
+        """
+        Applies 'func' to the entries of the store and saves them. The file
+        backed store is re-read and rewritten under an exclusive lock, the
+        new content being renamed into place so readers need no lock.
+        """
+        if self._path is None:
+            entries = _stores.setdefault(self.namespace, {})
+            func(entries)
+            _evict(entries, self.max_entries, time.time())
+            return
+        lockf = open(self._path + ".lock", "a")
+        try:
+            _lock_file(lockf)
+            entries = dict(_read_file(self._path))
+            func(entries)
+            _evict(entries, self.max_entries, time.time())
+            tmp = "%s.%d" % (self._path, os.getpid())
+            f = open(tmp, "wb")
+            try:
+                cPickle.dump(entries, f, 2)
+            finally:
+                f.close()
+            _replace_file(tmp, self._path)
+            _file_cache.pop(self._path, None)
+        finally:
+            lockf.close()
+    #: m(_update)
+
+    def get(self, key, default=None):
+        """
+        Returns the value of 'key', or 'default' if it is not set or has
+        expired.
+        """
+        now = time.time()
+        entry = self._entries().get(key)
+        if entry is None or _expired(entry, now):
+            return default
+        if self._path is None:
+            entry[1] = now
+        return entry[2]
+    #: m(get)
+
+    def set(self, key, value, ttl=None):
+        """
+        Sets 'key' to 'value' for 'ttl' seconds (default: the store's ttl).
+        """
+        if ttl is None:
+            ttl = self.ttl
+        now = time.time()
+        if ttl is None:
+            expiry = None
+        else:
+            expiry = now + ttl
+
+        def do_set(entries):
+            entries[key] = [expiry, now, value]
+        self._update(do_set)
+    #: m(set)
+
+    def get_or_set(self, key, func, ttl=None):
+        """
+        Returns the value of 'key', first setting it to the result of
+        calling 'func' if it is not set or has expired.
+        """
+        marker = []
+        value = self.get(key, marker)
+        if value is marker:
+            value = func()
+            self.set(key, value, ttl)
+        return value
+    #: m(get_or_set)
+
+    def update(self, key, func, default=None, ttl=None):
+        """
+        Sets 'key' to the result of calling 'func' with its value, or with
+        'default' if it is not set or has expired, and returns the new
+        value. The value is read and written under the store's lock, so
+        that concurrent hook processes do not lose each other's updates.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        result = []
+
+        def do_update(entries):
+            now = time.time()
+            entry = entries.get(key)
+            if entry is None or _expired(entry, now):
+                value = func(default)
+            else:
+                value = func(entry[2])
+            if ttl is None:
+                expiry = None
+            else:
+                expiry = now + ttl
+            entries[key] = [expiry, now, value]
+            result.append(value)
+        self._update(do_update)
+        return result[0]
+    #: m(update)
+
+    def incr(self, key, delta=1, ttl=None):
+        """
+        Adds 'delta' to the value of 'key', taken as 0 if it is not set or
+        has expired, and returns the new value, atomically as update().
+        """
+        return self.update(key, lambda value: value + delta, 0, ttl)
+    #: m(incr)
+
+    def delete(self, key):
+        """
+        Removes 'key' from the store.
+        """
+        self._update(lambda entries: entries.pop(key, None))
+    #: m(delete)
+
+    def clear(self):
+        """
+        Removes all the entries of the store.
+        """
+        self._update(lambda entries: entries.clear())
+    #: m(clear)
+
+    def keys(self):
+        """
+        Returns the keys of the entries that have not expired.
+        """
+        now = time.time()
+        return [k for (k, e) in self._entries().items()
+                if not _expired(e, now)]
+    #: m(keys)
+
+    def __contains__(self, key):
+        marker = []
+        return self.get(key, marker) is not marker
+    #: m(__contains__)
+
+#: C(cache)
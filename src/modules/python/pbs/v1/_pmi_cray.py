@@ -46,42 +46,61 @@ import os
 import stat
 import time
 import random
+from itertools import groupby
 from subprocess import Popen, PIPE
 from pbs.v1._pmi_types import BackendError
 import pbs
 from pbs.v1._pmi_utils import _running_excl, _pbs_conf, _get_vnode_names, \
-    _svr_vnode
+    _svr_vnodes
 
 pbsexec = _pbs_conf("PBS_EXEC")
 if pbsexec is None:
     raise BackendError("PBS_EXEC not found")
 
 
-def launch(jid, args):
+# Maximum number of nids sent in one capmc request by launch_nids(), the
+# number of capmc requests run at once, and the seconds each one may take.
+CAPMC_MAX_NIDS = 1000
+CAPMC_CONCURRENCY = 4
+CAPMC_TIMEOUT = 120
+
+
+def capmc_cmd():
     """
-    Run capmc and return the structured output.
+    Return the capmc command to run.  The full path given by Cray is
+    used if it exists, otherwise capmc is looked up in PATH (which is
+    also how a stand-in capmc script can be used for testing).
+    """
+    cmd = os.path.join(os.path.sep, 'opt', 'cray',
+                       'capmc', 'default', 'bin', 'capmc')
+    if not os.path.exists(cmd):
+        cmd = "capmc"		# should be in PATH then
+    return cmd
+
+
+def _capmc_result(jid, cmd, exitval, cmd_out, cmd_err):
+    """
+    Check the outcome of a capmc run and return the structured output.
 
     :param jid: job id
     :type jid: str
-    :param args: arguments for capmc command
-    :type args: str
+    :param cmd: the capmc command line that was run
+    :type cmd: str
+    :param exitval: exit value of capmc, None if it timed out
+    :type exitval: int or None
+    :param cmd_out: capmc standard output
+    :type cmd_out: str
+    :param cmd_err: capmc standard error
+    :type cmd_err: str
     :returns: capmc output in json format.
+    :raises BackendError: if capmc failed.
     """
     import json
 
-    # full path to capmc given by Cray
-    cmd = os.path.join(os.path.sep, 'opt', 'cray',
-                       'capmc', 'default', 'bin', 'capmc')
-    if not os.path.exists(cmd):
-        cmd = "capmc"		# should be in PATH then
-    cmd = cmd + " " + args
     fail = ""
-
-    pbs.logjobmsg(jid, "launch: " + cmd)
-    cmd_run = Popen(cmd, shell=True, stdout=PIPE, stderr=PIPE)
-    (cmd_out, cmd_err) = cmd_run.communicate()
-    exitval = cmd_run.returncode
-    if exitval != 0:
+    if exitval is None:
+        fail = "%s: timed out after %ds" % (cmd, CAPMC_TIMEOUT)
+    elif exitval != 0:
         fail = "%s: exit %d" % (cmd, exitval)
     else:
         pbs.logjobmsg(jid, "launch: finished")
@@ -108,6 +127,115 @@ def launch(jid, args):
     return out
 
 
+def launch(jid, args):
+    """
+    Run capmc and return the structured output.
+
+    :param jid: job id
+    :type jid: str
+    :param args: arguments for capmc command
+    :type args: str
+    :returns: capmc output in json format.
+    """
+    cmd = capmc_cmd() + " " + args
+
+    pbs.logjobmsg(jid, "launch: " + cmd)
+    cmd_run = Popen(cmd, shell=True, stdout=PIPE, stderr=PIPE)
+    (cmd_out, cmd_err) = cmd_run.communicate()
+    return _capmc_result(jid, cmd, cmd_run.returncode, cmd_out, cmd_err)
+
+
+def _merge_output(outs):
+    """
+    Merge the structured outputs of capmc requests run on parts of a nid
+    set: lists are concatenated, counts are added up, and any other value
+    is taken from the first output having it.
+
+    :param outs: list of capmc outputs in json format.
+    :type outs: list
+    :returns: merged capmc output.
+    """
+    merged = dict()
+    for out in outs:
+        if out is None:
+            continue
+        for key, val in out.items():
+            if key not in merged:
+                if isinstance(val, list):
+                    merged[key] = list(val)
+                else:
+                    merged[key] = val
+            elif isinstance(val, list):
+                merged[key].extend(val)
+            elif key.endswith("_count") and isinstance(val, int):
+                merged[key] += val
+    return merged
+
+
+def launch_nids(jid, args, nidset):
+    """
+    Run 'capmc <args> --nids <nids>' for the nids in nidset, splitting
+    them in requests of at most CAPMC_MAX_NIDS nids, at most
+    CAPMC_CONCURRENCY of which run at a time, each one being killed after
+    CAPMC_TIMEOUT seconds.  Return the merged structured output.
+
+    :param jid: job id
+    :type jid: str
+    :param args: arguments for capmc command, without --nids
+    :type args: str
+    :param nidset: nid set
+    :type nidset: set
+    :returns: merged capmc output in json format.
+    :raises BackendError: if any of the capmc requests failed.
+    """
+    import tempfile
+
+    nids = sorted(nidset)
+    pending = []
+    for i in range(0, len(nids), CAPMC_MAX_NIDS):
+        part, _ = nidlist(None, nids[i:i + CAPMC_MAX_NIDS])
+        pending.append("%s %s --nids %s" % (capmc_cmd(), args, part))
+    pending.reverse()
+
+    results = []
+    running = []
+    while pending or running:
+        while pending and len(running) < CAPMC_CONCURRENCY:
+            cmd = pending.pop()
+            pbs.logjobmsg(jid, "launch: " + cmd)
+            out = tempfile.TemporaryFile()
+            err = tempfile.TemporaryFile()
+            proc = Popen(cmd, shell=True, stdout=out, stderr=err)
+            running.append((cmd, proc, out, err, time.time() + CAPMC_TIMEOUT))
+        for entry in list(running):
+            (cmd, proc, out, err, deadline) = entry
+            exitval = proc.poll()
+            if exitval is None:
+                if time.time() < deadline:
+                    continue
+                proc.kill()
+                proc.wait()
+            running.remove(entry)
+            out.seek(0)
+            err.seek(0)
+            results.append((cmd, exitval, out.read(), err.read()))
+            out.close()
+            err.close()
+        if running:
+            time.sleep(0.05)
+
+    outs = []
+    fail = None
+    for (cmd, exitval, cmd_out, cmd_err) in results:
+        try:
+            outs.append(_capmc_result(jid, cmd, exitval, cmd_out, cmd_err))
+        except BackendError, e:
+            fail = e
+    if fail is not None:
+        raise fail
+    return _merge_output(outs)
+
+
 def jobnids(job):
     """
     Return the set of nids belonging to a job.
@@ -116,15 +244,7 @@ def jobnids(job):
     :type job: str
     :returns: set of nids from node's resources_available[craynid].
     """
-    nidset = set()
-    craynid = "PBScraynid"
-    for vname in _get_vnode_names(job):
-        vnode = _svr_vnode(vname)
-        try:
-            nidset.add(int(vnode.resources_available[craynid]))
-        except Exception:
-            pass
-    return nidset
+    return nodenids(_get_vnode_names(job))
 
 
 def nodenids(hosts):
@@ -137,8 +257,7 @@ def nodenids(hosts):
     """
     nidset = set()
     craynid = "PBScraynid"
-    for vnames in hosts:
-        vnode = _svr_vnode(vnames)
+    for vnode in _svr_vnodes(hosts).values():
         try:
             nidset.add(int(vnode.resources_available[craynid]))
         except Exception:
@@ -161,26 +280,13 @@ def nidlist(job=None, nidset=None):
     if nidset is None:
         nidset = jobnids(job)
     nids = []
-    first = ""
-    last = ""
-    prev = 0
-    for nid in sorted(nidset):
-        val = nid
-        if len(first) == 0:		# start point
-            first = str(nid)
-        elif prev + 1 != val:
-            if prev == int(first):
-                nids.append(first)
-            else:
-                nids.append(first + "-" + last)
-            first = str(nid)
-        prev = val
-        last = str(nid)
-    if len(first) > 0:
-        if prev == int(first):
-            nids.append(first)
+    # consecutive nids have the same difference to their sorted index
+    for _, run in groupby(enumerate(sorted(nidset)), lambda (i, n): n - i):
+        run = list(run)
+        if len(run) == 1:
+            nids.append(str(run[0][1]))
         else:
-            nids.append(first + "-" + last)
+            nids.append("%d-%d" % (run[0][1], run[-1][1]))
     return ",".join(nids), len(nidset)
 
 
@@ -220,61 +326,57 @@ def rur_file(job):
     return spool_file("%s.rur" % job.id)
 
 
-def node_energy(jid, nids, cnt):
+def node_energy(jid, nidset):
     """
     Return the result of running capmc get_node_energy_counter.
     The magic number of 15 seconds in the past is used because that
     is the most current value that can be expected from capmc.
+    Nids missing from the reply are queried once more on their own.
 
     :param jid: job id.
     :type jid: str
-    :param nids: nid list
-    :type nids: str
-    :param cnt: node count
-    :type cnt: int
+    :param nidset: nid set
+    :type nidset: set
     :returns: ret on successfull energy usage capmc query.
               None on failure.
     """
-    if cnt == 0:
+    if len(nidset) == 0:
         return None
-    cmd = "get_node_energy_counter --nids %s" % nids
-    ret = launch(jid, cmd)
-    cntkey = "nid_count"
-    gotcnt = "<notset>"
-    if (ret is not None) and (cntkey in ret):
-        gotcnt = ret[cntkey]
-        if gotcnt == cnt:
-            return ret
-
-    pbs.logjobmsg(jid, "node count %s, should be %d" % (str(gotcnt), cnt))
-    ret = launch(jid, cmd)
-    gotcnt = "<notset>"
-    if (ret is not None) and (cntkey in ret):
-        gotcnt = ret[cntkey]
-        if gotcnt == cnt:
-            return ret
-
-    pbs.logjobmsg(jid, "second query failed, node count %s, should be %d" %
-                  (str(gotcnt), cnt))
+    cmd = "get_node_energy_counter"
+    ret = launch_nids(jid, cmd, nidset)
+    missing = set(nidset)
+    for node in ret.get("nodes", []):
+        missing.discard(node["nid"])
+    if len(missing) == 0:
+        return ret
+
+    pbs.logjobmsg(jid, "node count %d, should be %d" %
+                  (len(nidset) - len(missing), len(nidset)))
+    ret = _merge_output([ret, launch_nids(jid, cmd, missing)])
+    for node in ret.get("nodes", []):
+        missing.discard(node["nid"])
+    if len(missing) == 0:
+        return ret
+
+    pbs.logjobmsg(jid, "second query failed, node count %d, should be %d" %
+                  (len(nidset) - len(missing), len(nidset)))
     return None
 
 
-def job_energy(job, nids, cnt):
+def job_energy(job, nidset):
     """
     Return energy counter from capmc.  Return None if no energy
     value is available.
 
     :param job: pbs job.
     :type job: str
-    :param nids: nid list
-    :type nids: str
-    :param cnt: node count
-    :type cnt: int
+    :param nidset: nid set
+    :type nidset: set
     :returns: ret on successfull energy usage capmc query.
               None on failure.
     """
     energy = None
-    ret = node_energy(job.id, nids, cnt)
+    ret = node_energy(job.id, nidset)
     if ret is not None and "nodes" in ret:
         energy = 0
         for node in ret["nodes"]:
@@ -283,6 +385,33 @@ def job_energy(job, nids, cnt):
     return energy
 
 
+def _sleep_state_steps(out, ramp_up=False):
+    """
+    Turn the output of get_sleep_state_limit_capabilities into the list
+    of steps needed to ramp the nids.  Each step maps a sleep state limit
+    to the set of nids it is set on, so that the nth limit of every nid
+    is set in the nth step.
+
+    :param out: capmc output in json format.
+    :type out: dict
+    :param ramp_up: walk the states of each nid in reverse order
+    :type ramp_up: bool
+    :returns: list of dictionaries mapping a limit to a nid set.
+    """
+    steps = []
+    for n in out.get("nids", []):
+        if "data" in n:
+            states = n["data"]["PWR_Attrs"][0]["PWR_AttrValueCapabilities"]
+            if ramp_up:
+                states = reversed(states)
+            states = [s for s in states if int(s) != 0]
+            for i, s in enumerate(states):
+                if i == len(steps):
+                    steps.append(dict())
+                steps[i].setdefault(str(s), set()).add(n["nid"])
+    return steps
+
+
 class Pmi:
 
     ninfo = None
@@ -330,8 +459,7 @@ class Pmi:
                     nidset = jobnids(j)
                     allnids.update(nidset)
                     Pmi.nidarray[jobid] = nidset
-                nids, cnt = nidlist(None, allnids)
-                Pmi.ninfo = node_energy("all", nids, cnt)
+                Pmi.ninfo = node_energy("all", allnids)
             nidset = Pmi.nidarray[job.id]
             energy = None
             if Pmi.ninfo is not None and "nodes" in Pmi.ninfo:
@@ -342,8 +470,7 @@ class Pmi:
                 pbs.logjobmsg(job.id, "Cray: get_usage: energy %dJ" %
                               energy)
         else:
-            nids, cnt = nidlist(job)
-            energy = job_energy(job, nids, cnt)
+            energy = job_energy(job, jobnids(job))
         if energy is not None:
             return float(energy - start) / 3600000.0
         else:
@@ -357,12 +484,13 @@ class Pmi:
         pbs.logmsg(pbs.LOG_DEBUG, "Cray: %s activate '%s'" %
                    (job.id, str(profile_name)))
 
-        nids, cnt = nidlist(job)
+        nidset = jobnids(job)
+        nids, cnt = nidlist(None, nidset)
         if cnt == 0:
             pbs.logjobmsg(job.id, "Cray: no compute nodes for power setting")
             return False
 
-        energy = job_energy(job, nids, cnt)
+        energy = job_energy(job, nidset)
         if energy is not None:
             f = open(energy_file(job), "w")
             f.write(str(energy))
@@ -492,67 +620,43 @@ class Pmi:
     def _pmi_power_off(self, hosts):
         pbs.logmsg(pbs.LOG_DEBUG, "Cray: powering-off the node")
         nidset = nodenids(hosts)
-        nids, _ = nidlist(None, nidset)
-        cmd = "node_off --nids " + nids
         func = "pmi_power_off"
-        launch(func, cmd)
+        launch_nids(func, "node_off", nidset)
         return True
 
     def _pmi_power_on(self, hosts):
         pbs.logmsg(pbs.LOG_DEBUG, "Cray: powering-on the node")
         nidset = nodenids(hosts)
-        nids, _ = nidlist(None, nidset)
-        cmd = "node_on --nids " + nids
         func = "pmi_power_on"
-        launch(func, cmd)
+        launch_nids(func, "node_on", nidset)
         return True
 
-    def _pmi_ramp_down(self, hosts):
-        pbs.logmsg(pbs.LOG_DEBUG, "Cray: ramping down the node")
+    def _pmi_ramp(self, func, hosts, ramp_up):
         nidset = nodenids(hosts)
-        nids, _ = nidlist(None, nidset)
-        cmd = "get_sleep_state_limit_capabilities --nids " + nids
-        func = "pmi_ramp_down"
-        out = launch(func, cmd)
-        for n in out["nids"]:
-            if "data" in n:
-                nid = n["nid"]
-                states = n["data"]["PWR_Attrs"][0]["PWR_AttrValueCapabilities"]
-                for s in states:
-                    if int(s) != 0:
-                        cmd = "set_sleep_state_limit --nids " + str(nid) + " --limit " + str(s)
-                        launch(func, cmd)
-                        sleep_time = random.randint(1, 10)
-                        time.sleep(sleep_time)
+        cmd = "get_sleep_state_limit_capabilities"
+        out = launch_nids(func, cmd, nidset)
+        for step in _sleep_state_steps(out, ramp_up):
+            for limit, nids in step.items():
+                cmd = "set_sleep_state_limit --limit " + limit
+                launch_nids(func, cmd, nids)
+            sleep_time = random.randint(1, 10)
+            time.sleep(sleep_time)
         return True
 
+    def _pmi_ramp_down(self, hosts):
+        pbs.logmsg(pbs.LOG_DEBUG, "Cray: ramping down the node")
+        return self._pmi_ramp("pmi_ramp_down", hosts, False)
+
     def _pmi_ramp_up(self, hosts):
         pbs.logmsg(pbs.LOG_DEBUG, "Cray: ramping up the node")
-        nidset = nodenids(hosts)
-        nids, _ = nidlist(None, nidset)
-        cmd = "get_sleep_state_limit_capabilities --nids " + nids
-        func = "pmi_ramp_up"
-        out = launch(func, cmd)
-        for n in out["nids"]:
-            if "data" in n:
-                nid = n["nid"]
-                states = n["data"]["PWR_Attrs"][0]["PWR_AttrValueCapabilities"]
-                for s in reversed(states):
-                    if int(s) != 0:
-                        cmd = "set_sleep_state_limit --nids " + str(nid) + " --limit " + str(s)
-                        launch(func, cmd)
-                        sleep_time = random.randint(1, 10)
-                        time.sleep(sleep_time)
-        return True
+        return self._pmi_ramp("pmi_ramp_up", hosts, True)
 
     def _pmi_power_status(self, hosts):
         # Do a capmc node_status and return a list of ready nodes.
         pbs.logmsg(pbs.EVENT_DEBUG3, "Cray: status of the nodes")
         nidset = nodenids(hosts)
-        nids, _ = nidlist(nidset=nidset)
-        cmd = "node_status --nids " + nids
         func = "pmi_power_status"
-        out = launch(func, cmd)
+        out = launch_nids(func, "node_status", nidset)
         ready = []
         nodeset = set()
         if 'ready' in out:
@@ -560,8 +664,9 @@ class Pmi:
         else:
             return nodeset
         craynid = "PBScraynid"
+        vnodes = _svr_vnodes(hosts)
         for vnames in hosts:
-            vnode = _svr_vnode(vnames)
+            vnode = vnodes[vnames]
             if craynid in vnode.resources_available:
                 nid = int(vnode.resources_available[craynid])
                 if nid in ready:
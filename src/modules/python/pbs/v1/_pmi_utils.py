@@ -44,6 +44,7 @@ Utility power functions.
 import pbs
 import os
 import sys
+import time
 
 
 def _pbs_conf(confvar):
@@ -139,22 +140,45 @@ def _get_vnode_names(job):
     return vnodes
 
 
+# Seconds a vnode obtained from the server is reused by _svr_vnodes().
+_VNODE_CACHE_TTL = 30
+
+# The vnode attributes the power functions need.
+_VNODE_ATTRIBS = ["resources_available.PBScraynid", "jobs"]
+
+# vnode name -> (time fetched, vnode object), see _svr_vnodes()
+pmi_pbsvnodes = dict()
+
+
+def _svr_vnodes(names):
+    # Return a dictionary of the vnode objects obtained from the server
+    # for the given vnode names.  Only the vnodes not fetched within the
+    # last _VNODE_CACHE_TTL seconds are requested, with only the
+    # attributes in _VNODE_ATTRIBS, in a single iteration.
+    now = time.time()
+    vnodes = dict()
+    missing = []
+    for name in set(names):
+        ent = pmi_pbsvnodes.get(name)
+        if ent is not None and now - ent[0] < _VNODE_CACHE_TTL:
+            vnodes[name] = ent[1]
+        else:
+            missing.append(name)
+    if missing:
+        for vn in pbs.server().vnodes(vnode=missing, attribs=_VNODE_ATTRIBS):
+            pmi_pbsvnodes[vn.name] = (now, vn)
+            vnodes[vn.name] = vn
+    return vnodes
+
+
 def _svr_vnode(name):
     # Return a vnode object obtained from the server by name.
-    # Save the values in a global dictionary for future use.
-    global pmi_pbsconf
-    if "pmi_pbsvnodes" not in globals():
-        global pmi_pbsvnodes
-        pmi_pbsvnodes = dict()
-        for vn in pbs.server().vnodes():
-            pmi_pbsvnodes[vn.name] = vn
-    return pmi_pbsvnodes[name]
+    return _svr_vnodes([name])[name]
 
 
 def _running_excl(job):
     # Look for any other job that is running on a job's vnodes
-    for vname in _get_vnode_names(job):
-        vnode = _svr_vnode(vname)
+    for vnode in _svr_vnodes(_get_vnode_names(job)).values():
         for j in str(vnode.jobs).split(', '):
             id = j.partition('/')[0]
             if job.id != id:
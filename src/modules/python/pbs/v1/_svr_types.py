@@ -44,7 +44,7 @@ This module captures all the python types representing the PBS Server objects
 (server,queue,job,resv, etc.)
 """
 from _base_types import (PbsAttributeDescriptor, PbsReadOnlyDescriptor,
-                         pbs_resource, pbs_bool, _LOG,
+                         pbs_resource, pbs_bool, _LOG, _mark_hook_set,
                          )
 import _pbs_v1
 from _pbs_v1 import (_event_accept, _event_reject,
@@ -52,6 +52,8 @@ from _pbs_v1 import (_event_accept, _event_reject,
                     iter_nextfunc)
 
 from _exc_types import *
+from _hook_log import log_flush
+from _hook_profile import _hook_rejected
 
 NAS_mod = 0
 
@@ -253,6 +255,8 @@ class _job(object):
     """
 
     attributes = PbsReadOnlyDescriptor('attributes', {})
+    # shared empty default, shadowed by a per-object dictionary once an
+    # attribute is set in a hook script (see _mark_hook_set())
     _attributes_hook_set = {}
 
     def __new__(cls,value,connect_server=None):
@@ -286,23 +290,19 @@ class _job(object):
         elif ((name != "_rerun") and (name != "_delete") and \
               (name != "_checkpointed") and (name != "_msmom") and \
               (name != "_stdout_file") and (name != "_stderr_file") and \
-                                 not _job.attributes.has_key(name)):
+                                 name not in _job.attributes):
             raise UnsetAttributeNameError("job attribute '%s' not found" % (name,))
 
         super(_job,self).__setattr__(name, value)
 
         # attributes that are set in python mode will be reflected in
-        # _attributes_hook_set dictionary.
+        # this object's own _attributes_hook_set dictionary.
         # For example,
-        # _attributes_hook_set[<job object>]=['Priority', 'comment']
+        # <job object>._attributes_hook_set={'Priority':None, 'comment':None}
         # if 'comment' or 'Priority' has been assigned a value within the hook
         # script, or been unset.
-
         if _pbs_v1.in_python_mode():
-            if not self._attributes_hook_set.has_key(self):
-                self._attributes_hook_set[self] = {}
-            # using a dictionary value as easier to search for keys
-            self._attributes_hook_set[self].update({name : None})
+            _mark_hook_set(self, name)
         
     #: m(__setattr__)        
 
@@ -351,6 +351,8 @@ class _vnode(object):
     """
 
     attributes = PbsReadOnlyDescriptor('attributes', {})
+    # shared empty default, shadowed by a per-object dictionary once an
+    # attribute is set in a hook script (see _mark_hook_set())
     _attributes_hook_set = {}
 
     def __new__(cls,value,connect_server=None):
@@ -375,22 +377,18 @@ class _vnode(object):
             if _pbs_v1.in_python_mode() and \
                                 hasattr(self, "_readonly") and not value:
                  raise BadAttributeValueError("_readonly can only be set to True!")
-        elif not _vnode.attributes.has_key(name):
+        elif name not in _vnode.attributes:
             raise UnsetAttributeNameError("vnode attribute '%s' not found" % (name,))
         super(_vnode,self).__setattr__(name, value)
 
         # attributes that are set in python mode will be reflected in
-        # _attributes_hook_set dictionary.
+        # this object's own _attributes_hook_set dictionary.
         # For example,
-        # _attributes_hook_set[<vnode object>]=['Priority', 'comment']
+        # <vnode object>._attributes_hook_set={'Priority':None, 'comment':None}
         # if 'comment' or 'Priority' has been assigned a value within the hook
         # script, or been unset.
-
         if _pbs_v1.in_python_mode() and (name != "_connect_server"):
-            if not self._attributes_hook_set.has_key(self):
-                self._attributes_hook_set[self] = {}
-            # using a dictionary value as easier to search for keys
-            self._attributes_hook_set[self].update({name : None})
+            _mark_hook_set(self, name)
             _pbs_v1.mark_vnode_set(self.name, name, str(value))        
         
     #: m(__seattr__)        
@@ -412,6 +410,8 @@ class _resv(object):
     """
     
     attributes = PbsReadOnlyDescriptor('attributes', {})
+    # shared empty default, shadowed by a per-object dictionary once an
+    # attribute is set in a hook script (see _mark_hook_set())
     _attributes_hook_set = {}
     attributes_readonly = PbsReadOnlyDescriptor('attributes_readonly',
                         [])
@@ -438,7 +438,7 @@ class _resv(object):
             if _pbs_v1.in_python_mode() and \
                                     hasattr(self, "_readonly") and not value:
                  raise BadAttributeValueError("_readonly can only be set to True!")
-        elif not _resv.attributes.has_key(name):
+        elif name not in _resv.attributes:
             raise UnsetAttributeNameError("resv attribute '%s' not found" % (name,))
         elif name in _resv.attributes_readonly and \
                                 _pbs_v1.in_python_mode() and \
@@ -448,17 +448,14 @@ class _resv(object):
         super(_resv,self).__setattr__(name, value)
 
         # attributes that are set in python mode will be reflected in
-        # _attributes_hook_set dictionary.
+        # this object's own _attributes_hook_set dictionary.
         # For example,
-        # _attributes_hook_set[<resv object>]=['reserve_start', 'reserve_end']
+        # <resv object>._attributes_hook_set={'reserve_start':None,
+        #                                    'reserve_end':None}
         # if 'reserve_start' or 'reserve_end' has been assigned a value within
         # the hook script, or been unset.
-
         if _pbs_v1.in_python_mode():
-            if not self._attributes_hook_set.has_key(self):
-                self._attributes_hook_set[self] = {}
-            # using a dictionary value as easier to search for keys
-            self._attributes_hook_set[self].update({name : None})
+            _mark_hook_set(self, name)
     #: m(__setattr__)
     
 #: C(resv)
@@ -660,20 +657,47 @@ class _server(object):
             return pbs_iter("jobs", "",  qname, self._connect_server, ignore_fin, username)
         #: m(jobs_nas)
     else:
-        def jobs(self):
+        def jobs(self, attribs=None, state=None, queue=None, owner=None,
+                 vnode=None, page_size=None):
             """
             Returns an iterator that loops over the list of jobs on this server.
+            Jobs can be filtered by:
+            - state: string of job state letters (e.g. "QH")
+            - queue: returns jobs from that queue
+            - owner: returns jobs owned by that user
+            - vnode: returns jobs assigned that vnode
+            'attribs' restricts the attributes populated on the jobs, and
+            'page_size' bounds the number of jobs held at once.
+            See pbs_stream_iter.
             """
 
-            return pbs_iter("jobs", "",  "", self._connect_server)
+            if (attribs is None) and (state is None) and (queue is None) \
+                    and (owner is None) and (vnode is None) \
+                    and (page_size is None):
+                return pbs_iter("jobs", "",  "", self._connect_server)
+            return pbs_stream_iter("jobs", attribs,
+                                   {"state": state, "queue": queue,
+                                    "owner": owner, "vnode": vnode},
+                                   page_size, self._connect_server)
         #: m(jobs)
 
-    def vnodes(self):
+    def vnodes(self, attribs=None, state=None, vnode=None, page_size=None):
         """
             Returns an iterator that loops over the list of vnodes on this server.
+            Vnodes can be filtered by:
+            - state: vnode state value or string (e.g. "offline")
+            - vnode: a vnode name or list of vnode names
+            'attribs' restricts the attributes populated on the vnodes, and
+            'page_size' bounds the number of vnodes held at once.
+            See pbs_stream_iter.
         """
 
-        return pbs_iter("vnodes", "",  "", self._connect_server)
+        if (attribs is None) and (state is None) and (vnode is None) \
+                                            and (page_size is None):
+            return pbs_iter("vnodes", "",  "", self._connect_server)
+        return pbs_stream_iter("vnodes", attribs,
+                               {"state": state, "vnode": vnode},
+                               page_size, self._connect_server)
     #: m(vnodes)
 
     def queues(self):
@@ -776,6 +800,7 @@ class _event(object):
 
            This terminates hook execution by throwing a SystemExit exception.
         """
+        log_flush()
         _event_accept()
         _event_param_mod_disallow()
         raise SystemExit, str(ecode)
@@ -793,6 +818,8 @@ class _event(object):
         
            This terminates hook execution by throwing a SystemExit exception.
         """
+        log_flush()
+        _hook_rejected()
         _event_reject(emsg)
         _event_param_mod_disallow()
         raise SystemExit, str(ecode)
@@ -835,6 +862,58 @@ _event.freq = PbsAttributeDescriptor(_event, 'freq', None, (int,))
 #                       PBS Iterator Type
 #:-------------------------------------------------------------------------
 
+def _load_attribs(obj, a, obj_type, header_str, server_data_fp):
+    """
+    Sets on 'obj', of iterator type 'obj_type' (e.g. "jobs", "vnodes"), the
+    values in the attrl list 'a' returned by a pbs_stat*() call. Values of
+    an attribute or resource given more than once are joined with commas.
+    Each value set is also written to 'server_data_fp', if not None, under
+    'header_str'.
+    """
+    while a:
+        n = a.name
+        r = a.resource
+        v = a.value
+
+        if obj_type == "vnodes":
+            if n == ATTR_NODE_state:
+                v = _pbs_v1.str_to_vnode_state(v)
+            elif n == ATTR_NODE_ntype:
+                v = _pbs_v1.str_to_vnode_ntype(v)
+            elif n == ATTR_NODE_Sharing:
+                v = _pbs_v1.str_to_vnode_sharing(v)
+        elif obj_type == "jobs":
+            if n == ATTR_inter or n == ATTR_block or n == ATTR_X11_port:
+                v = int(pbs_bool(v))
+
+        if r:
+            pr = getattr(obj, n)
+            # if resource list does not exist, then set it
+            if pr == None:
+                setattr(obj, n)
+            pr = getattr(obj, n)
+            if pr == None:
+                _pbs_v1.logmsg(_pbs_v1.LOG_DEBUG,
+                               "pbs_statobj: missing %s" % (n))
+                a = a.next
+                continue
+            vo = getattr(pr, r)
+            if vo != None:
+                # append value:
+                # example: "select=1:ncpus=1,ncpus=1,nodect=1,place=pack"
+                v = ",".join([vo, v])
+            setattr(pr, r, v)
+            if server_data_fp:
+                server_data_fp.write("%s.%s[%s]=%s\n" % (header_str, n, r, v))
+        else:
+            vo = getattr(obj, n)
+            if vo != None:
+                v = ",".join([vo, v])
+            setattr(obj, n, v)
+            if server_data_fp:
+                server_data_fp.write("%s.%s=%s\n" % (header_str, n, v))
+        a = a.next
+
 class pbs_iter(object):
     """
     This represents an iterator for looping over a list of PBS objects.
@@ -1047,67 +1126,9 @@ class pbs_iter(object):
 			_pbs_v1.set_python_mode()
 			raise StopIteration
 
-		    a=b.attribs
-
-		    while(a):
-			n=a.name
-			r=a.resource
-			v=a.value
-
-			if( self.type == "vnodes" ): 
-			    if( n == ATTR_NODE_state ):         
-				v=_pbs_v1.str_to_vnode_state(v)         
-			    elif( n == ATTR_NODE_ntype ): 
-				v=_pbs_v1.str_to_vnode_ntype(v)         
-			    elif( n == ATTR_NODE_Sharing ): 
-				v=_pbs_v1.str_to_vnode_sharing(v)         
-
-			if( self.type == "jobs" ):
-                            if n == ATTR_inter or n == ATTR_block or n == ATTR_X11_port:
-				v=int(pbs_bool(v))
-
-			if(r):
-			    pr=getattr(obj,n)
-
-			    # if resource list does not exist, then set it
-			    if( pr == None):
-				setattr(obj,n)
-
-			    pr=getattr(obj,n)
-			    if (pr == None):
-				_pbs_v1.logmsg(_pbs_v1.LOG_DEBUG,
-					       "pbs_statobj: missing %s" % (n))
-				a=a.next
-				continue
-
-			    vo=getattr(pr, r)
-			    if( vo == None ):
-				setattr(pr,r,v)
-				if server_data_fp:
-				    server_data_fp.write("%s.%s[%s]=%s\n" %(header_str,n,r,v))
-			    else:
-				# append value:
-				# example: "select=1:ncpus=1,ncpus=1,nodect=1,place=pack"
-				vl=[vo, v]
-				setattr(pr, r, ",".join(vl))
-				if server_data_fp:
-				    server_data_fp.write("%s.%s[%s]=%s\n" % (header_str, n,r,",".join(vl)))
-
-			else:
-			    vo=getattr(obj,n)
-
-			    if( vo == None ):
-				setattr(obj,n,v)
-				if server_data_fp:
-				    server_data_fp.write("%s.%s=%s\n" %(header_str,n,v))
-			    else:
-				vl=[vo, v]
-				setattr(obj, n, ",".join(vl))
-				if server_data_fp:
-				    server_data_fp.write("%s.%s=%s\n" % (header_str, n, ",".join(vl)))
-
-			a=a.next
-      
+		    _load_attribs(obj, b.attribs, self.type, header_str,
+				  server_data_fp)
+
 		self.bs=b.next
 
 		_pbs_v1.set_python_mode()
@@ -1166,67 +1187,9 @@ class pbs_iter(object):
 			_pbs_v1.set_python_mode()
 			raise StopIteration
 
-		    a=b.attribs
-
-		    while(a):
-			n=a.name
-			r=a.resource
-			v=a.value
-
-			if( self.type == "vnodes" ): 
-			    if( n == ATTR_NODE_state ):         
-				v=_pbs_v1.str_to_vnode_state(v)         
-			    elif( n == ATTR_NODE_ntype ): 
-				v=_pbs_v1.str_to_vnode_ntype(v)         
-			    elif( n == ATTR_NODE_Sharing ): 
-				v=_pbs_v1.str_to_vnode_sharing(v)         
-
-			if( self.type == "jobs" ):
-                            if n == ATTR_inter or n == ATTR_block or n == ATTR_X11_port:
-				v=int(pbs_bool(v))
-
-			if(r):
-			    pr=getattr(obj,n)
-
-			    # if resource list does not exist, then set it
-			    if( pr == None):
-				setattr(obj,n)
-
-			    pr=getattr(obj,n)
-			    if (pr == None):
-				_pbs_v1.logmsg(_pbs_v1.LOG_DEBUG,
-					       "pbs_statobj: missing %s" % (n))
-				a=a.next
-				continue
-
-			    vo=getattr(pr, r)
-			    if( vo == None ):
-				setattr(pr,r,v)
-				if server_data_fp:
-				    server_data_fp.write("%s.%s[%s]=%s\n" %(header_str,n,r,v))
-			    else:
-				# append value:
-				# example: "select=1:ncpus=1,ncpus=1,nodect=1,place=pack"
-				vl=[vo, v]
-				setattr(pr, r, ",".join(vl))
-				if server_data_fp:
-				    server_data_fp.write("%s.%s[%s]=%s\n" % (header_str, n,r,",".join(vl)))
-
-			else:
-			    vo=getattr(obj,n)
-
-			    if( vo == None ):
-				setattr(obj,n,v)
-				if server_data_fp:
-				    server_data_fp.write("%s.%s=%s\n" %(header_str,n,v))
-			    else:
-				vl=[vo, v]
-				setattr(obj, n, ",".join(vl))
-				if server_data_fp:
-				    server_data_fp.write("%s.%s=%s\n" % (header_str, n, ",".join(vl)))
-
-			a=a.next
-      
+		    _load_attribs(obj, b.attribs, self.type, header_str,
+				  server_data_fp)
+
 		self.bs=b.next
 
 		_pbs_v1.set_python_mode()
@@ -1236,3 +1199,362 @@ class pbs_iter(object):
 		    return _pbs_v1.iter_nextfunc(self, 0, self.obj_name, self.filter1, self.filter2)
 #: C(pbs_iter)
 
+
+#:-------------------------------------------------------------------------
+#                       PBS Streaming Iterator Type
+#:-------------------------------------------------------------------------
+
+# default number of objects materialized at a time by pbs_stream_iter
+STREAM_ITER_PAGE_SIZE = 64
+
+# largest number of named vnodes that pbs_stream_iter stats one at a time
+# under pbs_python, more are taken from a single status of all the vnodes
+STREAM_ITER_MAX_VNODE_STATS = 100
+
+# job state letters accepted by the 'state' filter (same as 'qselect -s')
+_JOB_STATE_LETTERS = {
+    'T' : _pbs_v1.JOB_STATE_TRANSIT,
+    'Q' : _pbs_v1.JOB_STATE_QUEUED,
+    'H' : _pbs_v1.JOB_STATE_HELD,
+    'W' : _pbs_v1.JOB_STATE_WAITING,
+    'R' : _pbs_v1.JOB_STATE_RUNNING,
+    'E' : _pbs_v1.JOB_STATE_EXITING,
+    'X' : _pbs_v1.JOB_STATE_EXPIRED,
+    'B' : _pbs_v1.JOB_STATE_BEGUN,
+    'S' : _pbs_v1.JOB_STATE_SUSPEND,
+    'U' : _pbs_v1.JOB_STATE_SUSPEND_USERACTIVE,
+    'M' : _pbs_v1.JOB_STATE_MOVED,
+    'F' : _pbs_v1.JOB_STATE_FINISHED
+}
+
+def _exec_vnode_names(exec_vnode):
+    """
+    Returns the list of vnode names found in the 'exec_vnode' string
+    "(vnA:ncpus=1)+(vnB:ncpus=1+vnC:mem=1gb)".
+    """
+    names = []
+    for c in str(exec_vnode).split("+"):
+        names.append(c.strip("(").strip(")").split(":", 1)[0])
+    return names
+
+class pbs_stream_iter(object):
+    """
+    This represents an iterator over the jobs or vnodes of a server that
+    only returns the objects matching a set of select-style filters, and
+    that materializes the objects at most 'page_size' at a time.
+
+    pbs_obj_name   can be: jobs, vnodes.
+    attribs        list of attribute names (e.g. "job_state",
+                   "Resource_List.ncpus") to populate on the returned
+                   objects. Only honored under pbs_python, where the
+                   objects are obtained through the IFL API; None means
+                   all.
+    filters        dictionary with any of the following keys:
+                     state  - jobs: string of job state letters as in
+                              'qselect -s' (e.g. "QH").
+                              vnodes: a vnode state value (e.g.
+                              pbs.ND_STATE_OFFLINE) or state string
+                              (e.g. "offline").
+                     queue  - jobs: name of the queue the jobs are in.
+                     owner  - jobs: name of the user owning the jobs.
+                     vnode  - jobs: name of a vnode assigned to the jobs.
+                              vnodes: a vnode name or list of names.
+    page_size      maximum number of objects held by the iterator at once.
+    connect_server Name of the pbs server to get various stats.
+
+    Under pbs_python, the job filters are evaluated by the server through
+    pbs_selstat(), and only the requested attributes are transferred.
+    Inside the server, the jobs of a 'queue' are walked directly, and the
+    remaining filters are applied as each object is produced.
+
+    'page_size' bounds the number of pbs objects built at once, not the
+    memory used by the IFL replies: under pbs_python, the reply of
+    pbs_selstat() for jobs, or of pbs_statvnode() for all the vnodes, is
+    held in full until the iterator is exhausted. Up to
+    STREAM_ITER_MAX_VNODE_STATS named vnodes are stat'ed one at a time as
+    the pages are filled, more are taken from a single status of all the
+    vnodes, with only 'attribs'. Inside the server, 'attribs' is
+    ignored, all the attributes of the objects being available.
+    """
+
+    def __init__(self, pbs_obj_name, attribs=None, filters=None,
+                 page_size=None, connect_server=None):
+
+        if pbs_obj_name not in ("jobs", "vnodes"):
+            raise ValueError("pbs_stream_iter: bad object iterator type %s" \
+                                                            % (pbs_obj_name,))
+        self.type = pbs_obj_name
+        self.attribs = attribs
+        self.filters = {}
+        if filters is not None:
+            for k, v in filters.items():
+                if k not in ("state", "queue", "owner", "vnode"):
+                    raise ValueError("pbs_stream_iter: bad filter %s" % (k,))
+                if v is not None:
+                    self.filters[k] = v
+        if self.type == "vnodes":
+            for k in ("queue", "owner"):
+                if k in self.filters:
+                    raise ValueError(\
+                        "pbs_stream_iter: filter %s not valid for vnodes" % (k,))
+        # names given in the 'vnode' filter of a vnodes iterator
+        self._vnames = []
+        if (self.type == "vnodes") and ("vnode" in self.filters):
+            vn = self.filters["vnode"]
+            if isinstance(vn, (str,)):
+                vn = [vn]
+            self._vnames = list(vn)
+        self._vname_set = set(self._vnames)
+        if page_size is None:
+            page_size = STREAM_ITER_PAGE_SIZE
+        if page_size <= 0:
+            raise ValueError("pbs_stream_iter: page_size must be positive")
+        self.page_size = page_size
+        self._connect_server = connect_server
+        self._page = []
+        self._page_idx = 0
+        self._done = False
+        self.con = -1
+        self.bs = None
+        self.names = None
+        self.src = None
+        self._stat_names = []
+        self._attrl = None
+
+        # filters that still need to be checked on the produced objects
+        self._local_filters = dict(self.filters)
+
+        self._caller = _pbs_v1.get_python_daemon_name()
+        if self._caller == "pbs_python":
+            if connect_server == None:
+                self._connect_server = "localhost"
+                self._sn = ""
+            else:
+                self._sn = connect_server
+
+            if _pbs_v1.use_static_data():
+                if self.type == "jobs":
+                    self.names = iter(_pbs_v1.get_job_static("", self._sn, ""))
+                else:
+                    self.names = iter(_pbs_v1.get_vnode_static("", self._sn))
+                return
+
+            self.con = pbs_connect(self._connect_server)
+            if self.con < 0:
+                _pbs_v1.logmsg(_pbs_v1.LOG_DEBUG,\
+                   "pbs_stream_iter: Unable to connect to server %s" \
+                                                        % (connect_server))
+                self._done = True
+                return
+
+            if self.type == "jobs":
+                sel = []
+                for k, a in (("state", ATTR_state), ("queue", ATTR_q),
+                             ("owner", ATTR_u)):
+                    if k in self._local_filters:
+                        sel.append((a, str(self._local_filters.pop(k))))
+                self.bs = pbs_selstat(self.con, self._make_attropl(sel),
+                                      self._make_attrl(), None)
+            elif ("vnode" in self._local_filters) and \
+                    (len(self._vnames) <= STREAM_ITER_MAX_VNODE_STATS):
+                # a few named vnodes: stat them one at a time as the pages
+                # are filled rather than transferring all the vnodes
+                self._attrl = self._make_attrl()
+                self._stat_names = list(self._vnames)
+                del self._local_filters["vnode"]
+            else:
+                # so many named vnodes that a single status of all the
+                # vnodes costs less than a call per name: the names are
+                # then matched as the vnodes are produced
+                self.bs = pbs_statvnode(self.con, None, self._make_attrl(),
+                                        None)
+        elif (self.type == "vnodes") and ("vnode" in self._local_filters):
+            # inside the server (or mom): named vnodes are looked up
+            # directly instead of walking all the vnodes.
+            self.names = iter(self._vnames)
+            del self._local_filters["vnode"]
+        else:
+            # inside the server (or mom): let the C iterator walk the
+            # queue's own job list instead of all the jobs.
+            qname = ""
+            if (self.type == "jobs") and ("queue" in self._local_filters):
+                qname = str(self._local_filters.pop("queue"))
+            self.src = pbs_iter(self.type, "", qname, connect_server)
+    #: m(__init__)
+
+    def _make_attrl(self):
+        """
+        Returns an attrl list out of self.attribs, making sure the
+        attributes needed by the client-side filters are included.
+        """
+        if self.attribs is None:
+            return None
+        names = list(self.attribs)
+        if self.type == "jobs":
+            if "vnode" in self._local_filters:
+                names.append(ATTR_execvnode)
+        elif "state" in self._local_filters:
+            names.append(ATTR_NODE_state)
+        head = None
+        for n in reversed(names):
+            a = attrl()
+            rs = n.split(".", 1)
+            a.name = rs[0]
+            if len(rs) == 2:
+                a.resource = rs[1]
+            a.next = head
+            head = a
+        return head
+    #: m(_make_attrl)
+
+    def _make_attropl(self, sel):
+        """
+        Returns an attropl list, with EQ operators, out of the list of
+        (name, value) tuples 'sel'.
+        """
+        head = None
+        for (n, v) in reversed(sel):
+            a = attropl()
+            a.name = n
+            a.value = v
+            a.op = EQ
+            a.next = head
+            head = a
+        return head
+    #: m(_make_attropl)
+
+    def _matches(self, obj):
+        """
+        Returns True if 'obj' satisfies the filters that were not already
+        applied by the server.
+        """
+        f = self._local_filters
+        if self.type == "jobs":
+            if "state" in f:
+                js = getattr(obj, "job_state")
+                states = [_JOB_STATE_LETTERS.get(c) for c in str(f["state"])]
+                if js is None or int(js) not in states:
+                    return False
+            if "queue" in f:
+                q = getattr(obj, "queue")
+                if q is None or str(q) != str(f["queue"]):
+                    return False
+            if "owner" in f:
+                u = getattr(obj, "euser")
+                if u is None:
+                    u = str(getattr(obj, "Job_Owner")).split("@", 1)[0]
+                if str(u) != str(f["owner"]):
+                    return False
+            if "vnode" in f:
+                ev = getattr(obj, "exec_vnode")
+                if ev is None or str(f["vnode"]) not in _exec_vnode_names(ev):
+                    return False
+        else:
+            if "state" in f:
+                s = getattr(obj, "state")
+                mask = f["state"]
+                if isinstance(mask, (str,)):
+                    mask = _pbs_v1.str_to_vnode_state(mask)
+                if s is None:
+                    return False
+                if mask == 0:
+                    if int(s) != 0:
+                        return False
+                elif (int(s) & mask) == 0:
+                    return False
+            if ("vnode" in f) and (str(obj.name) not in self._vname_set):
+                return False
+        return True
+    #: m(_matches)
+
+    def _next_raw(self):
+        """
+        Returns the next unfiltered object from the underlying source, or
+        None if exhausted.
+        """
+        if self.src is not None:
+            try:
+                return self.src.next()
+            except StopIteration:
+                return None
+
+        while self.names is not None:
+            try:
+                n = self.names.next()
+            except StopIteration:
+                return None
+            if self._caller != "pbs_python":
+                obj = _pbs_v1.get_vnode(n)
+            elif self.type == "jobs":
+                obj = _pbs_v1.get_job_static(n, self._connect_server, "")
+            else:
+                obj = _pbs_v1.get_vnode_static(n, self._connect_server)
+            # skip the names that do not resolve to an object
+            if obj is not None:
+                return obj
+
+        b = self.bs
+        while (not b) and self._stat_names:
+            b = pbs_statvnode(self.con, self._stat_names.pop(0),
+                              self._attrl, None)
+        if not b:
+            return None
+        self.bs = b.next
+
+        _pbs_v1.set_c_mode()
+        server_data_fp = _pbs_v1.get_server_data_fp();
+        if self.type == "jobs":
+            obj = _job(b.name, self._connect_server)
+            header_str = "pbs.server().job(%s)" % (b.name,)
+        else:
+            obj = _vnode(b.name, self._connect_server)
+            header_str = "pbs.server().vnode(%s)" % (b.name,)
+
+        _load_attribs(obj, b.attribs, self.type, header_str, server_data_fp)
+
+        _pbs_v1.set_python_mode()
+        return obj
+    #: m(_next_raw)
+
+    def _fill_page(self):
+        """
+        Loads up to page_size matching objects into the current page.
+        """
+        self._page = []
+        self._page_idx = 0
+        while len(self._page) < self.page_size:
+            obj = self._next_raw()
+            if obj is None:
+                self._close()
+                break
+            if self._matches(obj):
+                self._page.append(obj)
+    #: m(_fill_page)
+
+    def _close(self):
+        """Releases the server connection, if any."""
+        self._done = True
+        self.bs = None
+        self._stat_names = []
+        if self.con >= 0:
+            pbs_disconnect(self.con)
+            self.con = -1
+    #: m(_close)
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        if self._page_idx >= len(self._page):
+            if self._done:
+                raise StopIteration
+            self._fill_page()
+            if len(self._page) == 0:
+                raise StopIteration
+        obj = self._page[self._page_idx]
+        # drop the reference so that consumed objects can be freed
+        self._page[self._page_idx] = None
+        self._page_idx += 1
+        return obj
+    #: m(next)
+#: C(pbs_stream_iter)
@@ -307,11 +307,11 @@ texinfo_show_urls = 'inline'
 # Skip the document for unwanted members iside API documentation
 def autodoc_skip_member(app, what, name, obj, skip, options):
     exclusions = ('chunks_tag', 'chunk_tag', 'array_tag', 'subjob_tag',
-                  'pbsobjname_re', 'pbsobjattrval_re', 'dt_tag',
-                  'hms_tag', 'lim_tag', 'fgc_attr_pat', 'fgc_val_pat',
-                  'version_tag', 'fs_tag', 'conf_re', 'generic_tag',
-                  'node_type_tag', 'queue_type_tag', 'job_type_tag',
-                  'job_exit_tag', 'tm_tag', 'server_run_tag',
+                  'pbsobjname_re', 'pbsobjattrval_re', 'pbsobjattrname_re',
+                  'dt_tag', 'hms_tag', 'lim_tag', 'fgc_attr_pat',
+                  'fgc_val_pat', 'version_tag', 'fs_tag', 'conf_re',
+                  'generic_tag', 'node_type_tag', 'queue_type_tag',
+                  'job_type_tag', 'job_exit_tag', 'tm_tag', 'server_run_tag',
                   'server_nodeup_tag', 'server_enquejob_tag',
                   'server_endjob_tag', 'startcycle_tag', 'endcycle_tag',
                   'alarm_tag', 'considering_job_tag', 'sched_job_run_tag',
@@ -326,6 +326,10 @@ OTHER_HOLD = 'o'
 SYSTEM_HOLD = 's'
 BAD_PASSWORD_HOLD = 'p'
 
+# enum batch_op, the order of these symbols matters, see pbs_ifl.h
+(SET, UNSET, INCR, DECR, EQ, NE, GE, GT,
+ LE, LT, MATCH, MATCH_RE, NOT, DFLT) = range(14)
+
 
 class attropl:
 
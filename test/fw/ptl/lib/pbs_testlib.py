@@ -48,6 +48,7 @@ import string
 import tempfile
 import cPickle
 import copy
+import bisect
 import datetime
 import traceback
 import threading
@@ -243,6 +244,8 @@ class PtlConfig(object):
             'PTL_CP_CMD': 'scp -p',
             'PTL_EXPECT_MAX_ATTEMPTS': 60,
             'PTL_EXPECT_INTERVAL': 0.5,
+            'PTL_EXPECT_MIN_INTERVAL': 0.05,
+            'PTL_EXPECT_MAX_INTERVAL': 0.5,
             'PTL_UPDATE_ATTRIBUTES': True,
         }
         self.handlers = {
@@ -251,6 +254,8 @@ class PtlConfig(object):
             'PTL_CP_CMD': DshUtils.set_copy_cmd,
             'PTL_EXPECT_MAX_ATTEMPTS': Server.set_expect_max_attempts,
             'PTL_EXPECT_INTERVAL': Server.set_expect_interval,
+            'PTL_EXPECT_MIN_INTERVAL': Server.set_expect_min_interval,
+            'PTL_EXPECT_MAX_INTERVAL': Server.set_expect_max_interval,
             'PTL_UPDATE_ATTRIBUTES': Server.set_update_attributes
         }
         if conf is None:
@@ -1258,6 +1263,7 @@ class BatchUtils(object):
                             (?P<value>.*)
                             [\s]*""",
                                   re.VERBOSE)
+    pbsobjattrname_re = re.compile("[\w\d\.-]+$")
     dt_re = '(?P<dt_from>\d\d/\d\d/\d\d\d\d \d\d:\d\d)' + \
             '[\s]+' + \
             '(?P<dt_to>\d\d/\d\d/\d\d\d\d \d\d:\d\d)'
@@ -1811,6 +1817,92 @@ class BatchUtils(object):
             _js.append(_jdict)
         return _js
 
+    def iter_dictlist(self, l, attribs=None, mergelines=True, id=None):
+        """
+        Generator version of convert_to_dictlist, parses the records
+        in a single pass and yields one object dictionary at a time.
+
+        :param l: records to convert, any iterable of lines
+        :param attribs: Optional attributes to keep, all are kept when
+                        None
+        :param mergelines: merge qstat broken lines into one
+        :param id: Optional identifier of the only object to yield
+        :returns: Generator of object dictionaries
+        """
+        if isinstance(attribs, (list, tuple)):
+            attribs = set(attribs)
+        name_match = self.pbsobjname_re.match
+        attrval_match = self.pbsobjattrval_re.match
+        attrname_match = self.pbsobjattrname_re.match
+        # attribute names repeat across objects, validate each once
+        names = {}
+        d = {}
+        for line in self._merged_lines(l, mergelines):
+            line = line.strip()
+            eq = line.find('=')
+            if eq == -1:
+                if not line:
+                    continue
+                # object names never contain '='
+                m = name_match(line)
+                if m:
+                    if len(d) > 1 and (id is None or d.get('id') == id):
+                        yield d
+                    d = {'id': m.group('name')}
+                continue
+            # fast path for the common "attribute = value" layout
+            attr = line[:eq].rstrip(' \t\n\r\f\v')
+            if attribs is not None and attr not in attribs:
+                continue
+            valid = names.get(attr)
+            if valid is None:
+                valid = names[attr] = attrname_match(attr) is not None
+            if valid and '\n' not in line:
+                value = line[eq + 1:].lstrip(' \t\n\r\f\v')
+            else:
+                m = attrval_match(line)
+                if not m:
+                    continue
+                attr = m.group('attribute')
+                value = m.group('value')
+            if attr in d:
+                d[attr] = d[attr] + "," + value
+            else:
+                d[attr] = value
+        # the last element
+        if len(d) > 1 and (id is None or d.get('id') == id):
+            yield d
+
+    @staticmethod
+    def _merged_lines(l, mergelines=True):
+        """
+        Yield the lines of l, joining the qstat continuation lines
+        that start with a tab to the line they continue when
+        mergelines is True
+        """
+        if not mergelines:
+            for line in l:
+                yield line
+            return
+        prev = None
+        parts = None
+        for line in l:
+            if prev is not None and line.startswith('\t'):
+                if parts is None:
+                    parts = [prev.strip('\r\n\t')]
+                parts.append(line.strip('\r\n\t'))
+                continue
+            if parts is not None:
+                yield ''.join(parts)
+                parts = None
+            elif prev is not None:
+                yield prev
+            prev = line
+        if parts is not None:
+            yield ''.join(parts)
+        elif prev is not None:
+            yield prev
+
     def convert_to_dictlist(self, l, attribs=None, mergelines=True, id=None):
         """
         Convert a list of records into a dictlist format.
@@ -1820,46 +1912,7 @@ class BatchUtils(object):
         :param mergelines: merge qstat broken lines into one
         :returns: Record list converted into dictlist format
         """
-
-        if mergelines:
-            lines = []
-            for i in range(len(l)):
-                if l[i].startswith('\t'):
-                    _e = len(lines) - 1
-                    lines[_e] = lines[_e].strip('\r\n\t') + \
-                        l[i].strip('\r\n\t')
-                else:
-                    lines.append(l[i])
-        else:
-            lines = l
-
-        objlist = []
-        d = {}
-
-        for l in lines:
-            l = l.strip()
-            m = self.pbsobjname_re.match(l)
-            if m:
-                if len(d.keys()) > 1:
-                    if id is None or (id is not None and d['id'] == id):
-                        objlist.append(d.copy())
-                d = {}
-                d['id'] = m.group('name')
-            else:
-                m = self.pbsobjattrval_re.match(l)
-                if m:
-                    attr = m.group('attribute')
-                    if attribs is None or attr in attribs:
-                        if attr in d:
-                            d[attr] = d[attr] + "," + m.group('value')
-                        else:
-                            d[attr] = m.group('value')
-        # add the last element
-        if len(d.keys()) > 1:
-            if id is None or (id is not None and d['id'] == id):
-                objlist.append(d.copy())
-
-        return objlist
+        return list(self.iter_dictlist(l, attribs, mergelines, id))
 
     def convert_to_batch(self, l, mergelines=True):
         """
@@ -3906,10 +3959,12 @@ class PBSService(PBSObject):
         :param endtime: date timestamp to end matching
         :returns: Last ``<n>`` lines of logfile for ``Server``,
                   ``Scheduler``, ``MoM or tracejob``
+
+        .. note:: Log files are followed with a PBSLogFollower, each
+                  call only reads the lines appended since the
+                  previous one.
         """
-        logval = None
         lines = None
-        sudo = False
 
         try:
             if logtype == 'tracejob':
@@ -3924,47 +3979,13 @@ class PBSService(PBSObject):
                 if n != 'ALL':
                     lines = lines[-n:]
             else:
-                if day is None:
-                    day = time.strftime("%Y%m%d", time.localtime(time.time()))
-                if logtype == 'accounting':
-                    filename = os.path.join(self.pbs_conf['PBS_HOME'],
-                                            'server_priv', 'accounting', day)
-                    sudo = True
-                else:
-                    if (isinstance(self, Scheduler) and
-                            'sched_log' in self.attributes):
-                        filename = os.path.join(
-                            self.attributes['sched_log'], day)
-                    else:
-                        logval = self._instance_to_logpath(logtype)
-                        if logval:
-                            filename = os.path.join(self.pbs_conf['PBS_HOME'],
-                                                    logval, day)
+                lines = self._log_follower(logtype, day).update()
                 if n == 'ALL':
-                    if self._is_local and not sudo:
-                        lines = open(filename)
-                    else:
-                        lines = self.du.cat(self.hostname, filename, sudo=sudo,
-                                            level=logging.DEBUG2)['out']
-                elif self._is_local and not sudo:
-                    if tail:
-                        futils = FileUtils(filename, FILE_TAIL)
-                    else:
-                        futils = FileUtils(filename)
-                    lines = futils.next(n)
+                    lines = list(lines)
+                elif tail:
+                    lines = lines[-n:]
                 else:
-                    if tail:
-                        cmd = ['/usr/bin/tail']
-                    else:
-                        cmd = ['/usr/bin/head']
-
-                    pyexec = os.path.join(self.pbs_conf['PBS_EXEC'], 'python',
-                                          'bin', 'python')
-                    osflav = self.du.get_platform(self.hostname, pyexec)
-                    cmd += ['-n']
-                    cmd += [str(n), filename]
-                    lines = self.du.run_cmd(self.hostname, cmd, sudo=sudo,
-                                            level=logging.DEBUG2)['out']
+                    lines = lines[:n]
         except:
             self.logger.error('error in log_lines ')
             traceback.print_exc()
@@ -3972,6 +3993,36 @@ class PBSService(PBSObject):
 
         return lines
 
+    def _log_follower(self, logtype, day=None):
+        """
+        Return the PBSLogFollower of the log of logtype, an instance
+        of a Scheduler, Server or MoM object, or 'accounting', for
+        the given day in ``YYYYMMDD`` format, defaulting to the
+        current day
+        """
+        from ptl.utils.pbs_logutils import PBSLogFollower
+
+        if day is None:
+            day = time.strftime("%Y%m%d", time.localtime(time.time()))
+        sudo = False
+        filename = None
+        if logtype == 'accounting':
+            filename = os.path.join(self.pbs_conf['PBS_HOME'],
+                                    'server_priv', 'accounting', day)
+            sudo = True
+        elif (isinstance(self, Scheduler) and
+                'sched_log' in self.attributes):
+            filename = os.path.join(self.attributes['sched_log'], day)
+        else:
+            logval = self._instance_to_logpath(logtype)
+            if logval:
+                filename = os.path.join(self.pbs_conf['PBS_HOME'], logval,
+                                        day)
+        if filename is None:
+            return None
+        return PBSLogFollower.get(self.hostname, filename, sudo=sudo,
+                                  local=self._is_local)
+
     def _log_match(self, logtype, msg, id=None, n=50, tail=True,
                    allmatch=False, regexp=False, day=None, max_attempts=None,
                    interval=None, starttime=None, endtime=None,
@@ -4062,14 +4113,35 @@ class PBSService(PBSObject):
         if allmatch:
             infomsg += ' - on all matches '
         attemptmsg = ' - No match'
+        # when searching all lines of a followed log, the lines searched
+        # by the previous attempts are not searched again
+        follower = None
+        scanned = counted = 0
         while attempt <= max_attempts:
             if attempt > 1:
                 attemptmsg = ' - attempt ' + str(attempt)
-            lines = self.log_lines(logtype, id, n=n, tail=tail, day=day,
-                                   starttime=starttime, endtime=endtime)
-            rv = self.logutils.match_msg(lines, msg, allmatch=allmatch,
-                                         regexp=regexp, starttime=starttime,
-                                         endtime=endtime)
+            if n == 'ALL' and logtype != 'tracejob':
+                if follower is None:
+                    follower = self._log_follower(logtype, day)
+                prev = lines
+                lines = None
+                if follower is not None:
+                    lines = follower.update()
+                if lines is not prev:
+                    scanned = counted = 0
+                (rv, counted) = self.logutils.match_lines(
+                    lines[scanned:] if lines else None, msg, counted,
+                    allmatch=allmatch, regexp=regexp, starttime=starttime,
+                    endtime=endtime)
+                if lines:
+                    scanned = len(lines)
+            else:
+                lines = self.log_lines(logtype, id, n=n, tail=tail, day=day,
+                                       starttime=starttime, endtime=endtime)
+                rv = self.logutils.match_msg(lines, msg, allmatch=allmatch,
+                                             regexp=regexp,
+                                             starttime=starttime,
+                                             endtime=endtime)
             if rv:
                 self.logger.log(level, infomsg + '... OK')
                 break
@@ -4497,6 +4569,145 @@ class Comm(PBSService):
                                level=level, existence=existence)
 
 
+class IFLConnectionPool(object):
+
+    """
+    Pool of IFL connections shared by the Server objects of a test
+    process, keyed by (hostname, user). The user is the one the test
+    process runs as since IFL calls on behalf of any other user are
+    made through ``pbs_api_as`` in a separate process and never use a
+    pooled connection.
+
+    A connection is checked with a server status call before reuse
+    when its last call failed or when it has been idle for longer than
+    the caller's ``max_idle``, and is replaced when the check fails.
+    """
+
+    idle = {}
+    busy = {}
+    stats = {'connects': 0, 'reuses': 0, 'checks': 0, 'reconnects': 0}
+    _lock = threading.Lock()
+    logger = logging.getLogger(__name__)
+
+    @classmethod
+    def _key(cls, hostname):
+        return (hostname, pwd.getpwuid(os.getuid())[0])
+
+    @classmethod
+    def _healthy(cls, conn):
+        bs = pbs_statserver(conn, None, None)
+        if bs is None:
+            return False
+        pbs_statfree(bs)
+        return True
+
+    @classmethod
+    def get(cls, hostname, max_idle=None):
+        """
+        Get a connection to the server on hostname, reusing a pooled
+        one when it is usable. Returns the value of ``pbs_connect``
+        when a new connection is needed.
+
+        :param hostname: Name of the server host
+        :type hostname: str
+        :param max_idle: Idle time in seconds after which a pooled
+                         connection is checked before reuse. None
+                         never checks idle connections, 0 always does.
+        :type max_idle: int or None
+        """
+        key = cls._key(hostname)
+        while True:
+            # The entry is taken out of the pool under the lock but
+            # checked and connected outside of it, the lock is shared
+            # by every thread of the test process. A connection being
+            # checked is marked busy so that a drain in the meantime
+            # is seen and the connection closed.
+            with cls._lock:
+                entries = cls.idle.get(key)
+                if not entries:
+                    break
+                conn, last_use, suspect = entries.pop()
+                stale = (max_idle is not None and
+                         time.time() - last_use >= max_idle)
+                cls.busy[conn] = key
+                if suspect or stale:
+                    cls.stats['checks'] += 1
+            if (suspect or stale) and not cls._healthy(conn):
+                cls.logger.debug('pool: dropping unusable connection '
+                                 '%d to %s' % (conn, hostname))
+                with cls._lock:
+                    cls.busy.pop(conn, None)
+                    cls.stats['reconnects'] += 1
+                pbs_disconnect(conn)
+                continue
+            with cls._lock:
+                if cls.busy.get(conn) is None:
+                    cls.busy.pop(conn, None)
+                    drained = True
+                else:
+                    cls.stats['reuses'] += 1
+                    drained = False
+            if drained:
+                pbs_disconnect(conn)
+                continue
+            return conn
+        conn = pbs_connect(hostname)
+        if conn is not None and conn >= 0:
+            with cls._lock:
+                cls.busy[conn] = key
+                cls.stats['connects'] += 1
+        return conn
+
+    @classmethod
+    def release(cls, conn, close=False):
+        """
+        Give back a connection obtained with get. The connection is
+        closed instead when close is True or when its server was
+        drained while it was in use. Releasing a connection that is
+        not in use is a no-op.
+
+        :param conn: The connection to release
+        :type conn: int
+        :param close: If True, close the connection
+        :type close: bool
+        """
+        if conn is None or conn < 0:
+            return
+        with cls._lock:
+            if conn not in cls.busy:
+                return
+            key = cls.busy.pop(conn)
+            if close or key is None:
+                pbs_disconnect(conn)
+                return
+            suspect = pbs_geterrmsg(conn) is not None
+            cls.idle.setdefault(key, []).append([conn, time.time(),
+                                                 suspect])
+
+    @classmethod
+    def drain(cls, hostname=None):
+        """
+        Close the idle connections to the server on hostname, or to
+        all servers if hostname is None. Hosts are matched on their
+        short name. Connections in use are closed when released. To
+        be called whenever the server is stopped or restarted.
+
+        :param hostname: Name of the server host
+        :type hostname: str or None
+        """
+        def match(key):
+            return (hostname is None or (key is not None and
+                    key[0].split('.')[0] == hostname.split('.')[0]))
+        with cls._lock:
+            for key in cls.idle.keys():
+                if match(key):
+                    for entry in cls.idle.pop(key):
+                        pbs_disconnect(entry[0])
+            for conn, key in cls.busy.items():
+                if match(key):
+                    cls.busy[conn] = None
+
+
 class Server(PBSService):
 
     """
@@ -4523,6 +4734,14 @@ class Server(PBSService):
     expect_interval: the default time interval (in seconds)
     between expect\ requests. Defaults to 0.5
 
+    expect_min_interval: the time (in seconds) expect waits
+    before\ its first retry, doubled after every retry. Defaults
+    to 0.05
+
+    expect_max_interval: the longest time (in seconds) expect
+    waits\ between retries when it is not given an interval.
+    Defaults to 0.5
+
     update_attributes: the default on whether Object attributes
     should be\ updated using a list of dictionaries. Defaults
     to True
@@ -4585,6 +4804,8 @@ class Server(PBSService):
         'mode': PTL_API,
         'expect_max_attempts': 60,
         'expect_interval': 0.5,
+        'expect_min_interval': 0.05,
+        'expect_max_interval': 0.5,
         'update_attributes': True,
     }
     # this pattern is a bit relaxed to match common developer build numbers
@@ -4609,12 +4830,20 @@ class Server(PBSService):
         self.last_error = []  # type: array. Set for CLI IFL errors. Not reset
         self.last_out = []  # type: array. Set for CLI IFL output. Not reset
         self.last_rc = None  # Set for CLI IFL return code. Not thread-safe
+        self.last_expect = None  # attempts and elapsed time of last expect
+        self.last_submit_stats = None  # latencies of last submit_many
+        self.status_cache_stats = {'hits': 0, 'misses': 0}
 
         # default timeout on connect/disconnect set to 60s to mimick the qsub
         # buffer introduced in PBS 11
         self._conn_timeout = 60
-        self._conn_timer = None
+        self._thread_conn = {}
         self._conn = None
+        # status snapshots, see enable_status_cache. The change epoch
+        # moves on every call that changes the state of PBS
+        self._status_cache = None
+        self._status_cache_max_age = None
+        self._change_epoch = 0
         self._db_conn = None
         self.current_user = pwd.getpwuid(os.getuid())[0]
 
@@ -4717,6 +4946,22 @@ class Server(PBSService):
         cls.logger.info('setting expect interval ' + str(val))
         cls.ptl_conf['expect_interval'] = float(val)
 
+    @classmethod
+    def set_expect_min_interval(cls, val):
+        """
+        Set expect min interval
+        """
+        cls.logger.info('setting expect min interval ' + str(val))
+        cls.ptl_conf['expect_min_interval'] = float(val)
+
+    @classmethod
+    def set_expect_max_interval(cls, val):
+        """
+        Set expect max interval
+        """
+        cls.logger.info('setting expect max interval ' + str(val))
+        cls.ptl_conf['expect_max_interval'] = float(val)
+
     def set_client(self, name=None):
         """
         Set server client
@@ -4729,46 +4974,63 @@ class Server(PBSService):
         else:
             self.client = name
 
+    def _get_conn(self):
+        return self._thread_conn.get(threading.current_thread().ident)
+
+    def _set_conn(self, conn):
+        ident = threading.current_thread().ident
+        if conn is None:
+            self._thread_conn.pop(ident, None)
+        else:
+            self._thread_conn[ident] = conn
+
+    # current connection, kept per thread so that concurrent API calls
+    # report their own errors
+    _conn = property(_get_conn, _set_conn)
+
     def _connect(self, hostname, attempt=1):
-        if ((self._conn is None or self._conn < 0) or
-                (self._conn_timeout == 0 or self._conn_timer is None)):
-            self._conn = pbs_connect(hostname)
-            self._conn_timer = time.time()
+        """
+        Get a connection to the Server on hostname from the IFL
+        connection pool and make it the current connection. Retries
+        up to 5 times before raising PbsConnectError.
 
-        if self._conn is None or self._conn < 0:
-            if attempt > 5:
+        :param hostname: Name of the server host
+        :type hostname: str
+        """
+        while True:
+            self._conn = IFLConnectionPool.get(hostname,
+                                               max_idle=self._conn_timeout)
+            if self._conn is not None and self._conn >= 0:
+                return self._conn
+            if attempt >= 5:
                 m = self.logprefix + 'unable to connect'
                 raise PbsConnectError(rv=None, rc=-1, msg=m)
-            else:
-                self._disconnect(self._conn, force=True)
-                time.sleep(1)
-                return self._connect(hostname, attempt + 1)
-
-        return self._conn
+            attempt += 1
+            time.sleep(1)
 
     def _disconnect(self, conn, force=False):
         """
-        disconnect a connection to a Server.
-        For performance of the API calls, a connection is
-        maintained up to _conn_timer, unless the force parameter
-        is set to True
+        Give a connection back to the IFL connection pool.
+        For performance of the API calls, the connection is
+        kept open for reuse unless the force parameter is set to
+        True or the connect timeout is 0
 
         :param conn: Server connection
         :param force: If true then diconnect forcefully
         :type force: bool
         """
-        if ((conn is not None and conn >= 0) and
-            (force or
-             (self._conn_timeout == 0 or
-              (self._conn_timer is not None and
-               (time.time() - self._conn_timer > self._conn_timeout))))):
-            pbs_disconnect(conn)
-            self._conn_timer = None
+        if conn is None or conn < 0:
+            return
+        close = force or self._conn_timeout == 0
+        IFLConnectionPool.release(conn, close=close)
+        if close and conn == self._conn:
             self._conn = None
 
     def set_connect_timeout(self, timeout=0):
         """
-        Set server connection timeout
+        Set server connection timeout, the idle time in seconds after
+        which a pooled connection is checked before it is reused. A
+        timeout of 0 closes the connection after every call.
 
         :param timeout: Timeout value
         :type timeout: int
@@ -4916,6 +5178,7 @@ class Server(PBSService):
         :param launcher: Optional utility to invoke the launch of the service
         :type launcher: str or list
         """
+        self._status_changed()
         if args is not None or launcher is not None:
             rv = super(Server, self)._start(inst=self, args=args,
                                             launcher=launcher)
@@ -4937,6 +5200,7 @@ class Server(PBSService):
         :param sig: Signal to stop PBS server
         :type sig: str
         """
+        self._status_changed()
         if sig is not None:
             self.logger.info(self.logprefix + 'stopping Server on host ' +
                              self.hostname)
@@ -4951,6 +5215,7 @@ class Server(PBSService):
                                       force=True)
             rc = True
         self._disconnect(self._conn, force=True)
+        IFLConnectionPool.drain(self.hostname)
         return rc
 
     def restart(self):
@@ -5438,7 +5703,7 @@ class Server(PBSService):
 #
     def status(self, obj_type=SERVER, attrib=None, id=None,
                extend=None, level=logging.INFO, db_access=None, runas=None,
-               resolve_indirectness=False, logerr=True):
+               resolve_indirectness=False, logerr=True, max_age=None):
         """
         Stat any PBS object ``[queue, server, node, hook, job,
         resv, sched]``.If the Server is setup from diag input,
@@ -5474,6 +5739,10 @@ class Server(PBSService):
         :type resolve_indirectness: bool
         :param logerr: If True (default) logs run_cmd errors
         :type logerr: bool
+        :param max_age: When the status cache is enabled, the maximum
+                        age in seconds of a snapshot to serve instead
+                        of the cache default. 0 always queries PBS
+        :type max_age: int or float or None
 
         In addition to standard IFL stat call, this wrapper handles
         a few cases that aren't implicitly offered by pbs_stat*,
@@ -5527,6 +5796,18 @@ class Server(PBSService):
                     _b[PTL_FORMULA] = _formulas[_b['id']]
             return bsl
 
+        # Serve data from a status snapshot when the cache is enabled
+        cache_key = None
+        if (self._status_cache is not None and runas is None and
+                not db_access and obj_type not in self.diagmap and
+                obj_type not in (HOOK, PBS_HOOK)):
+            cache_key = self._status_key(obj_type, attrib, id, extend,
+                                         resolve_indirectness)
+            cached = self._status_cached(cache_key, max_age)
+            if cached is not None:
+                return cached
+            cache_stamp = (self._change_epoch, time.time())
+
         # 3- Serve data from database if requested... and available for the
         # given object type
         if db_access and obj_type in (SERVER, SCHED, NODE, QUEUE, RESV, JOB):
@@ -5728,6 +6009,9 @@ class Server(PBSService):
                 bs = pbs_statrsc(c, id, a, extend)
             elif obj_type in (HOOK, PBS_HOOK):
                 if os.getuid() != 0:
+                    # manager gets its own connection from the pool
+                    self._disconnect(c)
+                    c = None
                     try:
                         rc = self.manager(MGR_CMD_LIST, obj_type, attrib,
                                           id, level=level)
@@ -5791,8 +6075,89 @@ class Server(PBSService):
                                     _b[k] = l[k]
                                     break
             del nodes
+        if cache_key is not None:
+            self._status_store(cache_key, cache_stamp, bsl)
         return bsl
 
+    def enable_status_cache(self, max_age=None):
+        """
+        Serve repeated status calls from snapshots of earlier ones.
+        Snapshots are keyed by object type, id and attribute set, and
+        are invalidated by every call made through this Server that
+        changes the state of PBS, such as submit, manager, deljob,
+        alterjob or runjob. expect always queries PBS.
+
+        Changes made behind the Server's back, such as jobs run by
+        the scheduler, are only seen once a snapshot is older than
+        max_age.
+
+        :param max_age: Maximum age in seconds of a snapshot. None,
+                        the default, bounds snapshots by changes only
+        :type max_age: int or float or None
+        """
+        self._status_cache = {}
+        self._status_cache_max_age = max_age
+        self.status_cache_stats = {'hits': 0, 'misses': 0}
+
+    def disable_status_cache(self):
+        """
+        Stop serving status calls from snapshots and drop them
+        """
+        self._status_cache = None
+
+    def _status_changed(self):
+        """
+        Move the change epoch, invalidating all status snapshots
+        """
+        self._change_epoch += 1
+        if self._status_cache:
+            self._status_cache.clear()
+
+    @staticmethod
+    def _status_key(obj_type, attrib, id, extend, resolve_indirectness):
+        """
+        Key of the status snapshot of a status call
+        """
+        if isinstance(attrib, dict):
+            attrib = frozenset(attrib.keys())
+        elif isinstance(attrib, (list, tuple, set)):
+            attrib = frozenset(attrib)
+        if isinstance(id, list):
+            id = tuple(id)
+        return (obj_type, id, attrib, extend, resolve_indirectness)
+
+    def _status_cached(self, key, max_age=None, copy=True):
+        """
+        Return a copy of the snapshot for key when it is of the
+        current change epoch and no older than max_age, None
+        otherwise. With copy set to False the snapshot itself is
+        returned
+        """
+        if max_age is None:
+            max_age = self._status_cache_max_age
+        entry = self._status_cache.get(key)
+        if entry is not None:
+            ((epoch, stamp), bsl) = entry
+            if (epoch == self._change_epoch and
+                    (max_age is None or time.time() - stamp < max_age)):
+                self.status_cache_stats['hits'] += 1
+                if not copy:
+                    return bsl
+                return [dict(d) for d in bsl]
+        self.status_cache_stats['misses'] += 1
+        return None
+
+    def _status_store(self, key, cache_stamp, bsl, copy=True):
+        """
+        Keep a snapshot of bsl under key unless the state of PBS
+        changed while it was being queried
+        """
+        if (self._status_cache is not None and bsl is not None and
+                cache_stamp[0] == self._change_epoch):
+            if copy:
+                bsl = [dict(d) for d in bsl]
+            self._status_cache[key] = (cache_stamp, bsl)
+
     def submit_interactive_job(self, job, cmd):
         """
         submit an ``interactive`` job. Returns a job identifier
@@ -5838,6 +6203,7 @@ class Server(PBSService):
         :type submit_dir: str or None
         :raises: PbsSubmitError
         """
+        self._status_changed()
 
         _interactive_job = False
         as_script = False
@@ -6100,6 +6466,151 @@ class Server(PBSService):
 
         return objid
 
+    def submit_many(self, jobs, concurrency=1, extend=None, submit_dir=None):
+        """
+        Submit a list of jobs. Returns the job identifiers in the
+        order of the jobs or raises PbsSubmitError on the first error.
+
+        Jobs of the same user with identical script bodies are
+        submitted from one script file. A job with a script body but
+        no script file gets its file created here, so that identical
+        jobs only write one. Up to concurrency submissions run at
+        once. In API mode, the jobs of the current user are submitted
+        by each worker over its own pooled connection, while the jobs
+        of any other user go through pbs_api_as, which starts one
+        pbs_as process per job and uses no pooled connection, so that
+        concurrency only overlaps those processes.
+
+        The latency of each submission is summarized in
+        ``last_submit_stats``
+
+        :param jobs: The Job instances to submit
+        :type jobs: list
+        :param concurrency: Number of submissions to run at once.
+                            Defaults to 1
+        :type concurrency: int
+        :param extend: Optional extension to the IFL call.
+                       see pbs_ifl.h
+        :type extend: str or None
+        :param submit_dir: directory from which jobs are submitted.
+                           Defaults to the home directory of each
+                           job owner
+        :type submit_dir: str or None
+        :raises: PbsSubmitError
+        """
+        api = self.get_op_mode() == PTL_API
+        scripts = {}
+        for i, job in enumerate(jobs):
+            if job.script_body is None:
+                continue
+            if job.username != self.current_user and not self._is_local:
+                # the script is removed once copied to the server host
+                continue
+            key = (job.username, job.script_body)
+            if key not in scripts:
+                if job.script is None:
+                    job.create_script(job.script_body)
+                scripts[key] = job.script
+                continue
+            job.script = scripts[key]
+            if api:
+                # API submissions default the output files to the script
+                # path, keep them apart for jobs sharing a script
+                fn = self.hostname + ':' + job.script + '.%d' % i
+                if ATTR_o not in job.attributes:
+                    job.attributes[ATTR_o] = fn + '.o'
+                if ATTR_e not in job.attributes:
+                    job.attributes[ATTR_e] = fn + '.e'
+
+        # submit chdirs to the submit directory and back, workers can
+        # only share the process cwd while they use the same directory
+        groups = OrderedDict()
+        for i, job in enumerate(jobs):
+            d = submit_dir
+            if d is None:
+                d = pwd.getpwnam(job.username)[5]
+            groups.setdefault(d, []).append(i)
+
+        ids = [None] * len(jobs)
+        latencies = [None] * len(jobs)
+        errors = []
+        lock = threading.Lock()
+
+        def worker(d, pending):
+            while True:
+                with lock:
+                    if errors or not pending:
+                        return
+                    i = pending.pop()
+                t = time.time()
+                try:
+                    ids[i] = self.submit(jobs[i], extend=extend, submit_dir=d)
+                except Exception as e:
+                    with lock:
+                        errors.append(e)
+                    return
+                latencies[i] = time.time() - t
+
+        def thread_worker(d, pending):
+            # thread idents are reused, do not leave this thread's
+            # connection behind for a later thread to pick up
+            try:
+                worker(d, pending)
+            finally:
+                self._conn = None
+
+        cwd = os.getcwd()
+        start = time.time()
+        try:
+            for d, pending in groups.items():
+                os.chdir(d)
+                pending.reverse()
+                nthreads = min(max(concurrency, 1), len(pending))
+                if nthreads == 1:
+                    worker(d, pending)
+                else:
+                    threads = [threading.Thread(target=thread_worker,
+                                                args=(d, pending))
+                               for _ in range(nthreads)]
+                    for t in threads:
+                        t.start()
+                    for t in threads:
+                        t.join()
+                if errors:
+                    break
+        finally:
+            try:
+                os.chdir(cwd)
+            except OSError:
+                pass
+        elapsed = time.time() - start
+        self._submit_stats(sorted([l for l in latencies if l is not None]),
+                           concurrency, elapsed)
+        if errors:
+            raise errors[0]
+        return ids
+
+    def _submit_stats(self, latencies, concurrency, elapsed):
+        """
+        Set ``last_submit_stats`` from the sorted latencies of the
+        submissions made by submit_many
+        """
+        from ptl.utils.pbs_logutils import PBSLogUtils
+        pct = PBSLogUtils.percentile
+        stats = {'count': len(latencies), 'concurrency': concurrency,
+                 'elapsed': elapsed}
+        if latencies:
+            stats.update({'min': latencies[0], 'p50': pct(latencies, .5),
+                          'p90': pct(latencies, .9),
+                          'p99': pct(latencies, .99), 'max': latencies[-1],
+                          'mean': sum(latencies) / len(latencies)})
+            self.logger.info(self.logprefix + 'submitted %d jobs in %.2fs, '
+                             'latency p50=%.4fs p90=%.4fs p99=%.4fs '
+                             'max=%.4fs' % (len(latencies), elapsed,
+                                            stats['p50'], stats['p90'],
+                                            stats['p99'], stats['max']))
+        self.last_submit_stats = stats
+
     def deljob(self, id=None, extend=None, runas=None, wait=False,
                logerr=True, attr_W=None):
         """
@@ -6121,6 +6632,7 @@ class Server(PBSService):
         :type attr_w: str
         :raises: PbsDeljobError
         """
+        self._status_changed()
         prefix = 'delete job on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -6178,9 +6690,8 @@ class Server(PBSService):
         if c:
             self._disconnect(c)
         if wait:
-            for oid in id:
-                self.expect(JOB, 'queue', id=oid, op=UNSET, runas=runas,
-                            level=logging.DEBUG)
+            self.expect_all([(JOB, oid, 'queue') for oid in id], op=UNSET,
+                            runas=runas, level=logging.DEBUG)
         return rc
 
     def delresv(self, id=None, extend=None, runas=None, wait=False,
@@ -6202,6 +6713,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsDeljobError
         """
+        self._status_changed()
         prefix = 'delete resv on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -6251,9 +6763,8 @@ class Server(PBSService):
         if c:
             self._disconnect(c)
         if wait:
-            for oid in id:
-                self.expect(RESV, 'queue', id=oid, op=UNSET, runas=runas,
-                            level=logging.DEBUG)
+            self.expect_all([(RESV, oid, 'queue') for oid in id], op=UNSET,
+                            runas=runas, level=logging.DEBUG)
         return rc
 
     def delete(self, id=None, extend=None, runas=None, wait=False,
@@ -6475,6 +6986,7 @@ class Server(PBSService):
         When expect is ``True``, return the value, ``True/False``,
         returned by expect
         """
+        self._status_changed()
 
         if isinstance(id, str):
             oid = id.split(',')
@@ -6716,6 +7228,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsSignalError
         """
+        self._status_changed()
 
         prefix = 'signal on ' + self.shortname
         if runas is not None:
@@ -6789,6 +7302,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsMessageError
         """
+        self._status_changed()
         prefix = 'msgjob on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -6883,6 +7397,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsAlterError
         """
+        self._status_changed()
         prefix = 'alter on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -6955,6 +7470,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsHoldError
         """
+        self._status_changed()
         prefix = 'holdjob on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -7024,6 +7540,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsReleaseError
         """
+        self._status_changed()
         prefix = 'release on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -7089,6 +7606,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsRerunError
         """
+        self._status_changed()
         prefix = 'rerun on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -7158,6 +7676,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsOrderJob
         """
+        self._status_changed()
         prefix = 'orderjob on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -7223,6 +7742,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsRunError
         """
+        self._status_changed()
         if async:
             prefix = 'Async run on ' + self.shortname
         else:
@@ -7305,6 +7825,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsMoveError
         """
+        self._status_changed()
         prefix = 'movejob on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -7379,6 +7900,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsQtermError
         """
+        self._status_changed()
         prefix = 'terminate ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -7484,6 +8006,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsQdisableError
         """
+        self._status_changed()
         prefix = 'qdisable on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -7531,6 +8054,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsQenableError
         """
+        self._status_changed()
         prefix = 'qenable on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -7578,6 +8102,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsQstartError
         """
+        self._status_changed()
         prefix = 'qstart on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -7624,6 +8149,7 @@ class Server(PBSService):
         :type logerr: bool
         :raises: PbsQstopError
         """
+        self._status_changed()
         prefix = 'qstop on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -7983,6 +8509,7 @@ class Server(PBSService):
         :type logerr: bool.
         :raises: PbsResvAlterError.
         """
+        self._status_changed()
         prefix = 'reservation alter on ' + self.shortname
         if runas is not None:
             prefix += ' as ' + str(runas)
@@ -8043,6 +8570,13 @@ class Server(PBSService):
         expect an attribute to match a given value as per an
         operation.
 
+        The object is polled until the attributes match or a deadline
+        of max_attempts times interval seconds passes. The wait between
+        polls starts at ``expect_min_interval`` and doubles after every
+        poll, up to interval if one is given, else up to
+        ``expect_max_interval``, so that conditions met right away are
+        seen right away.
+
         :param obj_type: The type of object to query, JOB, SERVER,
                          SCHEDULER, QUEUE NODE
         :type obj_type: str
@@ -8056,8 +8590,8 @@ class Server(PBSService):
                        PTL_AND, PTL_OR when an PTL_AND is used, only
                        batch objects having all matches are
                        returned, otherwise an OR is applied
-        :param attempt: The number of times this function has been
-                        called
+        :param attempt: The number of attempts already made, which
+                        shortens the deadline accordingly
         :type attempt: int
         :param max_attempts: The maximum number of attempts to
                              perform.C{param_max_attempts}: 5
@@ -8074,13 +8608,16 @@ class Server(PBSService):
         :param runas: query as a given user. Defaults to current
                       user
         :type runas: str or None
-        :param msg: Message from last call of this function, this
-                    message will be used while raising
-                    PtlExpectError.
+        :param msg: Message to use while raising PtlExpectError if
+                    no check is made.
         :type msg: str or None
 
         :returns: True if attributes are as expected and False
                   otherwise
+
+        The number of polls made and the time it took for the
+        attributes to match are logged, and kept in ``last_expect``
+        as a dictionary with keys ``attempts`` and ``elapsed``.
         """
 
         if attempt == 0 and offset > 0:
@@ -8097,17 +8634,230 @@ class Server(PBSService):
         if max_attempts is None:
             max_attempts = int(self.ptl_conf['expect_max_attempts'])
 
+        (wait, max_wait) = self._expect_waits(interval)
         if interval is None:
             interval = self.ptl_conf['expect_interval']
 
         if attempt >= max_attempts:
-            _msg = "expected on " + self.logprefix + msg
+            _msg = "expected on " + self.logprefix + str(msg)
             raise PtlExpectError(rc=1, rv=False, msg=_msg)
 
         if obj_type == SERVER and id is None:
             id = self.hostname
 
-        if isinstance(attrib, str):
+        (attrib, attrop) = self._expect_attribs(obj_type, attrib, attrop)
+
+        prefix = 'expect on ' + self.logprefix
+        msg = self._expect_msg(obj_type, attrib, id, op, attrop)
+
+        # Default count to True if the attribute contains an '=' in its name
+        # for example 'job_state=R' implies that a count of job_state is needed
+        if count is None and self.utils.operator_in_attribute(attrib):
+            count = True
+
+        start = time.time()
+        deadline = start + (max_attempts - attempt) * interval
+        attempts = 0
+        while True:
+            attempts += 1
+            amsg = list(msg)
+            if attempt + attempts > 1:
+                amsg += ['attempt:', str(attempt + attempts)]
+            self._status_changed()
+            failed = self._expect_once(obj_type, attrib, id, op, attrop,
+                                       count, extend, runas, amsg)
+            if failed is None:
+                elapsed = time.time() - start
+                self.last_expect = {'attempts': attempts, 'elapsed': elapsed}
+                self.logger.log(level, prefix + " ".join(amsg) +
+                                ' ...  OK (%d attempts, %.2fs)' %
+                                (attempts, elapsed))
+                return True
+            if failed.startswith(' no data for '):
+                self.logger.log(level, prefix + failed)
+            else:
+                self.logger.info(prefix + failed)
+            now = time.time()
+            if now >= deadline:
+                self.last_expect = {'attempts': attempts,
+                                    'elapsed': now - start}
+                _msg = "expected on " + self.logprefix + failed
+                raise PtlExpectError(rc=1, rv=False, msg=_msg)
+
+            # run custom actions defined for this object type
+            if self.actions and not failed.startswith(' no data for '):
+                for act_obj in self.actions.get_actions_by_type(obj_type):
+                    if act_obj.enabled:
+                        act_obj.action(self, obj_type, attrib, id, op,
+                                       attrop)
+
+            time.sleep(min(wait, max(deadline - time.time(), 0)))
+            wait = min(wait * 2, max_wait)
+
+    def _expect_waits(self, interval):
+        """
+        Returns the first and the longest waits between the polls of
+        expect and expect_all, the longest being the interval given
+        to them, or ``expect_max_interval`` if interval is None
+        """
+        if interval is None:
+            max_wait = self.ptl_conf['expect_max_interval']
+        else:
+            max_wait = interval
+        return (min(self.ptl_conf['expect_min_interval'], max_wait),
+                max_wait)
+
+    def expect_all(self, conditions, op=EQ, attrop=PTL_OR, max_attempts=None,
+                   interval=None, extend=None, offset=0, runas=None,
+                   level=logging.INFO):
+        """
+        expect attributes of several objects at once. Each poll
+        makes a single status call per object type, for all the
+        objects of that type, rather than one per object as calling
+        expect for each would, and only the conditions still unmet
+        are checked again. Polls are spaced and bounded as in expect.
+
+        :param conditions: The expectations, as a list of (obj_type,
+                           id, attrib) tuples, attrib being as given
+                           to expect. An id of None expects attrib
+                           on all the objects of type obj_type.
+        :type conditions: list
+        :param op: An operation to perform on the queried data,
+                   e.g., EQ, SET, LT,..
+        :param attrop: Operation on multiple attributes, either
+                       PTL_AND, PTL_OR
+        :param max_attempts: The maximum number of attempts to
+                             perform
+        :type max_attempts: int or None
+        :param interval: The interval time between attempts
+        :param extend: passed to the stat calls
+        :param offset: the time to wait before the initial check.
+                       Defaults to 0.
+        :type offset: int
+        :param runas: query as a given user. Defaults to current
+                      user
+        :type runas: str or None
+
+        :returns: True once all the conditions are met
+        :raises: PtlExpectError telling the conditions still unmet
+                 at the deadline, which are also kept in
+                 ``last_expect`` under the ``unmet`` key
+        """
+        if offset > 0:
+            self.logger.log(level, self.logprefix + 'expect offset set to ' +
+                            str(offset))
+            time.sleep(offset)
+
+        if max_attempts is None:
+            max_attempts = int(self.ptl_conf['expect_max_attempts'])
+
+        (wait, max_wait) = self._expect_waits(interval)
+        if interval is None:
+            interval = self.ptl_conf['expect_interval']
+
+        pending = []
+        for (obj_type, id, attrib) in conditions:
+            (attrib, cattrop) = self._expect_attribs(obj_type, attrib, attrop)
+            count = None
+            if self.utils.operator_in_attribute(attrib):
+                count = True
+            msg = self._expect_msg(obj_type, attrib, id, op, cattrop)
+            pending.append((obj_type, id, attrib, cattrop, count, msg))
+
+        prefix = 'expect_all on ' + self.logprefix
+        total = len(pending)
+        start = time.time()
+        deadline = start + max_attempts * interval
+        attempts = 0
+        while True:
+            attempts += 1
+            self._status_changed()
+            stats = {}
+            unmet = []
+            for cond in pending:
+                (obj_type, id, attrib, cattrop, count, msg) = cond
+                statlist = None
+                if not count:
+                    if obj_type not in stats:
+                        stats[obj_type] = self._expect_all_stat(
+                            obj_type, pending, extend, runas)
+                    (statall, byid) = stats[obj_type]
+                    if id is None:
+                        statlist = statall
+                    elif id in byid:
+                        statlist = byid[id]
+                    # objects not listed under id, such as jobs given by
+                    # a short id or subjobs, are checked with a status of
+                    # their own, not taken as gone
+                    if statlist is not None:
+                        # the checks decode the values in place
+                        statlist = [dict(st) for st in statlist]
+                failed = self._expect_once(obj_type, attrib, id, op,
+                                           cattrop, count, extend, runas,
+                                           msg, statlist)
+                if failed is not None:
+                    unmet.append((cond, failed))
+
+            now = time.time()
+            if len(unmet) == 0:
+                self.last_expect = {'attempts': attempts,
+                                    'elapsed': now - start, 'unmet': []}
+                self.logger.log(level, prefix + '%d conditions ...  OK '
+                                '(%d attempts, %.2fs)' %
+                                (total, attempts, now - start))
+                return True
+            pending = [cond for (cond, failed) in unmet]
+            self.logger.log(level, prefix + '%d of %d conditions unmet, '
+                            'attempt: %d, first: %s' %
+                            (len(unmet), total, attempts, unmet[0][1]))
+            if now >= deadline:
+                failures = [failed for (cond, failed) in unmet]
+                self.last_expect = {'attempts': attempts,
+                                    'elapsed': now - start,
+                                    'unmet': failures}
+                _msg = ('expected on ' + self.logprefix + '%d of %d '
+                        'conditions unmet: ' % (len(unmet), total) +
+                        '; '.join(failures))
+                raise PtlExpectError(rc=1, rv=False, msg=_msg)
+            time.sleep(min(wait, max(deadline - time.time(), 0)))
+            wait = min(wait * 2, max_wait)
+
+    def _expect_all_stat(self, obj_type, pending, extend, runas):
+        """
+        Returns the status of all the objects of type obj_type, with
+        the attributes the pending expect_all conditions on that type
+        look at, and the same status indexed by object id
+        """
+        attribs = set()
+        for (otype, id, attrib, attrop, count, msg) in pending:
+            if otype != obj_type or count:
+                continue
+            if len(attrib) == 0:
+                attribs = None
+                break
+            attribs.update(attrib.keys())
+        if attribs is not None:
+            attribs = list(attribs)
+        try:
+            statall = self.status(obj_type, attribs, level=logging.DEBUG,
+                                  extend=extend, runas=runas, logerr=False)
+        except PbsStatusError:
+            statall = []
+        byid = {}
+        for st in statall:
+            byid.setdefault(st.get('id'), []).append(st)
+        return (statall, byid)
+
+    def _expect_attribs(self, obj_type, attrib, attrop):
+        """
+        Returns the attributes to expect, given as a string, a list or
+        a dictionary, as a dictionary, along with the operation on
+        them. For jobs expected to run, a check of their substate is
+        added.
+        """
+        if attrib is None:
+            attrib = {}
+        elif isinstance(attrib, str):
             attrib = {attrib: ''}
         elif isinstance(attrib, list):
             d = {}
@@ -8131,8 +8881,13 @@ class Server(PBSService):
                 attrib['substate'] = add_attribs['substate']
                 attrop = PTL_AND
             del add_attribs, substate
+        return (attrib, attrop)
 
-        prefix = 'expect on ' + self.logprefix
+    def _expect_msg(self, obj_type, attrib, id, op, attrop):
+        """
+        Returns the words describing an expectation on the attributes
+        attrib of object id of type obj_type
+        """
         msg = []
         for k, v in attrib.items():
             args = None
@@ -8163,53 +8918,52 @@ class Server(PBSService):
         msg += [PBS_OBJ_MAP[obj_type]]
         if id is not None:
             msg += [str(id)]
-        if attempt > 0:
-            msg += ['attempt:', str(attempt + 1)]
-
-        # Default count to True if the attribute contains an '=' in its name
-        # for example 'job_state=R' implies that a count of job_state is needed
-        if count is None and self.utils.operator_in_attribute(attrib):
-            count = True
+        return msg
 
+    def _expect_stat(self, obj_type, attrib, id, op, attrop, count, extend,
+                     runas):
+        """
+        Returns the list of statuses to check an expectation against,
+        as counted when count is set
+        """
         if count:
             newattr = self.utils.convert_attributes_by_op(attrib)
             if len(newattr) == 0:
                 newattr = attrib
 
-            statlist = [self.counter(obj_type, newattr, id, extend, op=op,
-                                     attrop=attrop, level=logging.DEBUG,
-                                     runas=runas)]
-        else:
-            try:
-                statlist = self.status(obj_type, attrib, id=id,
-                                       level=logging.DEBUG, extend=extend,
-                                       runas=runas, logerr=False)
-            except PbsStatusError:
-                statlist = []
+            return [self.counter(obj_type, newattr, id, extend, op=op,
+                                 attrop=attrop, level=logging.DEBUG,
+                                 runas=runas)]
+        try:
+            return self.status(obj_type, attrib, id=id, level=logging.DEBUG,
+                               extend=extend, runas=runas, logerr=False)
+        except PbsStatusError:
+            return []
+
+    def _expect_once(self, obj_type, attrib, id, op, attrop, count, extend,
+                     runas, msg, statlist=None):
+        """
+        Checks an expectation once, against statlist if given, else
+        against a fresh status of the object.
+
+        :returns: None if the attributes are as expected, else the
+                  message telling what did not match
+        """
+        if statlist is None:
+            statlist = self._expect_stat(obj_type, attrib, id, op, attrop,
+                                         count, extend, runas)
 
         if (len(statlist) == 0 or statlist[0] is None or
                 len(statlist[0]) == 0):
             if op == UNSET or list(set(attrib.values())) == [0]:
-                self.logger.log(level, prefix + " ".join(msg) + ' ...  OK')
-                return True
-            else:
-                time.sleep(interval)
-                msg = " no data for " + " ".join(msg)
-                self.logger.log(level, prefix + msg)
-                return self.expect(obj_type, attrib, id, op, attrop,
-                                   attempt + 1, max_attempts, interval, count,
-                                   extend, level=level, msg=msg)
-
-        if attrib is None:
-            time.sleep(interval)
-            return self.expect(obj_type, attrib, id, op, attrop, attempt + 1,
-                               max_attempts, interval, count, extend,
-                               runas=runas, level=level, msg=" ".join(msg))
+                return None
+            return " no data for " + " ".join(msg)
 
         for k, v in attrib.items():
+            kop = op
             varargs = None
             if isinstance(v, tuple):
-                op = v[0]
+                kop = v[0]
                 if len(v) > 2:
                     varargs = v[2:]
                 v = v[1]
@@ -8220,13 +8974,9 @@ class Server(PBSService):
                     if m:
                         stat[k] = m.group('version')
                     else:
-                        time.sleep(interval)
-                        return self.expect(obj_type, attrib, id, op, attrop,
-                                           attempt + 1, max_attempts, interval,
-                                           count, extend, runas=runas,
-                                           level=level, msg=" ".join(msg))
+                        return " ".join(msg)
                 if k not in stat:
-                    if op == UNSET:
+                    if kop == UNSET:
                         continue
                 else:
                     # functions/methods are invoked and their return value
@@ -8237,7 +8987,7 @@ class Server(PBSService):
                         else:
                             rv = v(stat[k])
                         if isinstance(rv, bool):
-                            if op == NOT:
+                            if kop == NOT:
                                 if not rv:
                                     continue
                             if rv:
@@ -8252,51 +9002,38 @@ class Server(PBSService):
                         stat[k] = LooseVersion(str(stat[k]))
                         v = LooseVersion(str(v))
 
-                    if op == EQ and stat[k] == v:
+                    if kop == EQ and stat[k] == v:
                         continue
-                    elif op == SET and count and stat[k] == v:
+                    elif kop == SET and count and stat[k] == v:
                         continue
-                    elif op == SET and count in (False, None):
+                    elif kop == SET and count in (False, None):
                         continue
-                    elif op == NE and stat[k] != v:
+                    elif kop == NE and stat[k] != v:
                         continue
-                    elif op == LT:
+                    elif kop == LT:
                         if stat[k] < v:
                             continue
-                    elif op == GT:
+                    elif kop == GT:
                         if stat[k] > v:
                             continue
-                    elif op == LE:
+                    elif kop == LE:
                         if stat[k] <= v:
                             continue
-                    elif op == GE:
+                    elif kop == GE:
                         if stat[k] >= v:
                             continue
-                    elif op == MATCH_RE:
+                    elif kop == MATCH_RE:
                         if re.search(str(v), str(stat[k])):
                             continue
-                    elif op == MATCH:
+                    elif kop == MATCH:
                         if str(stat[k]).find(str(v)) != -1:
                             continue
 
                 if k in stat:
-                    msg += [' got: ' + str(k) + ' = ' + str(stat[k])]
-                self.logger.info(prefix + " ".join(msg))
-                time.sleep(interval)
-
-                # run custom actions defined for this object type
-                if self.actions:
-                    for act_obj in self.actions.get_actions_by_type(obj_type):
-                        if act_obj.enabled:
-                            act_obj.action(self, obj_type, attrib, id, op,
-                                           attrop)
-
-                return self.expect(obj_type, attrib, id, op, attrop,
-                                   attempt + 1, max_attempts, interval, count,
-                                   extend, level=level, msg=" ".join(msg))
-
-        self.logger.log(level, prefix + " ".join(msg) + ' ...  OK')
-        return True
+                    return " ".join(msg + [' got: ' + str(k) + ' = ' +
+                                           str(stat[k])])
+                return " ".join(msg)
+        return None
 
     def is_history_enabled(self):
         """
@@ -8331,10 +9068,7 @@ class Server(PBSService):
                             wait=True)
             except:
                 pass
-        rv = self.expect(JOB, {'job_state': 0}, count=True, op=SET)
-        if not rv:
-            return self.cleanup_jobs(extend=extend, runas=runas)
-        return rv
+        return self.expect(JOB, {'job_state': 0}, count=True, op=SET)
 
     def cleanup_reservations(self, extend=None, runas=None):
         """
@@ -8490,7 +9224,7 @@ class Server(PBSService):
         :param attrop: Operation on multiple attributes, either
                        PTL_AND, PTL_OR
         :param bslist: Optional, use a batch status dict list
-                       instead of an obj_type
+                       or a StatusIndex instead of an obj_type
         :param idonly: if true, return the name/id of the matching
                        objects
         :type idonly: bool
@@ -8536,8 +9270,8 @@ class Server(PBSService):
                    queried. SET or None
         :type op: str or None
         :param bslist: Optional, use a batch status dict list
-                       instead of an obj_type
-        :type bslist: List or None
+                       or a StatusIndex instead of an obj_type
+        :type bslist: List or StatusIndex or None
         :param idonly: if true, return the name/id of the matching
                        objects
         :type idonly: bool
@@ -8549,7 +9283,8 @@ class Server(PBSService):
         """
         self.logit('filter: ', obj_type, attrib, id)
         return self._filter(obj_type, attrib, id, extend, op, attrop, bslist,
-                            PTL_FILTER, idonly, db_access, runas=runas,
+                            PTL_FILTER, idonly, grandtotal, db_access,
+                            runas=runas,
                             resolve_indirectness=resolve_indirectness)
 
     def _filter(self, obj_type=None, attrib=None, id=None, extend=None,
@@ -8557,19 +9292,35 @@ class Server(PBSService):
                 idonly=True, grandtotal=False, db_access=None, runas=None,
                 resolve_indirectness=False):
 
-        if bslist is None:
-            try:
-                _a = resolve_indirectness
-                tmp_bsl = self.status(obj_type, attrib, id,
-                                      level=logging.DEBUG, extend=extend,
-                                      db_access=db_access, runas=runas,
-                                      resolve_indirectness=_a)
-                del _a
-            except PbsStatusError:
-                return None
-
-            bslist = self.utils.filter_batch_status(tmp_bsl, attrib)
-            del tmp_bsl
+        index = None
+        index_key = None
+        if isinstance(bslist, StatusIndex):
+            index = bslist
+            bslist = index.bslist
+        elif bslist is None:
+            if (self._status_cache is not None and runas is None and
+                    not db_access):
+                index_key = ('index', self._status_key(
+                    obj_type, attrib, id, extend, resolve_indirectness))
+                index = self._status_cached(index_key, copy=False)
+            if index is None:
+                stamp = (self._change_epoch, time.time())
+                try:
+                    _a = resolve_indirectness
+                    tmp_bsl = self.status(obj_type, attrib, id,
+                                          level=logging.DEBUG, extend=extend,
+                                          db_access=db_access, runas=runas,
+                                          resolve_indirectness=_a)
+                    del _a
+                except PbsStatusError:
+                    return None
+                bslist = self.utils.filter_batch_status(tmp_bsl, attrib)
+                del tmp_bsl
+                if bslist is not None and index_key is not None:
+                    index = StatusIndex(bslist)
+                    self._status_store(index_key, stamp, index, copy=False)
+            else:
+                bslist = index.bslist
 
         if bslist is None:
             return None
@@ -8577,6 +9328,130 @@ class Server(PBSService):
         if isinstance(attrib, str):
             attrib = attrib.split(',')
 
+        if isinstance(attrib, dict):
+            ops = self._filter_ops(attrib, op)
+            if ops is None:
+                # the operator of an attribute depends on the ones before
+                return self._filter_scan(attrib, op, attrop, bslist, mode,
+                                         idonly, grandtotal)
+        elif not isinstance(attrib, list):
+            return {}
+        elif len(set(attrib)) != len(attrib):
+            return self._filter_scan(attrib, op, attrop, bslist, mode,
+                                     idonly, grandtotal)
+
+        if index is None:
+            index = StatusIndex(bslist)
+        total = {}
+
+        def add(ky, a, positions):
+            if mode == PTL_COUNTER:
+                if grandtotal:
+                    (pos, vals) = index.decoded(a)
+                    amts = dict(zip(pos, vals))
+                    incr = 0
+                    for i in positions:
+                        if isinstance(amts[i], (int, float)):
+                            incr += amts[i]
+                        else:
+                            incr += 1
+                else:
+                    incr = len(positions)
+                total[ky] = total.get(ky, 0) + incr
+            elif idonly:
+                total.setdefault(ky, []).extend(
+                    [bslist[i]['id'] for i in positions])
+            elif index_key is not None:
+                # objects of a kept index are not handed out
+                total.setdefault(ky, []).extend(
+                    [dict(bslist[i]) for i in positions])
+            else:
+                total.setdefault(ky, []).extend(
+                    [bslist[i] for i in positions])
+
+        if isinstance(attrib, list):
+            # when filtering on multiple values, ensure that they are
+            # all present on the object, otherwise skip
+            keep = None
+            if attrop == PTL_AND:
+                for a in attrib:
+                    pos = set(index.positions(a))
+                    if keep is None:
+                        keep = pos
+                    else:
+                        keep &= pos
+            for a in attrib:
+                if op == SET or (mode == PTL_COUNTER and grandtotal):
+                    groups = {a: index.positions(a)}
+                else:
+                    # Since this is a list of attributes, no operator
+                    # was provided so we settle on "equal"
+                    groups = OrderedDict()
+                    for v, positions in index.groups(a).items():
+                        groups[a + '=' + v] = positions
+                for k, positions in groups.items():
+                    if keep is not None:
+                        positions = [i for i in positions if i in keep]
+                    if positions:
+                        add(k, a, positions)
+            return total
+
+        matches = []
+        for (k, kop, val) in ops:
+            matches.append(index.match(k, kop, val))
+        if attrop == PTL_AND:
+            # only the objects matching every attribute are tracked
+            keep = None
+            for m in matches:
+                if keep is None:
+                    keep = set(m)
+                else:
+                    keep &= set(m)
+            if not keep:
+                return total
+            keep = sorted(keep)
+            matches = [keep] * len(ops)
+        for (k, kop, val), m in zip(ops, matches):
+            if kop == SET:
+                ky = k
+            else:
+                ky = k + PTL_OP_TO_STR[kop] + str(val)
+            if m:
+                add(ky, k, m)
+            elif (mode == PTL_COUNTER and attrop != PTL_AND and
+                    index.positions(k)):
+                # requesting specific key/value pairs should result
+                # in 0 available elements
+                total.setdefault(ky, 0)
+        return total
+
+    def _filter_ops(self, attrib, op):
+        """
+        Returns the operator and decoded value to filter each attribute
+        of attrib by, or None when the operator of an attribute given
+        without one depends on the attributes filtered before it
+        """
+        tuples = [isinstance(v, tuple) for v in attrib.values()]
+        if not all(tuples) and any(tuples):
+            if op == SET or [v for v in attrib.values()
+                             if isinstance(v, tuple) and v[0] == SET]:
+                return None
+        ops = []
+        for k, v in attrib.items():
+            if isinstance(v, tuple):
+                ops.append((k, v[0], self.utils.decode_value(v[1])))
+            elif op == SET:
+                ops.append((k, SET, None))
+            else:
+                ops.append((k, EQ, self.utils.decode_value(v)))
+        return ops
+
+    def _filter_scan(self, attrib, op, attrop, bslist, mode, idonly,
+                     grandtotal):
+        """
+        Filter bslist one object at a time, used when the operator of
+        the attributes can not be resolved ahead of time
+        """
         total = {}
         for bs in bslist:
             if isinstance(attrib, list):
@@ -8782,10 +9657,21 @@ class Server(PBSService):
                 return {}
 
         if bslist is None and obj_type is not None:
-            # To get the resources_assigned we must stat the entire object so
-            # bypass the specific attributes that would filter out assigned
+            # To get the resources_assigned we must stat the assigned
+            # counterpart of every resource available requested
             if op == RESOURCES_AVAILABLE:
-                bslist = self.status(obj_type, None, level=logging.DEBUG,
+                if db_access is None:
+                    statattr = attrib
+                    if isinstance(statattr, str):
+                        statattr = statattr.split(',')
+                    statattr = list(statattr)
+                    for a in list(statattr):
+                        if a.startswith('resources_available.'):
+                            statattr.append(a.replace('resources_available.',
+                                                      'resources_assigned.'))
+                else:
+                    statattr = None
+                bslist = self.status(obj_type, statattr, level=logging.DEBUG,
                                      db_access=db_access,
                                      resolve_indirectness=resolve_indirectness)
             else:
@@ -8805,58 +9691,94 @@ class Server(PBSService):
             attrib = attrib.split(',')
 
         self.logger.debug("building equivalence class")
+        # The class of an object only depends on the values of the
+        # attributes it is built from, its signature, so it is computed
+        # once per distinct signature
+        sigkeys = list(attrib)
+        if op == RESOURCES_AVAILABLE:
+            for a in attrib:
+                if a.startswith('resources_available.'):
+                    sigkeys.append(a.replace('resources_available.',
+                                             'resources_assigned.'))
+        missing = object()
+        sigs = {}
         equiv = {}
+        members = {}
         for bs in bslist:
-            cls = ()
-            skip_cls = False
-            # attrs will be part of the EquivClass object
-            attrs = {}
-            # Filter the batch attributes by the attribs requested
-            for a in attrib:
-                if a in bs:
-                    amt = self.utils.decode_value(bs[a])
-                    if a.startswith('resources_available.'):
-                        val = a.replace('resources_available.', '')
-                        if (op == RESOURCES_AVAILABLE and
-                                'resources_assigned.' + val in bs):
-                            amt = (int(amt) - int(self.utils.decode_value(
-                                   bs['resources_assigned.' + val])))
-                        # this case where amt goes negative is not a bug, it
-                        # may happen when computing whats_available due to the
-                        # fact that the computation is subtractive, it does
-                        # add back resources when jobs/reservations end but
-                        # is only concerned with what is available now for
-                        # a given duration, that is why in the case where
-                        # amount goes negative we set it to 0
-                        if amt < 0:
-                            amt = 0
-
-                        # TODO: not a failproof way to catch a memory type
-                        # but PbsTypeSize should return the right value if
-                        # it fails to parse it as a valid memory value
-                        if a.endswith('mem'):
-                            try:
-                                amt = PbsTypeSize().encode(amt)
-                            except:
-                                # we guessed the type incorrectly
-                                pass
-                    else:
-                        val = a
-                    if amt == 0 and not show_zero_resources:
-                        skip_cls = True
-                        break
-                    # Build the key of the equivalence class
-                    cls += (val + '=' + str(amt),)
-                    attrs[val] = amt
+            sig = tuple([bs.get(k, missing) for k in sigkeys])
+            try:
+                cls = sigs.get(sig)
+            except TypeError:
+                # unhashable values, no signature
+                sig = None
+                cls = None
+            if cls is None:
+                cls = self._equivalence_class(bs, attrib, op,
+                                              show_zero_resources)
+                if sig is not None:
+                    sigs[sig] = cls
+            (cls, attrs, skip_cls) = cls
             # Now that we are done with this object, add it to an equiv class
             if len(cls) > 0 and not skip_cls:
                 if cls in equiv:
-                    equiv[cls].add_entity(bs['id'])
+                    if bs['id'] not in members[cls]:
+                        members[cls].add(bs['id'])
+                        equiv[cls].entities.append(bs['id'])
                 else:
                     equiv[cls] = EquivClass(cls, attrs, [bs['id']])
+                    members[cls] = set([bs['id']])
 
         return equiv.values()
 
+    def _equivalence_class(self, bs, attrib, op, show_zero_resources):
+        """
+        Returns the key of the equivalence class of batch status bs,
+        its attributes, and whether the object is to be skipped. See
+        equivalence_classes
+        """
+        cls = ()
+        skip_cls = False
+        # attrs will be part of the EquivClass object
+        attrs = {}
+        # Filter the batch attributes by the attribs requested
+        for a in attrib:
+            if a in bs:
+                amt = self.utils.decode_value(bs[a])
+                if a.startswith('resources_available.'):
+                    val = a.replace('resources_available.', '')
+                    if (op == RESOURCES_AVAILABLE and
+                            'resources_assigned.' + val in bs):
+                        amt = (int(amt) - int(self.utils.decode_value(
+                               bs['resources_assigned.' + val])))
+                    # this case where amt goes negative is not a bug, it
+                    # may happen when computing whats_available due to the
+                    # fact that the computation is subtractive, it does
+                    # add back resources when jobs/reservations end but
+                    # is only concerned with what is available now for
+                    # a given duration, that is why in the case where
+                    # amount goes negative we set it to 0
+                    if amt < 0:
+                        amt = 0
+
+                    # TODO: not a failproof way to catch a memory type
+                    # but PbsTypeSize should return the right value if
+                    # it fails to parse it as a valid memory value
+                    if a.endswith('mem'):
+                        try:
+                            amt = PbsTypeSize().encode(amt)
+                        except:
+                            # we guessed the type incorrectly
+                            pass
+                else:
+                    val = a
+                if amt == 0 and not show_zero_resources:
+                    skip_cls = True
+                    break
+                # Build the key of the equivalence class
+                cls += (val + '=' + str(amt),)
+                attrs[val] = amt
+        return (cls, attrs, skip_cls)
+
     def show_equivalence_classes(self, eq=None, obj_type=None, attrib={},
                                  bslist=None, op=RESOURCES_AVAILABLE,
                                  show_zero_resources=True, db_access=None,
@@ -8896,6 +9818,10 @@ class Server(PBSService):
                       queried locally
         :param nodes: nodes to consider, if None, they are queried
                       locally
+
+        .. note:: The nodes, jobs and reservations are left untouched,
+                  availability is computed on per-node snapshots of
+                  the attributes requested
         """
 
         if attrib is None:
@@ -8914,49 +9840,54 @@ class Server(PBSService):
             self.status(NODE)
             nodes = self.nodes
 
-        nodes_id = nodes.keys()
-        avail_nodes_by_time = {}
-
-        def alloc_resource(self, node, resources):
-            # helper function. Must work on a scratch copy of nodes otherwise
-            # resources_available will get corrupted
+        attrib = [a for a in attrib if a != 'state']
+        rscs = [a.replace('resources_available.', '') for a in attrib
+                if a.startswith('resources_available.')]
+        # Nodes are tracked by the attributes that make up their class
+        # only: the attributes requested, the resources assigned, and
+        # what is left available of each requested resource as the
+        # reservations and jobs that will run on them are accounted for
+        keys = attrib + ['resources_assigned.' + r for r in rscs]
+        base = {}
+        avail = {}
+        for n, node in nodes.items():
+            base[n] = dict([(k, node.attributes[k]) for k in keys
+                            if k in node.attributes])
+            base[n]['id'] = node.attributes.get('id', n)
+            avail[n] = {}
+
+        def snapshot(n):
+            d = base[n].copy()
+            for r, v in avail[n].items():
+                d['resources_available.' + r] = v
+            return d
+
+        def alloc_resource(n, resources):
             for rsc, value in resources.items():
+                if rsc not in rscs:
+                    continue
                 if isinstance(value, int) or value.isdigit():
-                    avail = node.attributes['resources_available.' + rsc]
-                    nvalue = int(avail) - int(value)
-                    node.attributes['resources_available.' + rsc] = nvalue
+                    key = 'resources_available.' + rsc
+                    if key not in base[n]:
+                        continue
+                    cur = avail[n].get(rsc, base[n][key])
+                    avail[n][rsc] = int(cur) - int(value)
 
-        # Account for reservations
+        # The events are the start times of the reservations and of the
+        # jobs estimated to run, each taking resources on its nodes
+        events = []
         for resv in resvs.values():
             resvnodes = resv.execvnode('resv_nodes')
             if resvnodes:
                 starttime = self.utils.convert_stime_to_seconds(
                     resv.attributes['reserve_start'])
-                for node in resvnodes:
-                    for n, resc in node.items():
-                        tm = int(starttime) - int(self.ctime)
-                        if tm < 0 or n not in nodes_id:
-                            continue
-                        if tm not in avail_nodes_by_time:
-                            avail_nodes_by_time[tm] = []
-                        if nodes[n].attributes['sharing'] in ('default_excl',
-                                                              'force_excl'):
-                            avail_nodes_by_time[tm].append(nodes[n])
-                            try:
-                                nodes_id.remove(n)
-                            except:
-                                pass
-                        else:
-                            ncopy = copy.copy(nodes[n])
-                            ncopy.attributes = copy.deepcopy(
-                                nodes[n].attributes)
-                            avail_nodes_by_time[tm].append(ncopy)
-                            self.alloc_resource(nodes[n], resc)
+                events.append((int(starttime) - int(self.ctime), resvnodes,
+                               False))
 
         # go on to look at the calendar of scheduled jobs to run and set
         # the node availability according to when the job is estimated to
         # start on the node
-        for job in self.jobs.values():
+        for job in jobs.values():
             if (job.attributes['job_state'] != 'R' and
                     'estimated.exec_vnode' in job.attributes):
                 estimatednodes = job.execvnode('estimated.exec_vnode')
@@ -8968,35 +9899,37 @@ class Server(PBSService):
                         starttime = st.split()[0]
                     else:
                         starttime = self.utils.convert_stime_to_seconds(st)
-                    for node in estimatednodes:
-                        for n, resc in node.items():
-                            tm = int(starttime) - int(self.ctime)
-                            if (tm < 0 or n not in nodes_id or
-                                    nodes[n].state != 'free'):
-                                continue
-                            if tm not in avail_nodes_by_time:
-                                avail_nodes_by_time[tm] = []
-                            if (nodes[n].attributes['sharing'] in
-                                    ('default_excl', 'force_excl')):
-                                avail_nodes_by_time[tm].append(nodes[n])
-                                try:
-                                    nodes_id.remove(n)
-                                except:
-                                    pass
-                            else:
-                                ncopy = copy.copy(nodes[n])
-                                ncopy.attributes = copy.deepcopy(
-                                    nodes[n].attributes)
-                                avail_nodes_by_time[tm].append(ncopy)
-                                self.alloc_resource(nodes[n], resc)
+                    events.append((int(starttime) - int(self.ctime),
+                                   estimatednodes, True))
+
+        # Sweep the events, a node is seen at the time of an event with
+        # what is left of it by the events before. Exclusive nodes are
+        # taken whole by their first event
+        taken = set()
+        avail_nodes_by_time = {}
+        for (tm, execvnode, freeonly) in events:
+            for node in execvnode:
+                for n, resc in node.items():
+                    if tm < 0 or n not in nodes or n in taken:
+                        continue
+                    if freeonly and nodes[n].state != 'free':
+                        continue
+                    if tm not in avail_nodes_by_time:
+                        avail_nodes_by_time[tm] = []
+                    avail_nodes_by_time[tm].append(snapshot(n))
+                    if (nodes[n].attributes.get('sharing') in
+                            ('default_excl', 'force_excl')):
+                        taken.add(n)
+                    else:
+                        alloc_resource(n, resc)
 
         # remaining nodes are free "forever"
-        for node in nodes_id:
-            if self.nodes[node].state == 'free':
+        for n in nodes.keys():
+            if n not in taken and nodes[n].state == 'free':
                 if 'infinity' not in avail_nodes_by_time:
-                    avail_nodes_by_time['infinity'] = [nodes[node]]
+                    avail_nodes_by_time['infinity'] = [snapshot(n)]
                 else:
-                    avail_nodes_by_time['infinity'].append(nodes[node])
+                    avail_nodes_by_time['infinity'].append(snapshot(n))
 
         # if there is a dedicated time, move the availaility time up to that
         # time as necessary
@@ -9018,8 +9951,6 @@ class Server(PBSService):
         # over time
         self.logger.debug("Building equivalence classes")
         whazzup = {}
-        if 'state' in attrib:
-            attrib.remove('state')
         for tm, nds in avail_nodes_by_time.items():
             equiv = self.equivalence_classes(VNODE, attrib, bslist=nds,
                                              show_zero_resources=False)
@@ -9262,14 +10193,14 @@ class Server(PBSService):
         if expect and num > 0:
             attrs = {'state': 'free'}
             attrs.update(attrib)
-            for vn in new_vnodelist:
-                self.expect(VNODE, attrs, id=vn)
+            self.expect_all([(VNODE, vn, attrs) for vn in new_vnodelist],
+                            attrop=PTL_AND)
         return True
 
     def create_moms(self, name=None, attrib=None, num=1, delall=True,
                     createnode=True, conf_prefix='pbs.conf_m',
                     home_prefix='pbs_m', momhosts=None, init_port=15011,
-                    step_port=2):
+                    step_port=2, expect=False):
         """
         Create MoM configurations and optionall add them to the
         server. Unique ``pbs.conf`` files are defined and created
@@ -9304,6 +10235,10 @@ class Server(PBSService):
         :param step_port: The increments at which ports are
                           allocated. Defaults to 2.
         :type step_port: int
+        :param expect: Whether to wait for the created nodes to be
+                       free, raising PtlExpectError if they are not.
+                       Defaults to False.
+        :type expect: bool
 
         .. note:: Since PBS requires that
                   PBS_MANAGER_SERVICE_PORT = PBS_MOM_SERVICE_PORT+1
@@ -9333,6 +10268,7 @@ class Server(PBSService):
             attrib = {}
 
         error = False
+        created = []
         for hostname in momhosts:
             _pconf = self.du.parse_pbs_config(hostname)
             if 'PBS_HOME' in _pconf:
@@ -9379,9 +10315,14 @@ class Server(PBSService):
                     if rc != 0:
                         self.logger.error("error creating node " + _n)
                         error = True
+                    else:
+                        created.append(_n)
         if error:
             return False
 
+        if expect and created:
+            self.expect_all([(NODE, n, {'state': 'free'}) for n in created])
+
         return True
 
     def create_hook(self, name, attrs):
@@ -10167,6 +11108,157 @@ class Server(PBSService):
                     pass
 
 
+class StatusIndex(object):
+
+    """
+    In-memory index over a batch status dictionary list, to answer
+    counter and filter queries without rescanning every object.
+
+    Per attribute, the index keeps the positions of the objects
+    that have it, a hash index of the objects by decoded value and
+    by value as displayed, and a sorted index of the numeric values,
+    sizes being decoded to kb, for the ranged operators. Indexes are
+    built on first use of an attribute.
+
+    :param bslist: Batch status dictionary list to index
+    :type bslist: List
+    """
+
+    def __init__(self, bslist):
+        self.bslist = bslist
+        self.utils = BatchUtils()
+        self._decoded = {}
+        self._byvalue = {}
+        self._bystr = {}
+        self._sorted = {}
+
+    def __len__(self):
+        return len(self.bslist)
+
+    def __iter__(self):
+        return iter(self.bslist)
+
+    def __getitem__(self, i):
+        return self.bslist[i]
+
+    def decoded(self, attr):
+        """
+        Returns the positions of the objects that have attribute attr
+        and the decoded value of attr on each
+        """
+        if attr not in self._decoded:
+            decode = self.utils.decode_value
+            pos = []
+            vals = []
+            for i, bs in enumerate(self.bslist):
+                if attr in bs:
+                    pos.append(i)
+                    vals.append(decode(bs[attr]))
+            self._decoded[attr] = (pos, vals)
+        return self._decoded[attr]
+
+    def positions(self, attr):
+        """
+        Returns the positions of the objects that have attribute attr
+        """
+        return self.decoded(attr)[0]
+
+    def groups(self, attr):
+        """
+        Returns the positions of the objects that have attribute attr
+        grouped by the value of attr as displayed, in order of the
+        first object of each group
+        """
+        if attr not in self._bystr:
+            groups = OrderedDict()
+            for i in self.positions(attr):
+                groups.setdefault(str(self.bslist[i][attr]), []).append(i)
+            self._bystr[attr] = groups
+        return self._bystr[attr]
+
+    def _hash(self, attr):
+        if attr not in self._byvalue:
+            byvalue = {}
+            unhashable = []
+            for i, v in zip(*self.decoded(attr)):
+                try:
+                    byvalue.setdefault(v, []).append(i)
+                except TypeError:
+                    unhashable.append((i, v))
+            self._byvalue[attr] = (byvalue, unhashable)
+        return self._byvalue[attr]
+
+    def _numeric(self, attr):
+        if attr not in self._sorted:
+            nums = []
+            others = []
+            for i, v in zip(*self.decoded(attr)):
+                if isinstance(v, (int, long, float)):
+                    nums.append((v, i))
+                else:
+                    others.append((i, v))
+            nums.sort()
+            self._sorted[attr] = ([n[0] for n in nums], [n[1] for n in nums],
+                                  others)
+        return self._sorted[attr]
+
+    def match(self, attr, op, val):
+        """
+        Returns the positions, in order, of the objects whose decoded
+        value of attribute attr compares to val with operator op, one
+        of SET, EQ, NE, LT, LE, GT, GE, MATCH or MATCH_RE
+
+        :param attr: The attribute to match
+        :type attr: str
+        :param op: The comparison operator
+        :param val: The decoded value to compare to
+        """
+        (pos, vals) = self.decoded(attr)
+        if op == SET:
+            return list(pos)
+        if op == EQ:
+            (byvalue, unhashable) = self._hash(attr)
+            try:
+                eq = list(byvalue.get(val, []))
+            except TypeError:
+                return [i for i, v in zip(pos, vals) if v == val]
+            if unhashable:
+                eq.extend([i for i, v in unhashable if v == val])
+                eq.sort()
+            return eq
+        if op == NE:
+            return [i for i, v in zip(pos, vals) if v != val]
+        if op in (LT, LE, GT, GE):
+            if not isinstance(val, (int, long, float)):
+                return [i for i, v in zip(pos, vals)
+                        if self._compare(v, op, val)]
+            (keys, kpos, others) = self._numeric(attr)
+            if op == LT:
+                found = kpos[:bisect.bisect_left(keys, val)]
+            elif op == LE:
+                found = kpos[:bisect.bisect_right(keys, val)]
+            elif op == GT:
+                found = kpos[bisect.bisect_right(keys, val):]
+            else:
+                found = kpos[bisect.bisect_left(keys, val):]
+            found = found + [i for i, v in others
+                             if self._compare(v, op, val)]
+            found.sort()
+            return found
+        if op == MATCH:
+            return [i for i, v in zip(pos, vals)
+                    if str(v).find(str(val)) != -1]
+        if op == MATCH_RE:
+            return [i for i, v in zip(pos, vals)
+                    if re.search(str(val), str(v))]
+        return []
+
+    @staticmethod
+    def _compare(amt, op, val):
+        return ((op == LT and amt < val) or (op == LE and amt <= val) or
+                (op == GT and amt > val) or (op == GE and amt >= val))
+
+
 class EquivClass(PBSObject):
 
     """
@@ -14236,6 +15328,10 @@ class PBSInitServices(object):
             msg += ' using ' + conf_file
         msg += ' init_cmd=%s' % (str(init_cmd))
         self.logger.info(msg)
+        if (op in ('start', 'stop', 'restart') and
+                daemon in (None, 'all', 'server')):
+            # connections to the old server instance are not reusable
+            IFLConnectionPool.drain(hostname)
         ret = self.du.run_cmd(hostname, init_cmd, as_script=_as,
                               logerr=False)
         if ret['rc'] != 0:
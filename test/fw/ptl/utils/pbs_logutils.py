@@ -35,6 +35,7 @@
 # "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
 # trademark licensing policies.
 
+import os
 import re
 import time
 import sys
@@ -219,6 +220,11 @@ class PBSLogUtils(object):
 
     logger = logging.getLogger(__name__)
     du = DshUtils()
+    # last log datetime converted and its value
+    _last_date_time = (None, None)
+    # seconds since epoch of the midnight of MM/DD/YYYY dates, None for
+    # the days on which the UTC offset changes
+    _day_epochs = {}
 
     @classmethod
     def convert_date_time(cls, datetime=None, fmt="%m/%d/%Y %H:%M:%S"):
@@ -235,6 +241,15 @@ class PBSLogUtils(object):
         if datetime is None:
             return None
 
+        if fmt == "%m/%d/%Y %H:%M:%S":
+            # log records come in bursts sharing the same second
+            if datetime == cls._last_date_time[0]:
+                return cls._last_date_time[1]
+            tm = cls._convert_log_date_time(datetime)
+            if tm is not None:
+                cls._last_date_time = (datetime, tm)
+                return tm
+
         try:
             t = time.strptime(datetime, fmt)
         except:
@@ -244,6 +259,59 @@ class PBSLogUtils(object):
         tm = int(time.mktime(t))
         return tm
 
+    @classmethod
+    def _convert_log_date_time(cls, datetime):
+        """
+        convert a ``MM/DD/YYYY HH:MM:SS`` datetime string into number
+        of seconds since epoch from the epoch of its date, or return
+        None to leave it to strptime and mktime
+        """
+        if (len(datetime) != 19 or datetime[2] != '/' or
+                datetime[5] != '/' or datetime[10] != ' ' or
+                datetime[13] != ':' or datetime[16] != ':'):
+            return None
+        date = datetime[:10]
+        hh = datetime[11:13]
+        mm = datetime[14:16]
+        ss = datetime[17:]
+        if not (hh.isdigit() and mm.isdigit() and ss.isdigit()):
+            return None
+        (hh, mm, ss) = (int(hh), int(mm), int(ss))
+        # the ranges accepted by strptime
+        if hh > 23 or mm > 59 or ss > 61:
+            return None
+        if date in cls._day_epochs:
+            day = cls._day_epochs[date]
+        else:
+            day = cls._day_epoch(date)
+            if len(cls._day_epochs) >= 1024:
+                cls._day_epochs.clear()
+            cls._day_epochs[date] = day
+        if day is None:
+            return None
+        return day + hh * 3600 + mm * 60 + ss
+
+    @staticmethod
+    def _day_epoch(date):
+        """
+        Number of seconds since epoch of the midnight of date, in
+        ``MM/DD/YYYY`` format, or None if date is invalid or the UTC
+        offset changes during that day
+        """
+        (m, d, y) = (date[:2], date[3:5], date[6:])
+        if not (m.isdigit() and d.isdigit() and y.isdigit()):
+            return None
+        (m, d, y) = (int(m), int(d), int(y))
+        try:
+            datetime.date(y, m, d)
+        except ValueError:
+            return None
+        start = time.mktime((y, m, d, 0, 0, 0, 0, 0, -1))
+        end = time.mktime((y, m, d + 1, 0, 0, 0, 0, 0, -1))
+        if end - start != 86400:
+            return None
+        return int(start)
+
     def get_num_lines(self, log, hostname=None, sudo=False):
         """
         Get the number of lines of particular log
@@ -334,7 +402,23 @@ class PBSLogUtils(object):
         :param endtime: If set ignore matches that occur after
                         specified time
         """
-        linecount = 0
+        return self.match_lines(lines, msg, allmatch=allmatch,
+                                regexp=regexp, starttime=starttime,
+                                endtime=endtime)[0]
+
+    def match_lines(self, lines, msg, linecount=0, allmatch=False,
+                    regexp=False, starttime=None, endtime=None):
+        """
+        As match_msg, numbering the lines searched from linecount,
+        to continue a search on lines appended to those searched
+        already
+
+        :param linecount: The number of lines counted by the search
+                          so far
+        :type linecount: int
+        :returns: A tuple of the result of match_msg and of the number
+                  of lines counted, including linecount
+        """
         ret = []
         if lines:
             for l in lines:
@@ -354,11 +438,11 @@ class PBSLogUtils(object):
                     if allmatch:
                         ret.append(m)
                     else:
-                        return m
+                        return (m, linecount + 1)
                 linecount += 1
         if len(ret) > 0:
-            return ret
-        return None
+            return (ret, linecount)
+        return (None, linecount)
 
     @staticmethod
     def convert_resv_date_time(date_time):
@@ -538,6 +622,128 @@ class PBSLogUtils(object):
         return paths
 
 
+class PBSLogFollower(object):
+
+    """
+    Follow a log file as it grows, keeping its lines in memory and
+    the byte offset up to which it was read, so that each update
+    only reads the lines appended since the previous one.
+
+    Followers are shared per host and log file, that is per host, log
+    type and day, see ``get``. The file is read again from the start
+    when its inode changes or it shrinks.
+
+    :param hostname: The host on which the log file is
+    :type hostname: str
+    :param filename: The path to the log file
+    :type filename: str
+    :param sudo: If True, read the file with sudo
+    :type sudo: bool
+    :param local: Whether the file is on the local host, determined
+                  from hostname when None
+    :type local: bool or None
+    """
+
+    logger = logging.getLogger(__name__)
+    du = DshUtils()
+    followers = {}
+
+    def __init__(self, hostname, filename, sudo=False, local=None):
+        self.hostname = hostname
+        self.filename = filename
+        self.sudo = sudo
+        if local is None:
+            local = self.du.is_localhost(hostname)
+        self.local = local
+        self.inode = None
+        self.offset = 0
+        self.lines = []
+        self._partial = ''
+
+    @classmethod
+    def get(cls, hostname, filename, sudo=False, local=None):
+        """
+        Return the follower of filename on hostname, creating it if
+        needed. The followers of the other days of the same log are
+        dropped.
+        """
+        key = (hostname, filename)
+        follower = cls.followers.get(key)
+        if follower is None:
+            logdir = os.path.dirname(filename)
+            for (h, f) in cls.followers.keys():
+                if h == hostname and os.path.dirname(f) == logdir:
+                    del cls.followers[(h, f)]
+            follower = cls(hostname, filename, sudo=sudo, local=local)
+            cls.followers[key] = follower
+        return follower
+
+    def reset(self, inode=None):
+        """
+        Forget the lines read, to read the file from its start
+        """
+        self.inode = inode
+        self.offset = 0
+        self.lines = []
+        self._partial = ''
+
+    def update(self):
+        """
+        Read the lines appended to the file since the last update
+
+        :returns: All the lines of the file read so far, without
+                  line terminators. The list is extended in place by
+                  later updates unless the file was rotated.
+        """
+        if self.local and not self.sudo:
+            try:
+                st = os.stat(self.filename)
+            except OSError:
+                self.reset()
+                return self.lines
+            (inode, size) = (st.st_ino, st.st_size)
+        else:
+            ret = self.du.run_cmd(self.hostname,
+                                  ['stat', '-c', '%i %s', self.filename],
+                                  sudo=self.sudo, logerr=False,
+                                  level=logging.DEBUG2)
+            try:
+                (inode, size) = map(int, ret['out'][0].split())
+            except (IndexError, ValueError):
+                self.reset()
+                return self.lines
+        if inode != self.inode or size < self.offset:
+            self.reset(inode)
+        if size > self.offset:
+            self._append(self._read(size))
+        return self.lines
+
+    def _read(self, size):
+        """
+        Read the file from the current offset up to size bytes
+        """
+        if self.local and not self.sudo:
+            with open(self.filename) as f:
+                f.seek(self.offset)
+                return f.read(size - self.offset)
+        cmd = ['tail', '-c', '+' + str(self.offset + 1), self.filename]
+        ret = self.du.run_cmd(self.hostname, cmd, sudo=self.sudo,
+                              level=logging.DEBUG2)
+        if ret['rc'] != 0:
+            return ''
+        # lines are returned split, restore their terminators and drop
+        # what was appended after the size was taken
+        data = ''.join([l + '\n' for l in ret['out']])
+        return data[:size - self.offset]
+
+    def _append(self, data):
+        self.offset += len(data)
+        lines = (self._partial + data).split('\n')
+        # the last line is kept until it is terminated
+        self._partial = lines.pop()
+        self.lines.extend(lines)
+
+
 class PBSLogAnalyzer(object):
     """
     Utility to analyze the PBS logs
@@ -46,6 +46,7 @@ import platform
 import socket
 import time
 import calendar
+import threading
 import ptl
 from ptl.utils.pbs_logutils import PBSLogAnalyzer
 from ptl.utils.pbs_dshutils import DshUtils
@@ -390,6 +391,10 @@ class PBSTestSuite(unittest.TestCase):
     :param root-users: colon-separated list of root users.
     :param build-users: colon-separated list of build users.
     :param clienthost: the hostnames to set in the MoM config file
+    :param max-parallel: the most hosts to initialize or revert at
+                         once. Defaults to 16.
+    :param host-timeout: the seconds given to initialize or revert a
+                         host. Defaults to 600.
     """
 
     logger = logging.getLogger(__name__)
@@ -410,6 +415,8 @@ class PBSTestSuite(unittest.TestCase):
     del_queues = True
     del_scheds = True
     del_vnodes = True
+    max_parallel = 16
+    host_timeout = 600
     server = None
     scheduler = None
     mom = None
@@ -564,6 +571,91 @@ class PBSTestSuite(unittest.TestCase):
         else:
             cls.conf['default_testcase_timeout'] = int(
                 cls.conf['default-testcase-timeout'])
+        if 'max-parallel' in cls.conf:
+            cls.max_parallel = int(cls.conf['max-parallel'])
+        if 'host-timeout' in cls.conf:
+            cls.host_timeout = int(cls.conf['host-timeout'])
+
+    @classmethod
+    def run_parallel(cls, func, items, names=None, max_parallel=None,
+                     timeout=None):
+        """
+        Call func on each of items over a bounded pool of threads
+
+        :param func: The function to call with each item
+        :param items: The items to call func with
+        :type items: list
+        :param names: The name of each item, used to report errors.
+                      Defaults to the items as strings.
+        :type names: list or None
+        :param max_parallel: The most calls to make at once. Defaults
+                             to the ``max-parallel`` parameter.
+        :type max_parallel: int or None
+        :param timeout: The seconds given to each call. Defaults to
+                        the ``host-timeout`` parameter.
+        :type timeout: int or None
+        :returns: A tuple of the values returned by func, in order of
+                  items, and of the list of (name, error) of the calls
+                  that raised an exception or timed out
+        """
+        if names is None:
+            names = [str(item) for item in items]
+        if max_parallel is None:
+            max_parallel = cls.max_parallel
+        if timeout is None:
+            timeout = cls.host_timeout
+        results = [None] * len(items)
+        errors = [None] * len(items)
+        if max_parallel <= 1 or len(items) <= 1:
+            for i, item in enumerate(items):
+                try:
+                    results[i] = func(item)
+                except Exception as e:
+                    errors[i] = e
+            return (results, [(names[i], e) for i, e in enumerate(errors)
+                              if e is not None])
+
+        cond = threading.Condition()
+        done = set()
+
+        def run(i):
+            try:
+                results[i] = func(items[i])
+            except Exception as e:
+                errors[i] = e
+            with cond:
+                done.add(i)
+                cond.notify()
+
+        pending = range(len(items))
+        pending.reverse()
+        running = {}
+        with cond:
+            while pending or running:
+                while pending and len(running) < max_parallel:
+                    i = pending.pop()
+                    t = threading.Thread(target=run, args=(i,))
+                    # a call that times out is left behind
+                    t.daemon = True
+                    running[i] = time.time() + timeout
+                    t.start()
+                now = time.time()
+                for i, deadline in running.items():
+                    if i in done:
+                        del running[i]
+                    elif now >= deadline:
+                        errors[i] = 'timed out after %ss' % str(timeout)
+                        del running[i]
+                if running and (not pending or
+                                len(running) >= max_parallel):
+                    cond.wait(max(min(running.values()) - now, 0))
+        return (results, [(names[i], e) for i, e in enumerate(errors)
+                          if e is not None])
+
+    @staticmethod
+    def _parallel_errors_msg(msg, errors):
+        return msg + ': ' + '; '.join(['%s: %s' % (n, str(e))
+                                       for (n, e) in errors])
 
     @classmethod
     def is_server_licensed(cls, server):
@@ -604,6 +696,8 @@ class PBSTestSuite(unittest.TestCase):
 
         initializes a remote server instance that is configured according to
         the remote file ``/etc/pbs.conf.12.0``
+
+        The instances are initialized in parallel, see run_parallel
         """
         endpoints = []
         if ((multiple in conf) and (conf[multiple] is not None)):
@@ -622,24 +716,39 @@ class PBSTestSuite(unittest.TestCase):
                 endpoints.append((tmp[0], None))
         else:
             endpoints = [(socket.gethostname(), None)]
-        objs = PBSServiceInstanceWrapper()
+        endpoints = [(name, objconf) for (name, objconf) in endpoints
+                     if not ((skip is not None) and (skip in conf) and
+                             ((name in conf[skip]) or (conf[skip] in name)))]
+        names = []
         for name, objconf in endpoints:
-            if ((skip is not None) and (skip in conf) and
-                    ((name in conf[skip]) or (conf[skip] in name))):
-                continue
             if objconf is not None:
-                n = name + '@' + objconf
+                names.append(name + '@' + objconf)
             else:
-                n = name
+                names.append(name)
+
+        def init(endpoint):
+            (name, objconf) = endpoint
             if getattr(cls, "server", None) is not None:
-                objs[n] = func(name, pbsconf_file=objconf,
-                               server=cls.server.hostname)
+                obj = func(name, pbsconf_file=objconf,
+                           server=cls.server.hostname)
             else:
-                objs[n] = func(name, pbsconf_file=objconf)
-            if objs[n] is None:
+                obj = func(name, pbsconf_file=objconf)
+            if obj is None:
                 _msg = 'Failed %s(%s, %s)' % (func.__name__, name, objconf)
                 raise setUpClassError(_msg)
-            objs[n].initialise_service()
+            obj.initialise_service()
+            return obj
+
+        (results, errors) = cls.run_parallel(init, endpoints, names)
+        if errors:
+            if len(errors) == 1 and isinstance(errors[0][1],
+                                               setUpClassError):
+                raise errors[0][1]
+            _msg = 'Failed %s' % (func.__name__)
+            raise setUpClassError(cls._parallel_errors_msg(_msg, errors))
+        objs = PBSServiceInstanceWrapper()
+        for n, obj in zip(names, results):
+            objs[n] = obj
         return objs
 
     @classmethod
@@ -830,10 +939,13 @@ class PBSTestSuite(unittest.TestCase):
 
     def revert_servers(self, force=False):
         """
-        Revert the values set for servers
+        Revert the values set for servers, in parallel
         """
-        for server in self.servers.values():
-            self.revert_server(server, force)
+        servers = self.servers.values()
+        (_, errors) = self.run_parallel(
+            lambda server: self.revert_server(server, force), servers,
+            [server.hostname for server in servers])
+        self._check_parallel_errors('Failed to revert servers', errors)
 
     def revert_comms(self, force=False):
         """
@@ -853,10 +965,34 @@ class PBSTestSuite(unittest.TestCase):
     def revert_moms(self, force=False):
         """
         Revert the values set for moms
+
+        The MoMs are reverted in parallel, their nodes are then
+        checked on the server one MoM at a time and expected free
+        all at once. Whether the server has any free node is only
+        checked with the first MoM, as the nodes of the others are
+        not waited for before checking the next one
         """
         self.del_all_nodes = True
-        for mom in self.moms.values():
-            self.revert_mom(mom, force)
+        moms = self.moms.values()
+        (_, errors) = self.run_parallel(
+            lambda mom: self._revert_mom_host(mom, force), moms,
+            [mom.hostname for mom in moms])
+        self._check_parallel_errors('Failed to revert moms', errors)
+        names = [self._revert_mom_node(mom, force, check_free=(i == 0))
+                 for i, mom in enumerate(moms)]
+        if names:
+            self.server.expect_all([(NODE, name, {ATTR_NODE_state: 'free'})
+                                    for name in names], interval=1)
+
+    def _check_parallel_errors(self, msg, errors):
+        """
+        Re-raise the error of a single failed host, fail with the
+        errors of all hosts when more than one failed
+        """
+        if len(errors) == 1 and isinstance(errors[0][1], Exception):
+            raise errors[0][1]
+        if errors:
+            self.fail(self._parallel_errors_msg(msg, errors))
 
     def revert_server(self, server, force=False):
         """
@@ -928,6 +1064,16 @@ class PBSTestSuite(unittest.TestCase):
         :param force: Option to reverse forcibly
         :type force: bool
         """
+        self._revert_mom_host(mom, force)
+        name = self._revert_mom_node(mom, force)
+        self.server.expect(NODE, {ATTR_NODE_state: 'free'}, id=name,
+                           interval=1)
+        return mom
+
+    def _revert_mom_host(self, mom, force=False):
+        """
+        Revert the MoM itself, restarting it if it is down
+        """
         rv = mom.isUp()
         if not rv:
             self.logger.error('mom ' + mom.hostname + ' is down')
@@ -942,6 +1088,19 @@ class PBSTestSuite(unittest.TestCase):
             self.assertTrue(rv, _msg)
             if 'clienthost' in self.conf:
                 mom.add_config({'$clienthost': self.conf['clienthost']})
+
+    def _revert_mom_node(self, mom, force=False, check_free=True):
+        """
+        Create the node of the MoM on the server when it is missing
+
+        :param check_free: if True, recreate the node of the MoM as
+                           the only node when the server has no free
+                           node
+        :type check_free: bool
+        :returns: The name of the node of the MoM
+        """
+        if (((self.revert_to_defaults and self.mom_revert_to_defaults) or
+                force) and check_free):
             a = {'state': 'free', 'resources_available.ncpus': (GE, 1)}
             nodes = self.server.counter(NODE, a, attrop=PTL_AND,
                                         level=logging.DEBUG)
@@ -981,9 +1140,7 @@ class PBSTestSuite(unittest.TestCase):
                     name = mom.shortname
                     self.server.manager(MGR_CMD_CREATE, NODE, None,
                                         mom.shortname)
-        self.server.expect(NODE, {ATTR_NODE_state: 'free'}, id=name,
-                           interval=1)
-        return mom
+        return name
 
     def analyze_logs(self):
         """
@@ -0,0 +1,98 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+from tests.functional import *
+
+
+class TestHookLogBuffer(TestFunctional):
+    """
+    This test suite tests the buffering of hook log messages enabled by
+    pbs.log_buffer_enable()
+    """
+    hook_body = """
+import pbs
+e = pbs.event()
+pbs.log_buffer_enable(max_age=None)
+for i in range(3):
+    pbs.logmsg(pbs.LOG_DEBUG, "%s buffered %%d", i)
+pbs.logmsg(pbs.EVENT_DEBUG4, "%s filtered %%s", e.job.id)
+# the job id is not assigned yet in a queuejob hook
+pbs.logjobmsg("0.logbuf", "%s job message")
+st = pbs.log_buffer_stats()
+pbs.logmsg(pbs.LOG_DEBUG, "%s pending=%%d dropped=%%d",
+           st['pending'], st['dropped'])
+%s
+"""
+
+    def setUp(self):
+        TestFunctional.setUp(self)
+        self.server.manager(MGR_CMD_SET, SERVER, {'log_events': 511})
+
+    def check_logs(self, tag, ending):
+        hook_attr = {'enabled': 'true', 'event': 'queuejob'}
+        body = self.hook_body % ((tag,) * 4 + (ending,))
+        self.server.create_import_hook('logbuf', hook_attr, body)
+        try:
+            self.server.submit(Job(TEST_USER))
+        except PbsSubmitError:
+            pass
+        for i in range(3):
+            self.server.log_match("%s buffered %d" % (tag, i))
+        self.server.log_match("%s job message" % tag)
+        self.server.log_match("%s pending=4 dropped=1" % tag)
+        self.server.log_match("%s filtered" % tag, existence=False,
+                              max_attempts=2)
+
+    def test_buffer_accept(self):
+        """
+        Check that buffered messages are written on accept, and that
+        messages not in the server's log_events are dropped
+        """
+        self.check_logs('accept', 'e.accept()')
+
+    def test_buffer_reject(self):
+        """
+        Check that buffered messages are written on reject
+        """
+        self.check_logs('reject', 'e.reject("rejected")')
+
+    def test_buffer_end_of_run(self):
+        """
+        Check that buffered messages are written when the hook ends without
+        accepting or rejecting the event
+        """
+        self.check_logs('end', 'pass')
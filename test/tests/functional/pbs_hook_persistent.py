@@ -0,0 +1,80 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+
+from tests.functional import *
+
+
+class TestHookPersistent(TestFunctional):
+    """
+    This test suite tests hooks opting into a persistent module namespace
+    through pbs.persistent_hook()
+    """
+    hook_body = """
+import pbs
+pbs.persistent_hook()
+
+pbs.logmsg(pbs.LOG_DEBUG, "%s setup")
+runs = [0]
+
+def main(e):
+    runs[0] += 1
+    pbs.logmsg(pbs.LOG_DEBUG, "%s run=%%d" %% runs[0])
+    e.accept()
+"""
+
+    def test_persistent_namespace(self):
+        """
+        Check that the hook script is set up once and only the handler
+        runs on the following events, until the hook is re-imported.
+        """
+        start = int(time.time())
+        hook_attr = {'enabled': 'true', 'event': 'queuejob'}
+        self.server.create_import_hook('persist', hook_attr,
+                                       self.hook_body % ('v1', 'v1'))
+        for _ in range(3):
+            self.server.submit(Job(TEST_USER))
+        self.server.log_match("v1 run=3")
+        setups = self.server.log_match("v1 setup", allmatch=True, n='ALL',
+                                       starttime=start)
+        self.assertEqual(len(setups), 1)
+
+        self.server.create_import_hook('persist', hook_attr,
+                                       self.hook_body % ('v2', 'v2'))
+        self.server.submit(Job(TEST_USER))
+        self.server.log_match("v2 setup")
+        self.server.log_match("v2 run=1")
@@ -0,0 +1,152 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+from tests.functional import *
+
+
+class TestHookProfile(TestFunctional):
+    """
+    This test suite tests the run counters of hooks and the profiling of
+    the hooks named in PBS_HOOK_PROFILE
+    """
+    hook_body = """
+import pbs
+e = pbs.event()
+if e.job.Job_Name == 'reject':
+    e.reject('rejected by profiled hook')
+st = pbs.hook_stats(e.hook_name)
+if st is not None:
+    pbs.logmsg(pbs.LOG_DEBUG, 'hook_stats invocations=%d accepts=%d' %
+               (st['invocations'], st['accepts']))
+e.accept()
+"""
+
+    def remove_profile_files(self, svc, hook_name):
+        """
+        Remove the counters, statistics and lock files of hook 'hook_name'
+        run by daemon 'svc', which the next runs of the hook would add to
+        """
+        priv = 'server_priv'
+        if svc is self.mom:
+            priv = 'mom_priv'
+        tmp_dir = os.path.join(svc.pbs_conf['PBS_HOME'], priv, 'hooks',
+                               'tmp')
+        files = [os.path.join(tmp_dir, hook_name + s)
+                 for s in ('.stats', '.prof', '.lock')]
+        self.du.rm(svc.hostname, files, sudo=True, force=True)
+
+    def setUp(self):
+        TestFunctional.setUp(self)
+        self.remove_profile_files(self.server, 'profiled')
+        self.remove_profile_files(self.mom, 'counted')
+
+    def tearDown(self):
+        self.du.unset_pbs_config(self.server.hostname,
+                                 confs=['PBS_HOOK_PROFILE'])
+        self.server.restart()
+        self.remove_profile_files(self.server, 'profiled')
+        self.remove_profile_files(self.mom, 'counted')
+        TestFunctional.tearDown(self)
+
+    def test_profile_server_hook(self):
+        """
+        Check that the runs of a profiled server hook are counted, and
+        that its profile statistics are saved
+        """
+        hook_name = 'profiled'
+        self.du.set_pbs_config(self.server.hostname,
+                               confs={'PBS_HOOK_PROFILE': hook_name})
+        self.server.restart()
+        hook_attr = {'enabled': 'true', 'event': 'queuejob'}
+        self.server.create_import_hook(hook_name, hook_attr, self.hook_body)
+
+        self.server.submit(Job(TEST_USER))
+        self.server.submit(Job(TEST_USER))
+        self.server.log_match("hook_stats invocations=1 accepts=1")
+        try:
+            self.server.submit(Job(TEST_USER, {ATTR_N: 'reject'}))
+        except PbsSubmitError:
+            pass
+
+        tmp_dir = os.path.join(self.server.pbs_conf['PBS_HOME'],
+                               'server_priv', 'hooks', 'tmp')
+        ret = self.du.cat(self.server.hostname,
+                          os.path.join(tmp_dir, hook_name + '.stats'),
+                          sudo=True)
+        self.assertEqual(ret['rc'], 0)
+        counters = dict([l.split('=', 1) for l in ret['out']])
+        self.assertEqual(counters['invocations'], '3')
+        self.assertEqual(counters['accepts'], '2')
+        self.assertEqual(counters['rejects'], '1')
+        self.assertEqual(counters['errors'], '0')
+        self.assertTrue(float(counters['max_wall_time']) > 0)
+        self.assertTrue(self.du.isfile(self.server.hostname,
+                                       os.path.join(tmp_dir,
+                                                    hook_name + '.prof'),
+                                       sudo=True))
+
+    def test_counters_mom_hook(self):
+        """
+        Check that the counters of a mom hook that is not profiled are
+        written after each of its runs, each run being a new pbs_python
+        process
+        """
+        hook_name = 'counted'
+        hook_attr = {'enabled': 'true', 'event': 'execjob_begin'}
+        self.server.create_import_hook(hook_name, hook_attr, self.hook_body)
+
+        jids = []
+        for _ in range(2):
+            j = Job(TEST_USER)
+            j.set_sleep_time(1)
+            jids.append(self.server.submit(j))
+        for jid in jids:
+            self.server.expect(JOB, 'queue', op=UNSET, id=jid, offset=1)
+
+        tmp_dir = os.path.join(self.mom.pbs_conf['PBS_HOME'], 'mom_priv',
+                               'hooks', 'tmp')
+        ret = self.du.cat(self.mom.hostname,
+                          os.path.join(tmp_dir, hook_name + '.stats'),
+                          sudo=True)
+        self.assertEqual(ret['rc'], 0)
+        counters = dict([l.split('=', 1) for l in ret['out']])
+        self.assertEqual(counters['invocations'], '2')
+        self.assertEqual(counters['accepts'], '2')
+        self.assertFalse(self.du.isfile(self.mom.hostname,
+                                        os.path.join(tmp_dir,
+                                                     hook_name + '.prof'),
+                                        sudo=True))
@@ -0,0 +1,88 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+from tests.functional import *
+
+
+class TestHookStore(TestFunctional):
+    """
+    This test suite tests the key/value store kept for hooks across hook
+    runs through pbs.cache()
+    """
+    hook_body = """
+import pbs
+c = pbs.cache("%s", max_entries=2)
+n = c.incr("count")
+c.set("short", n, ttl=1)
+pbs.logmsg(pbs.LOG_DEBUG, "%s count=%%d keys=%%d" %% (n, len(c.keys())))
+"""
+
+    def tearDown(self):
+        for (svc, priv) in ((self.server, 'server_priv'),
+                            (self.mom, 'mom_priv')):
+            path = os.path.join(svc.pbs_conf['PBS_HOME'], priv, 'hooks',
+                                'tmp', 'pbs_cache_*')
+            self.du.rm(svc.hostname, path, sudo=True, force=True,
+                       as_script=True)
+        TestFunctional.tearDown(self)
+
+    def test_server_store(self):
+        """
+        Check that values set by a server hook are seen by its next runs
+        """
+        ns = 'srv%d' % int(time.time())
+        hook_attr = {'enabled': 'true', 'event': 'queuejob'}
+        self.server.create_import_hook('store', hook_attr,
+                                       self.hook_body % (ns, ns))
+        for _ in range(3):
+            self.server.submit(Job(TEST_USER))
+        self.server.log_match("%s count=3 keys=2" % ns)
+
+    def test_mom_store(self):
+        """
+        Check that values set by a mom hook are shared with the next
+        pbs_python processes running the hook
+        """
+        ns = 'mom%d' % int(time.time())
+        hook_attr = {'enabled': 'true', 'event': 'execjob_begin'}
+        self.server.create_import_hook('store', hook_attr,
+                                       self.hook_body % (ns, ns))
+        for _ in range(2):
+            j = Job(TEST_USER)
+            j.set_sleep_time(1)
+            self.server.submit(j)
+        self.mom.log_match("%s count=2 keys=2" % ns)
@@ -0,0 +1,217 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+
+from tests.functional import *
+from ptl.lib import pbs_ifl_mock
+
+
+class TestHookStreamIter(TestFunctional):
+    """
+    This test suite tests the filtered, paged iterators returned by
+    pbs.server().jobs() and pbs.server().vnodes() when given filters.
+    """
+    hook_body = """
+import pbs
+s = pbs.server()
+e = pbs.event()
+for ps in (None, 1):
+    held = [str(j.id) for j in s.jobs(state='H', page_size=ps)]
+    queued = [str(j.id) for j in s.jobs(state='Q', queue='workq',
+                                         page_size=ps)]
+    owned = [str(j.id) for j in s.jobs(owner='%s', page_size=ps)]
+    vns = [v.name for v in s.vnodes(vnode='%s', attribs=['state'],
+                                    page_size=ps)]
+    pbs.logmsg(pbs.LOG_DEBUG, "page=%%s held=%%d queued=%%d owned=%%d "
+               "vnodes=%%s" %% (ps, len(held), len(queued), len(owned),
+                                ",".join(vns)))
+e.accept()
+"""
+
+    # Runs the iterators under pbs_python against a made up server, whose
+    # IFL calls build their replies out of the classes of pbs_ifl_mock
+    mock_ifl_script = """
+import imp
+import pbs
+import pbs.v1._svr_types as st
+
+ifl = imp.load_source('pbs_ifl_mock', '%s')
+
+jobs = [('1.svr', 'H', 'workq', 'u1', '(vn1:ncpus=1)'),
+        ('2.svr', 'H', 'workq', 'u2', '(vn2:ncpus=1)'),
+        ('3.svr', 'Q', 'workq', 'u1', '(vn1:ncpus=1)'),
+        ('4.svr', 'Q', 'other', 'u1', '(vn2:ncpus=1)'),
+        ('5.svr', 'H', 'other', 'u1', '(vn1:ncpus=1)+(vn2:ncpus=1)')]
+vnodes = [('vn1', 'free'), ('vn2', 'offline'), ('vn3', 'offline'),
+          ('vn4', 'free'), ('vn5', 'offline')]
+calls = []
+
+
+def status(objs, want):
+    head = None
+    for (name, attrs) in reversed(objs):
+        bs = ifl.batch_status()
+        bs.name = name
+        for (n, v) in reversed(attrs):
+            if want is None or n in want:
+                a = ifl.attrl()
+                a.name = n
+                a.value = v
+                a.next = bs.attribs
+                bs.attribs = a
+        bs.next = head
+        head = bs
+    return head
+
+
+def names(a):
+    if a is None:
+        return None
+    ret = []
+    while a is not None:
+        ret.append(a.name)
+        a = a.next
+    return ret
+
+
+def pbs_selstat(c, sel, rattrl, extend):
+    want = {}
+    while sel is not None:
+        assert sel.op == ifl.EQ
+        want[sel.name] = sel.value
+        sel = sel.next
+    calls.append('selstat ' + ','.join(['%%s=%%s' %% kv
+                                        for kv in sorted(want.items())]))
+    objs = []
+    for (jid, state, queue, user, ev) in jobs:
+        if state not in want.get(ifl.ATTR_state, state):
+            continue
+        if want.get(ifl.ATTR_q, queue) != queue:
+            continue
+        if want.get(ifl.ATTR_u, user) != user:
+            continue
+        objs.append((jid, [('queue', queue), ('euser', user),
+                           ('exec_vnode', ev)]))
+    return status(objs, names(rattrl))
+
+
+def pbs_statvnode(c, id, rattrl, extend):
+    calls.append('statvnode %%s' %% id)
+    objs = [(n, [(ifl.ATTR_NODE_state, s)]) for (n, s) in vnodes
+            if id in (None, n)]
+    return status(objs, names(rattrl))
+
+st.pbs_connect = lambda server: 1
+st.pbs_disconnect = lambda c: 0
+st.pbs_selstat = pbs_selstat
+st.pbs_statvnode = pbs_statvnode
+st.attrl = ifl.attrl
+st.attropl = ifl.attropl
+st.EQ = ifl.EQ
+
+
+def run(label, *args):
+    del calls[:]
+    it = st.pbs_stream_iter(*args)
+    found = []
+    most = 0
+    for o in it:
+        most = max(most, len(it._page))
+        if it.type == 'jobs':
+            found.append(str(o.id))
+        else:
+            found.append(o.name)
+    print '%%s: %%s page=%%d calls=%%s' %% (label, ','.join(found), most,
+                                          ';'.join(calls))
+
+run('held', 'jobs', ['queue'], {'state': 'H'}, 2)
+run('queued', 'jobs', ['queue'], {'state': 'Q', 'queue': 'workq'}, 2)
+run('owned', 'jobs', ['queue'], {'owner': 'u1', 'vnode': 'vn1'}, 1)
+run('offline', 'vnodes', None, {'state': 'offline'}, 2)
+run('named', 'vnodes', ['state'], {'vnode': ['vn1', 'vn3', 'vn5', 'vnX']}, 2)
+st.STREAM_ITER_MAX_VNODE_STATS = 3
+run('many', 'vnodes', ['state'], {'vnode': ['vn1', 'vn3', 'vn5', 'vnX']}, 2)
+"""
+
+    def test_filtered_jobs_and_vnodes(self):
+        """
+        Submit held and queued jobs, and check that a queuejob hook sees
+        only the matching jobs and vnodes, whatever the page size.
+        """
+        self.server.manager(MGR_CMD_SET, SERVER, {'scheduling': 'False'})
+        for _ in range(2):
+            self.server.submit(Job(TEST_USER, {ATTR_h: None}))
+        self.server.submit(Job(TEST_USER))
+
+        vn = self.mom.shortname
+        hook_body = self.hook_body % (str(TEST_USER), vn)
+        hook_attr = {'enabled': 'true', 'event': 'queuejob'}
+        self.server.create_import_hook('stream_iter', hook_attr, hook_body)
+
+        self.server.submit(Job(TEST_USER))
+        for ps in ('None', '1'):
+            self.server.log_match("page=%s held=2 queued=1 owned=3 "
+                                  "vnodes=%s" % (ps, vn))
+
+    def test_mock_ifl_paging(self):
+        """
+        Check that under pbs_python, the job filters are sent in the
+        select list, that only the named vnodes are stat'ed unless there
+        are too many of them, that the remaining filters are applied on
+        the objects returned, and that no more than a page of objects is
+        held at once.
+        """
+        mock = os.path.splitext(pbs_ifl_mock.__file__)[0] + '.py'
+        with open(mock) as f:
+            mock = self.du.create_temp_file(self.server.hostname,
+                                            suffix='.py', body=f.read())
+        fn = self.du.create_temp_file(self.server.hostname, suffix='.py',
+                                      body=self.mock_ifl_script % mock)
+        pbs_python = os.path.join(self.server.pbs_conf['PBS_EXEC'], 'bin',
+                                  'pbs_python')
+        ret = self.du.run_cmd(self.server.hostname, cmd=[pbs_python, fn],
+                              sudo=True)
+        self.assertEqual(ret['rc'], 0)
+        self.assertEqual(ret['out'], [
+            'held: 1.svr,2.svr,5.svr page=2 calls=selstat job_state=H',
+            'queued: 3.svr page=1 calls=selstat destination=workq,'
+            'job_state=Q',
+            'owned: 1.svr,3.svr,5.svr page=1 calls=selstat User_List=u1',
+            'offline: vn2,vn3,vn5 page=2 calls=statvnode None',
+            'named: vn1,vn3,vn5 page=2 calls=statvnode vn1;statvnode vn3;'
+            'statvnode vn5;statvnode vnX',
+            'many: vn1,vn3,vn5 page=2 calls=statvnode None'])
@@ -0,0 +1,140 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+
+from tests.functional import *
+
+
+class TestPmiCrayCapmc(TestFunctional):
+    """
+    This test suite tests how the Cray power module runs capmc, using a
+    stand-in capmc script that needs no Cray system
+    """
+    # Reports 10J for each nid asked, after 2 seconds, and leaves nid 7 out
+    # of any reply but to a request for it alone.
+    capmc_body = r"""#!/bin/sh
+for arg; do nids=$arg; done
+echo "$*" >> "$0.log"
+sleep 2
+echo "$nids" | awk '{
+    cnt = 0
+    n = split($0, parts, ",")
+    for (i = 1; i <= n; i++) {
+        m = split(parts[i], r, "-")
+        for (k = r[1] + 0; k <= r[m] + 0; k++)
+            nid[cnt++] = k
+    }
+    out = ""
+    sent = 0
+    for (i = 0; i < cnt; i++) {
+        if (nid[i] == 7 && cnt > 1)
+            continue
+        out = out (sent ? ", " : "") "{\"nid\": " nid[i] \
+            ", \"energy_ctr\": 10}"
+        sent++
+    }
+    printf("{\"e\": 0, \"err_msg\": \"\", \"nid_count\": %d, " \
+           "\"nodes\": [%s]}\n", sent, out)
+}'
+"""
+
+    hook_body = """
+import pbs
+import time
+import pbs.v1._pmi_cray as cray
+
+e = pbs.event()
+jid = e.job.id
+cray.capmc_cmd = lambda: "%s"
+cray.CAPMC_MAX_NIDS = 4
+cray.CAPMC_CONCURRENCY = 4
+nids = set(range(1, 8))
+start = time.time()
+out = cray.launch_nids(jid, "get_node_energy_counter", nids)
+pbs.logjobmsg(jid, "capmc launch nodes=%%d count=%%d elapsed=%%.1f" %%
+              (len(out["nodes"]), out["nid_count"], time.time() - start))
+ret = cray.node_energy(jid, nids)
+if ret is None:
+    pbs.logjobmsg(jid, "capmc energy failed")
+else:
+    pbs.logjobmsg(jid, "capmc energy nodes=%%d total=%%d" %%
+                  (len(ret["nodes"]),
+                   sum([n["energy_ctr"] for n in ret["nodes"]])))
+"""
+
+    def setUp(self):
+        TestFunctional.setUp(self)
+        self.capmc = self.du.create_temp_file(self.mom.hostname,
+                                              prefix='capmc',
+                                              body=self.capmc_body)
+        self.du.chmod(self.mom.hostname, self.capmc, mode=0755, sudo=True)
+
+    def tearDown(self):
+        self.du.rm(self.mom.hostname, self.capmc + '.log', sudo=True,
+                   force=True)
+        TestFunctional.tearDown(self)
+
+    def test_capmc_requests(self):
+        """
+        Check that the capmc requests for parts of a nid set run at once
+        and that their outputs are merged, and that node_energy() asks
+        again only for the nids missing from the first reply
+        """
+        hook_attr = {'enabled': 'true', 'event': 'execjob_begin'}
+        self.server.create_import_hook('capmc', hook_attr,
+                                       self.hook_body % self.capmc)
+        j = Job(TEST_USER)
+        j.set_sleep_time(1)
+        self.server.submit(j)
+
+        (_, line) = self.mom.log_match(
+            r"capmc launch nodes=6 count=6 elapsed=([0-9.]+)", regexp=True)
+        elapsed = float(line.rsplit('=', 1)[1])
+        # run one after the other, the two requests would take 4 seconds
+        self.assertTrue(elapsed < 3.5)
+        self.mom.log_match("capmc energy nodes=7 total=70")
+
+        ret = self.du.cat(self.mom.hostname, self.capmc + '.log', sudo=True)
+        self.assertEqual(ret['rc'], 0)
+        # the two requests of each launch may be logged in either order
+        self.assertEqual(sorted(ret['out'][:4]), [
+            'get_node_energy_counter --nids 1-4',
+            'get_node_energy_counter --nids 1-4',
+            'get_node_energy_counter --nids 5-7',
+            'get_node_energy_counter --nids 5-7'])
+        self.assertEqual(ret['out'][4:],
+                         ['get_node_energy_counter --nids 7'])
@@ -67,3 +67,109 @@ pbs.logmsg(pbs.EVENT_DEBUG, 'd=%s, e=%s, f=%s' % (d, e, f))
         self.server.submit(j)
         self.server.log_match("a=1000b, b=1000b, c=1000b")
         self.server.log_match("d=1mb, e=1mb, f=1mb")
+
+    def test_pbs_exec_vnode_chunks(self):
+        """
+        Test that pbs.exec_vnode chunks, groups and per vnode lookups
+        are returned with typed resource values
+        """
+        hook_content = ("""
+import pbs
+s = "(vnA:ncpus=1:mem=1gb)+(vnB:ncpus=2+vnC:mem=2gb)+(vnA:ncpus=3)"
+for i in range(2):
+    ev = pbs.exec_vnode(s)
+    names = ",".join([c.vnode_name for c in ev.chunks])
+    grps = "|".join([",".join([c.vnode_name for c in g]) for g in ev.groups])
+    ncpus = sum([c.chunk_resources['ncpus'] for c in ev.vnode_chunks('vnA')])
+    mem = ev.vnode_chunks('vnC')[0].chunk_resources['mem']
+    pbs.logmsg(pbs.EVENT_DEBUG, 'pass=%d names=%s groups=%s ncpus=%d mem=%s '
+               'type=%s' % (i, names, grps, ncpus, mem,
+                            type(mem).__name__))
+""")
+        hook_name = 'execvnode'
+        hook_attr = {'enabled': 'true', 'event': 'queuejob'}
+        self.server.create_import_hook(hook_name, hook_attr, hook_content)
+
+        j = Job(TEST_USER)
+        self.server.submit(j)
+        for i in range(2):
+            self.server.log_match("pass=%d names=vnA,vnB,vnC,vnA "
+                                  "groups=vnA|vnB,vnC|vnA ncpus=4 mem=2gb "
+                                  "type=size" % i)
+
+    def test_pbs_env_escape(self):
+        """
+        Test that pbs.pbs_env escapes backslashes not used to escape
+        special characters, and prints back the escaped values
+        """
+        hook_content = ("""
+import pbs
+e = pbs.pbs_env("A=x\\\\\\\\y\\\\,z,B=\\\\ab\\\\c\\\\", generic=True)
+pbs.logmsg(pbs.EVENT_DEBUG, 'A=[%s] B=[%s]' % (e['A'], e['B']))
+e['C'] = 'p\\\\q'
+pbs.logmsg(pbs.EVENT_DEBUG, 'C=[%s] len=%d' % (e['C'], len(str(e))))
+""")
+        hook_name = 'envescape'
+        hook_attr = {'enabled': 'true', 'event': 'queuejob'}
+        self.server.create_import_hook(hook_name, hook_attr, hook_content)
+
+        j = Job(TEST_USER)
+        self.server.submit(j)
+        self.server.log_match(r"A=[x\\y\,z] B=[\\ab\\c\\]")
+        self.server.log_match(r"C=[p\\q] len=28")
+
+    def test_pbs_value_cache(self):
+        """
+        Test that the value cache parses a repeated resource value once
+        and counts the other assignments as hits
+        """
+        hook_content = ("""
+import pbs
+pbs.value_cache_enable(16)
+r = pbs.event().job.Resource_List
+for i in range(10):
+    r['mem'] = '1gb'
+st = pbs.value_cache_stats()
+pbs.logmsg(pbs.EVENT_DEBUG, 'mem=%s hits=%d misses=%d size=%d' %
+           (r['mem'], st['hits'], st['misses'], st['size']))
+pbs.value_cache_disable()
+pbs.logmsg(pbs.EVENT_DEBUG, 'stats after disable=%s' % pbs.value_cache_stats())
+""")
+        hook_name = 'valuecache'
+        hook_attr = {'enabled': 'true', 'event': 'queuejob'}
+        self.server.create_import_hook(hook_name, hook_attr, hook_content)
+
+        j = Job(TEST_USER)
+        self.server.submit(j)
+        self.server.log_match("mem=1gb hits=9 misses=1 size=1")
+        self.server.log_match("stats after disable=None")
+
+    def test_pbs_select_chunks(self):
+        """
+        Test that a select is parsed into its chunks, that the chunk
+        resources are totaled, and that the chunks serialize back to
+        the select
+        """
+        hook_content = ("""
+import pbs
+sel = pbs.select("2:ncpus=1:mem=1gb+3:ncpus=2:mem=2gb")
+c = sel.chunks
+pbs.logmsg(pbs.EVENT_DEBUG, 'counts=%s ncpus=%s mem=%s' %
+           ([x.count for x in c], c[1].resources['ncpus'],
+            c[1].resources['mem']))
+pbs.logmsg(pbs.EVENT_DEBUG, 'total ncpus=%s mem=%s ngpus=%s' %
+           (sel.total('ncpus'), sel.total('mem') == pbs.size('8gb'),
+            sel.total('ngpus')))
+c[0].count = 4
+c[0].resources['ncpus'] = 3
+pbs.logmsg(pbs.EVENT_DEBUG, 'new select=%s' % pbs.select.from_chunks(c))
+""")
+        hook_name = 'selectchunks'
+        hook_attr = {'enabled': 'true', 'event': 'queuejob'}
+        self.server.create_import_hook(hook_name, hook_attr, hook_content)
+
+        j = Job(TEST_USER)
+        self.server.submit(j)
+        self.server.log_match("counts=[2, 3] ncpus=2 mem=2gb")
+        self.server.log_match("total ncpus=8 mem=True ngpus=0")
+        self.server.log_match("new select=4:ncpus=3:mem=1gb+3:ncpus=2:mem=2gb")
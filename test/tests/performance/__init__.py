@@ -35,11 +35,159 @@
 # "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
 # trademark licensing policies.
 
+import json
+
 from ptl.utils.pbs_testsuite import *
+from ptl.utils.pbs_logutils import PBSLogUtils
 
 
 class TestPerformance(PBSTestSuite):
     """
     Base test suite for Performance tests
+
+    Scheduler benchmarks run cycles with ``run_sched_cycles`` and
+    record their timings, as read from the scheduler log, with
+    ``record_cycles``. The results of all benchmarks run are written
+    as JSON at the end of the test suite.
+
+    Custom parameters:
+
+    :param perf-results: path of the JSON file to write the benchmark
+                         results to. Defaults to
+                         ``ptl_perf_results.json`` in the current
+                         directory.
+    :param perf-baseline: path of a JSON file of earlier benchmark
+                          results. Benchmarks slower than their
+                          baseline fail.
+    :param perf-tolerance: how much slower than its baseline a
+                           benchmark median may be, as a fraction.
+                           Defaults to 0.2.
     """
-    pass
+    perf_results = None
+    perf_baseline = None
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestPerformance, cls).setUpClass()
+        cls.perf_results = OrderedDict()
+        cls.perf_baseline = None
+        if 'perf-baseline' in cls.conf:
+            with open(cls.conf['perf-baseline']) as f:
+                cls.perf_baseline = json.load(f)
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.perf_results:
+            path = cls.conf.get('perf-results', 'ptl_perf_results.json')
+            results = {}
+            if os.path.isfile(path):
+                # keep the results of the other test suites
+                try:
+                    with open(path) as f:
+                        results = json.load(f)
+                except ValueError:
+                    pass
+            results.update(cls.perf_results)
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            cls.logger.info('benchmark results written to ' + path)
+        super(TestPerformance, cls).tearDownClass()
+
+    def run_sched_cycles(self, num_cycles=1, max_attempts=120):
+        """
+        Run scheduling cycles one at a time
+
+        :param num_cycles: The number of cycles to run
+        :type num_cycles: int
+        :param max_attempts: The number of attempts made to match
+                             the end of each cycle in the log
+        :type max_attempts: int
+        :returns: The cycles run, as parsed from the scheduler log
+        """
+        self.server.manager(MGR_CMD_SET, SERVER, {'scheduling': 'False'})
+        for _ in range(num_cycles):
+            # log times are in seconds, start each cycle on a new second
+            # so that the end of the previous one is not matched
+            t = int(time.time()) + 1
+            time.sleep(t - time.time())
+            self.server.manager(MGR_CMD_SET, SERVER, {'scheduling': 'True'})
+            self.server.manager(MGR_CMD_SET, SERVER, {'scheduling': 'False'})
+            self.scheduler.log_match("Leaving Scheduling Cycle", starttime=t,
+                                     max_attempts=max_attempts)
+        return self.scheduler.cycles(lastN=num_cycles)
+
+    @staticmethod
+    def cycle_stats(cycles):
+        """
+        Summary statistics of the duration of cycles
+
+        :param cycles: The cycles to summarize
+        :type cycles: list of PBSCycleInfo
+        :returns: A dictionary of the number of cycles, the minimum,
+                  median, 90th and 99th percentiles, maximum and
+                  mean durations, and the total number of jobs
+                  considered and run
+        """
+        durations = sorted([c.end - c.start for c in cycles])
+        pct = PBSLogUtils.percentile
+        stats = {'cycles': len(durations), 'durations':
+                 [c.end - c.start for c in cycles],
+                 'considered': sum([c.num_considered for c in cycles]),
+                 'run': sum([len(c.sched_job_run) for c in cycles])}
+        if durations:
+            stats.update({'min': durations[0], 'median': pct(durations, .5),
+                          'p90': pct(durations, .9),
+                          'p99': pct(durations, .99), 'max': durations[-1],
+                          'mean': float(sum(durations)) / len(durations)})
+        return stats
+
+    def record_cycles(self, name, cycles, workload=None):
+        """
+        Record the timings of cycles as the results of benchmark
+        name, and fail if they regressed from the baseline
+
+        :param name: The name of the benchmark
+        :type name: str
+        :param cycles: The cycles run by the benchmark
+        :type cycles: list of PBSCycleInfo
+        :param workload: Description of the workload of the benchmark
+        :type workload: dict or None
+        :returns: The results recorded
+        """
+        self.assertTrue(cycles, 'no scheduling cycle found for ' + name)
+        result = self.cycle_stats(cycles)
+        if workload is not None:
+            result['workload'] = workload
+        self.perf_results[name] = result
+        self.logger.info('%s: %d cycles, median=%ss p90=%ss max=%ss' %
+                         (name, result['cycles'], result['median'],
+                          result['p90'], result['max']))
+        regression = self.compare_to_baseline(name, result)
+        self.assertIsNone(regression, regression)
+        return result
+
+    def compare_to_baseline(self, name, result):
+        """
+        Compare the median cycle duration of benchmark name to its
+        baseline, if any
+
+        Durations are read from the log with a resolution of one
+        second, a benchmark is only reported as slower than its
+        baseline when its median is also at least a second longer.
+
+        :returns: A message telling the regression, None if there is
+                  none or no baseline for the benchmark
+        """
+        if not self.perf_baseline or name not in self.perf_baseline:
+            return None
+        tolerance = float(self.conf.get('perf-tolerance', 0.2))
+        base = self.perf_baseline[name].get('median')
+        if base is None or 'median' not in result:
+            return None
+        cur = result['median']
+        if cur > base * (1 + tolerance) and cur - base >= 1:
+            return ('%s: median cycle time %ss, baseline %ss (+%d%%)' %
+                    (name, cur, base, (cur - base) * 100 / max(base, 1)))
+        self.logger.info('%s: median cycle time %ss, baseline %ss' %
+                         (name, cur, base))
+        return None
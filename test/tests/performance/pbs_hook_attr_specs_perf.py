@@ -0,0 +1,170 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+import re
+
+from tests.performance import *
+
+
+class TestHookAttrSpecsPerf(TestPerformance):
+    """
+    Measure the time taken by the pbs.v1 import to set up the job, server,
+    queue, resv and vnode classes from the generated attribute specs, and
+    compare it with the setup of the classes by C alone
+    """
+    # Runs 'pbs_python <script>' a number of times and prints the median
+    # wall time of a run
+    timing_script = """
+import subprocess
+import time
+secs = []
+for _ in range(%d):
+    start = time.time()
+    subprocess.call(['%s', '%s'])
+    secs.append(time.time() - start)
+secs.sort()
+print '%%f' %% secs[len(secs) // 2]
+"""
+
+    def setUp(self):
+        TestPerformance.setUp(self)
+        self.specs = os.path.join(self.server.pbs_conf['PBS_EXEC'], 'lib',
+                                  'python', 'altair', 'pbs', 'v1',
+                                  '_attr_specs')
+        self.moved = []
+
+    def tearDown(self):
+        self.restore_specs()
+        TestPerformance.tearDown(self)
+
+    def move_specs(self):
+        """
+        Move the installed attribute specs module aside, so that the
+        classes are set up by C alone
+        """
+        for path in (self.specs + '.py', self.specs + '.pyc'):
+            if self.du.isfile(self.server.hostname, path, sudo=True):
+                self.du.run_cmd(self.server.hostname,
+                                cmd=['mv', path, path + '.save'], sudo=True)
+                self.moved.append(path)
+
+    def restore_specs(self):
+        """
+        Put back the attribute specs module moved by move_specs()
+        """
+        for path in self.moved:
+            self.du.run_cmd(self.server.hostname,
+                            cmd=['mv', path + '.save', path], sudo=True)
+        self.moved = []
+
+    def pbs_python_run_time(self, runs):
+        """
+        Return the median wall time in seconds of 'runs' pbs_python
+        processes importing pbs
+        """
+        pbs_python = os.path.join(self.server.pbs_conf['PBS_EXEC'], 'bin',
+                                  'pbs_python')
+        fn = self.du.create_temp_file(self.server.hostname, suffix='.py',
+                                      body='import pbs\n')
+        timer = self.du.create_temp_file(self.server.hostname,
+                                         suffix='.py',
+                                         body=self.timing_script %
+                                         (runs, pbs_python, fn))
+        ret = self.du.run_cmd(self.server.hostname, cmd=[pbs_python, timer],
+                              sudo=True)
+        self.assertEqual(ret['rc'], 0)
+        return float(ret['out'][-1])
+
+    @timeout(600)
+    def test_attr_specs_load_time(self):
+        """
+        Run a MoM hook, started in a new pbs_python process each time, for
+        a number of jobs and report the class setup time at import
+        """
+        hook_body = """
+import pbs
+import sys
+m = sys.modules.get('pbs.v1._export_types')
+secs = getattr(m, 'ATTR_SPECS_LOAD_SECS', None)
+if secs is None:
+    pbs.logmsg(pbs.EVENT_DEBUG, 'attr specs load: none')
+else:
+    pbs.logmsg(pbs.EVENT_DEBUG, 'attr specs load: %f' % secs)
+"""
+        a = {'event': 'execjob_begin', 'enabled': 'True'}
+        self.server.create_import_hook('attrspecs', a, hook_body)
+
+        num_jobs = 20
+        start = int(time.time())
+        for _ in range(num_jobs):
+            j = Job(TEST_USER)
+            j.set_sleep_time(1)
+            self.server.submit(j)
+        lines = self.mom.log_match('attr specs load: ', allmatch=True,
+                                   starttime=start, max_attempts=120,
+                                   interval=1)
+        secs = []
+        for (_, line) in lines:
+            m = re.search(r'attr specs load: ([\d.]+)', line)
+            if m:
+                secs.append(float(m.group(1)))
+        if not secs:
+            self.skipTest('pbs.v1 was built without attribute specs')
+        secs.sort()
+        self.logger.info('attribute specs setup over %d hook runs: '
+                         'median %.6fs, max %.6fs' %
+                         (len(secs), secs[len(secs) // 2], secs[-1]))
+
+    @timeout(600)
+    def test_attr_specs_vs_c_setup(self):
+        """
+        Compare the wall time of pbs_python processes importing pbs when
+        the classes are set up from the attribute specs, and when they
+        are set up by C alone as before the specs
+        """
+        if not self.du.isfile(self.server.hostname, self.specs + '.py',
+                              sudo=True):
+            self.skipTest('pbs.v1 was built without attribute specs')
+        runs = 50
+        with_specs = self.pbs_python_run_time(runs)
+        self.move_specs()
+        c_only = self.pbs_python_run_time(runs)
+        self.restore_specs()
+        self.logger.info('pbs_python run over %d runs: median %.6fs with '
+                         'attribute specs, %.6fs with C setup alone, '
+                         'difference %.6fs' %
+                         (runs, with_specs, c_only, c_only - with_specs))
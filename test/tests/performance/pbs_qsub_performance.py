@@ -57,18 +57,16 @@ class TestQsubPerformance(TestPerformance):
         """
 
         start_time1 = time.time()
-        for _ in range(1000):
-            j = Job(TEST_USER)
-            self.server.submit(j)
+        self.server.submit_many([Job(TEST_USER) for _ in range(1000)])
         end_time1 = time.time()
+        stats1 = self.server.last_submit_stats
 
         os.environ['VARIABLE'] = 'b' * 130000
 
         start_time2 = time.time()
-        for _ in range(1000):
-            j1 = Job(TEST_USER)
-            self.server.submit(j1)
+        self.server.submit_many([Job(TEST_USER) for _ in range(1000)])
         end_time2 = time.time()
+        stats2 = self.server.last_submit_stats
 
         sub_time1 = int(end_time1 - start_time1)
         sub_time2 = int(end_time2 - start_time2)
@@ -76,3 +74,6 @@ class TestQsubPerformance(TestPerformance):
         self.logger.info(
             "Submission time without env is %d and with env is %d sec"
             % (sub_time1, sub_time2))
+        self.logger.info(
+            "Median submit latency without env is %.4f and with env is "
+            "%.4f sec" % (stats1['p50'], stats2['p50']))
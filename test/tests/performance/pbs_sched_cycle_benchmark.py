@@ -0,0 +1,124 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+
+from tests.performance import *
+
+
+class TestSchedCycleBenchmark(TestPerformance):
+    """
+    Benchmark scheduling cycles over workloads of a number of vnodes,
+    a number of jobs and a select shape. The timings of each
+    workload are recorded as benchmark ``<shape>_<nodes>n_<jobs>j``.
+
+    Custom parameters:
+
+    :param bench-nodes: colon-separated numbers of vnodes to benchmark.
+                        Defaults to 100:1000.
+    :param bench-jobs: colon-separated numbers of jobs to benchmark.
+                       Defaults to 100:1000.
+    :param bench-cycles: number of cycles run per workload. Defaults
+                         to 5.
+    """
+
+    def setUp(self):
+        TestPerformance.setUp(self)
+        self.num_nodes = self.get_counts('bench-nodes', [100, 1000])
+        self.num_jobs = self.get_counts('bench-jobs', [100, 1000])
+        self.num_cycles = int(self.conf.get('bench-cycles', 5))
+
+    def get_counts(self, param, default):
+        """
+        Numbers given as colon-separated parameter param
+        """
+        if param not in self.conf:
+            return default
+        return [int(n) for n in self.conf[param].split(':')]
+
+    def run_workloads(self, shape, attrs):
+        """
+        Run the cycles of every workload of the given select shape
+        and record their timings
+
+        The first cycle of a workload runs the jobs that fit, the
+        next ones consider the remaining jobs on a busy complex.
+        """
+        a = {'resources_available.ncpus': 8,
+             'resources_available.mem': '16gb'}
+        for nodes in self.num_nodes:
+            self.server.create_vnodes('vnode', a, nodes, self.mom,
+                                      sharednode=False)
+            for jobs in self.num_jobs:
+                self.server.manager(MGR_CMD_SET, SERVER,
+                                    {'scheduling': 'False'})
+                self.server.cleanup_jobs()
+                js = []
+                for _ in range(jobs):
+                    j = Job(TEST_USER, attrs=attrs)
+                    j.set_sleep_time(3600)
+                    js.append(j)
+                self.server.submit_many(js)
+                cycles = self.run_sched_cycles(self.num_cycles)
+                workload = {'nodes': nodes, 'jobs': jobs, 'shape': shape}
+                workload.update(attrs)
+                self.record_cycles('%s_%dn_%dj' % (shape, nodes, jobs),
+                                   cycles, workload)
+        self.server.cleanup_jobs()
+
+    @timeout(3600)
+    def test_single_chunk(self):
+        """
+        Benchmark cycles of single chunk, single cpu jobs
+        """
+        self.run_workloads('single', {'Resource_List.select': '1:ncpus=1'})
+
+    @timeout(3600)
+    def test_multi_chunk(self):
+        """
+        Benchmark cycles of jobs with several chunks, scattered
+        """
+        self.run_workloads('scatter',
+                           {'Resource_List.select': '4:ncpus=2:mem=1gb',
+                            'Resource_List.place': 'scatter'})
+
+    @timeout(3600)
+    def test_exclusive(self):
+        """
+        Benchmark cycles of jobs placed on exclusive vnodes
+        """
+        self.run_workloads('excl', {'Resource_List.select': '2:ncpus=4',
+                                    'Resource_List.place': 'scatter:excl'})
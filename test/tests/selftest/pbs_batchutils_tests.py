@@ -0,0 +1,88 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+
+from tests.selftest import *
+
+
+class TestBatchUtils(TestSelf):
+    """
+    Tests to test BatchUtils
+    """
+
+    qstat_out = ['Job Id: 1.svr',
+                 '    Job_Name = STDIN',
+                 '    job_state = Q',
+                 '    Variable_List = PBS_O_HOME=/home/u,PBS_O_LANG=C,',
+                 '\tPBS_O_PATH=/bin',
+                 '    comment = a',
+                 '    comment = b',
+                 '',
+                 'Job Id: 2.svr',
+                 '    Job_Name = long',
+                 '    job_state = R',
+                 '']
+
+    def test_convert_to_dictlist(self):
+        """
+        Test parsing of qstat -f style output, merging of continuation
+        lines and repeated attributes
+        """
+        bu = BatchUtils()
+        dl = bu.convert_to_dictlist(self.qstat_out)
+        self.assertEqual(len(dl), 2)
+        self.assertEqual(dl[0]['id'], '1.svr')
+        self.assertEqual(dl[0]['Variable_List'],
+                         'PBS_O_HOME=/home/u,PBS_O_LANG=C,PBS_O_PATH=/bin')
+        self.assertEqual(dl[0]['comment'], 'a,b')
+        self.assertEqual(dl[1], {'id': '2.svr', 'Job_Name': 'long',
+                                 'job_state': 'R'})
+
+    def test_iter_dictlist_filters(self):
+        """
+        Test that iter_dictlist yields the objects one at a time and
+        keeps only the requested attributes and object
+        """
+        bu = BatchUtils()
+        it = bu.iter_dictlist(iter(self.qstat_out), attribs=['job_state'])
+        self.assertEqual(it.next(), {'id': '1.svr', 'job_state': 'Q'})
+        self.assertEqual(it.next(), {'id': '2.svr', 'job_state': 'R'})
+        self.assertRaises(StopIteration, it.next)
+        dl = bu.convert_to_dictlist(self.qstat_out, id='2.svr')
+        self.assertEqual([d['id'] for d in dl], ['2.svr'])
+        self.assertEqual(bu.convert_to_dictlist(self.qstat_out,
+                                                attribs=['nosuch']), [])
@@ -0,0 +1,77 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+
+from tests.selftest import *
+from ptl.utils.pbs_logutils import PBSLogUtils
+
+
+class TestConvertDateTime(TestSelf):
+    """
+    Tests to test the conversion of log record times
+    """
+
+    fmt = "%m/%d/%Y %H:%M:%S"
+
+    def convert(self, datetime):
+        try:
+            return int(time.mktime(time.strptime(datetime, self.fmt)))
+        except ValueError:
+            return None
+
+    def test_same_as_strptime(self):
+        """
+        Test that log record times over a year, including the days
+        of daylight saving time changes, convert as with strptime and
+        mktime
+        """
+        start = int(time.time()) - 366 * 86400
+        for t in range(start, start + 366 * 86400, 599):
+            d = time.strftime(self.fmt, time.localtime(t))
+            self.assertEqual(PBSLogUtils.convert_date_time(d),
+                             self.convert(d), d)
+
+    def test_invalid(self):
+        """
+        Test that invalid or non padded times convert as with
+        strptime and mktime
+        """
+        for d in ['02/30/2020 10:00:00', '13/01/2020 00:00:00',
+                  '01/02/2020 24:00:00', '12/31/2020 23:59:60',
+                  '1/02/2020 10:00:00', '01/02/2020 10:00:0a']:
+            self.assertEqual(PBSLogUtils.convert_date_time(d),
+                             self.convert(d), d)
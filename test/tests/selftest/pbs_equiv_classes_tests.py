@@ -0,0 +1,83 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+
+from tests.selftest import *
+
+
+class TestEquivClasses(TestSelf):
+    """
+    Tests to test Server().equivalence_classes() and whats_available()
+    """
+
+    def test_equivalence_classes(self):
+        """
+        Test that objects with the same available resources share a
+        class, in the order the classes are first seen
+        """
+        bsl = []
+        for i in range(6):
+            bsl.append({'id': 'vn%d' % i,
+                        'resources_available.ncpus': '4',
+                        'resources_assigned.ncpus': str(i % 2),
+                        'state': 'free'})
+        bsl.append(dict(bsl[0]))
+        attrib = ['resources_available.ncpus', 'state']
+        eq = self.server.equivalence_classes(VNODE, attrib, bslist=bsl)
+        classes = dict((e.name, e.entities) for e in eq)
+        self.assertEqual(classes[('ncpus=4', 'state=free')],
+                         ['vn0', 'vn2', 'vn4'])
+        self.assertEqual(classes[('ncpus=3', 'state=free')],
+                         ['vn1', 'vn3', 'vn5'])
+        eq = self.server.equivalence_classes(VNODE, attrib, bslist=bsl,
+                                             op=None)
+        self.assertEqual(len(eq), 1)
+        self.assertEqual(len(eq[0].entities), 6)
+
+    def test_whats_available(self):
+        """
+        Test that free nodes are reported available forever without
+        changing the nodes' resources
+        """
+        a = {'resources_available.ncpus': 2}
+        self.server.create_vnodes('vn', a, 4, self.mom)
+        attrib = ['resources_available.ncpus', 'state']
+        wa = self.server.whats_available(attrib)
+        self.assertEqual(attrib, ['resources_available.ncpus', 'state'])
+        self.assertIn('infinity', wa)
+        ncpus = [e.attributes['ncpus'] for e in wa['infinity']]
+        self.assertIn(2, ncpus)
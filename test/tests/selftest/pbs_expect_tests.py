@@ -0,0 +1,111 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+from tests.selftest import *
+
+
+class TestExpect(TestSelf):
+    """
+    Tests to test Server().expect()
+    """
+
+    def test_expect_reports_attempts(self):
+        """
+        Test that a met expectation reports its attempts and wait time
+        """
+        j = Job(TEST_USER)
+        jid = self.server.submit(j)
+        self.server.expect(JOB, {'job_state': 'R'}, id=jid)
+        self.assertTrue(self.server.last_expect['attempts'] >= 1)
+        self.assertTrue(self.server.last_expect['elapsed'] >= 0)
+
+    def test_expect_deadline(self):
+        """
+        Test that an unmet expectation gives up once max_attempts times
+        interval seconds have passed, polling more often at first
+        """
+        start = time.time()
+        self.assertRaises(PtlExpectError, self.server.expect, SERVER,
+                          {ATTR_comment: 'never set'}, max_attempts=4,
+                          interval=0.5)
+        elapsed = time.time() - start
+        self.assertTrue(elapsed >= 2)
+        self.assertTrue(elapsed < 10)
+        self.assertTrue(self.server.last_expect['attempts'] > 4)
+
+    def test_expect_interval_caps_wait(self):
+        """
+        Test that the wait between polls never grows past the interval
+        given to expect
+        """
+        self.assertRaises(PtlExpectError, self.server.expect, SERVER,
+                          {ATTR_comment: 'never set'}, max_attempts=10,
+                          interval=0.2)
+        # 0.05s, then 0.1s, then 0.2s between polls over 2s
+        self.assertTrue(self.server.last_expect['attempts'] >= 9)
+
+    def test_expect_all(self):
+        """
+        Test that expect_all checks many objects at once and reports
+        the conditions left unmet
+        """
+        a = {'resources_available.ncpus': 2}
+        self.server.create_vnodes('vn', a, 20, self.mom)
+        conds = [(VNODE, 'vn[%d]' % i, {'state': 'free'}) for i in range(20)]
+        self.assertTrue(self.server.expect_all(conds))
+        conds.append((VNODE, 'vn[1]', {'resources_available.ncpus': 3}))
+        self.assertRaises(PtlExpectError, self.server.expect_all, conds,
+                          max_attempts=2)
+        unmet = self.server.last_expect['unmet']
+        self.assertEqual(len(unmet), 1)
+        self.assertIn('vn[1]', unmet[0])
+
+    def test_expect_all_short_id(self):
+        """
+        Test that expect_all checks jobs given by a short id, which
+        the status of all jobs does not list, rather than taking them
+        as gone
+        """
+        self.server.manager(MGR_CMD_SET, SERVER, {'scheduling': 'False'})
+        jid = self.server.submit(Job(TEST_USER))
+        short = jid.split('.')[0]
+        self.assertTrue(self.server.expect_all(
+            [(JOB, short, {'job_state': 'Q'})]))
+        self.assertRaises(PtlExpectError, self.server.expect_all,
+                          [(JOB, short, 'job_state')], op=UNSET,
+                          max_attempts=2)
+        self.server.deljob(jid, wait=True)
@@ -0,0 +1,89 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+
+from tests.selftest import *
+
+
+class TestIFLConnectionPool(TestSelf):
+    """
+    Tests to test the IFL connection pool used by Server API calls
+    """
+
+    def setUp(self):
+        TestSelf.setUp(self)
+        if self.server.get_op_mode() != PTL_API:
+            self.skipTest('IFL connection pool is only used in API mode')
+        self.server.set_connect_timeout(60)
+
+    def test_connection_reused(self):
+        """
+        Test that consecutive API calls reuse one pooled connection
+        """
+        self.server.status(SERVER)
+        reuses = IFLConnectionPool.stats['reuses']
+        connects = IFLConnectionPool.stats['connects']
+        for _ in range(5):
+            self.server.status(SERVER)
+        self.assertEqual(IFLConnectionPool.stats['connects'], connects)
+        self.assertEqual(IFLConnectionPool.stats['reuses'], reuses + 5)
+
+    def test_drain_on_restart(self):
+        """
+        Test that restarting the server drains the pool and that API
+        calls keep working on fresh connections
+        """
+        self.server.status(SERVER)
+        self.server.restart()
+        key = IFLConnectionPool._key(self.server.hostname)
+        self.assertFalse(IFLConnectionPool.idle.get(key))
+        connects = IFLConnectionPool.stats['connects']
+        self.server.status(SERVER)
+        self.assertEqual(IFLConnectionPool.stats['connects'], connects + 1)
+
+    def test_failed_call_checks_connection(self):
+        """
+        Test that a connection whose last call failed is checked with
+        a server status before it is reused
+        """
+        self.assertRaises(PbsStatusError, self.server.status, JOB,
+                          id='999999999', logerr=False)
+        checks = IFLConnectionPool.stats['checks']
+        reuses = IFLConnectionPool.stats['reuses']
+        self.server.status(SERVER)
+        self.assertEqual(IFLConnectionPool.stats['checks'], checks + 1)
+        self.assertEqual(IFLConnectionPool.stats['reuses'], reuses + 1)
@@ -0,0 +1,87 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+
+from tests.selftest import *
+from ptl.utils.pbs_logutils import PBSLogFollower
+
+
+class TestLogFollower(TestSelf):
+    """
+    Tests to test following log files
+    """
+
+    def setUp(self):
+        TestSelf.setUp(self)
+        (fd, self.fn) = tempfile.mkstemp(prefix='PtlPbsLogFollower')
+        os.close(fd)
+
+    def tearDown(self):
+        for f in (self.fn, self.fn + '.old'):
+            if os.path.isfile(f):
+                os.remove(f)
+        TestSelf.tearDown(self)
+
+    def write(self, data, mode='a'):
+        with open(self.fn, mode) as f:
+            f.write(data)
+
+    def test_appended_lines(self):
+        """
+        Test that only complete lines are returned and that the
+        lines appended are read from the last offset
+        """
+        self.write('line 1\nline 2\npart')
+        follower = PBSLogFollower.get(self.server.hostname, self.fn)
+        self.assertEqual(follower.update(), ['line 1', 'line 2'])
+        offset = follower.offset
+        self.write('ial\nline 4\n')
+        self.assertEqual(follower.update(),
+                         ['line 1', 'line 2', 'partial', 'line 4'])
+        self.assertEqual(follower.offset, offset + len('ial\nline 4\n'))
+
+    def test_rotation(self):
+        """
+        Test that a log file replaced by a new one is read from its
+        start
+        """
+        self.write('old 1\nold 2\n')
+        follower = PBSLogFollower.get(self.server.hostname, self.fn)
+        self.assertEqual(follower.update(), ['old 1', 'old 2'])
+        os.rename(self.fn, self.fn + '.old')
+        self.write('new 1\n', 'w')
+        self.assertEqual(follower.update(), ['new 1'])
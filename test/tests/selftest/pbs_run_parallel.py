@@ -0,0 +1,76 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+
+from tests.selftest import *
+
+
+class TestRunParallel(TestSelf):
+    """
+    Tests to test running setup steps in parallel across hosts
+    """
+
+    def test_results_and_errors(self):
+        """
+        Test that results are returned in order of the items and that
+        errors and timeouts are reported per item
+        """
+        def func(x):
+            time.sleep(x)
+            if x == 0.2:
+                raise PtlException(msg='failed on %s' % x)
+            return x * 2
+
+        start = time.time()
+        (results, errors) = self.run_parallel(func, [0.5, 0.2, 0.1, 10],
+                                              names=['a', 'b', 'c', 'd'],
+                                              max_parallel=2, timeout=3)
+        self.assertLess(time.time() - start, 6)
+        self.assertEqual(results[0], 1)
+        self.assertEqual(results[2], 0.2)
+        self.assertEqual([n for (n, _) in errors], ['b', 'd'])
+        self.assertIsInstance(errors[0][1], PtlException)
+        self.assertIn('timed out', errors[1][1])
+
+    def test_revert_moms(self):
+        """
+        Test that reverting the MoMs leaves their nodes free
+        """
+        self.revert_moms(force=True)
+        for mom in self.moms.values():
+            self.server.expect(NODE, {ATTR_NODE_state: 'free'},
+                               id=mom.shortname, max_attempts=1)
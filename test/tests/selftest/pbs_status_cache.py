@@ -0,0 +1,78 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+
+from tests.selftest import *
+
+
+class TestStatusCache(TestSelf):
+    """
+    Tests to test the Server status cache
+    """
+
+    def tearDown(self):
+        self.server.disable_status_cache()
+        TestSelf.tearDown(self)
+
+    def test_cache_hit_and_invalidation(self):
+        """
+        Test that repeated status calls are served from the cache
+        until a call changes the state of PBS
+        """
+        self.server.manager(MGR_CMD_SET, SERVER, {'scheduling': 'False'})
+        self.server.enable_status_cache()
+        j = Job(TEST_USER)
+        jid = self.server.submit(j)
+        self.server.status(JOB, id=jid)
+        self.server.status(JOB, id=jid)
+        self.assertEqual(self.server.status_cache_stats['hits'], 1)
+        self.server.alterjob(jid, {ATTR_N: 'renamed'})
+        st = self.server.status(JOB, id=jid)
+        self.assertEqual(st[0][ATTR_N], 'renamed')
+        self.assertEqual(self.server.status_cache_stats['hits'], 1)
+
+    def test_cache_max_age(self):
+        """
+        Test that snapshots older than max_age are not served
+        """
+        self.server.enable_status_cache(max_age=1)
+        self.server.status(SERVER)
+        time.sleep(1.5)
+        self.server.status(SERVER)
+        self.server.status(SERVER, max_age=0)
+        self.assertEqual(self.server.status_cache_stats['hits'], 0)
+        self.assertEqual(self.server.status_cache_stats['misses'], 3)
@@ -0,0 +1,91 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+
+from tests.selftest import *
+
+
+class TestStatusIndex(TestSelf):
+    """
+    Tests to test counter and filter over a StatusIndex
+    """
+
+    def setUp(self):
+        TestSelf.setUp(self)
+        self.bsl = [
+            {'id': '1.s', 'job_state': 'R', 'queue': 'workq',
+             'Resource_List.ncpus': '4', 'Resource_List.mem': '2gb'},
+            {'id': '2.s', 'job_state': 'Q', 'queue': 'workq',
+             'Resource_List.ncpus': '1', 'Resource_List.mem': '512mb'},
+            {'id': '3.s', 'job_state': 'Q', 'queue': 'other',
+             'Resource_List.ncpus': '16'},
+            {'id': '4.s', 'job_state': 'H', 'queue': 'other'}]
+        self.index = StatusIndex(self.bsl)
+
+    def test_grouped_counter(self):
+        """
+        Test that grouping by attributes counts the same on a list
+        and on its index
+        """
+        for bsl in (self.bsl, self.index):
+            d = self.server.counter(JOB, ['job_state', 'queue'], bslist=bsl)
+            self.assertEqual(d, {'job_state=R': 1, 'job_state=Q': 2,
+                                 'job_state=H': 1, 'queue=workq': 2,
+                                 'queue=other': 2})
+
+    def test_ranged_ops(self):
+        """
+        Test that ranged operators match numeric and size values
+        """
+        d = self.server.filter(JOB, {'Resource_List.ncpus': (GT, 1)},
+                               bslist=self.index)
+        self.assertEqual(d, {'Resource_List.ncpus>1': ['1.s', '3.s']})
+        d = self.server.filter(JOB, {'Resource_List.mem': (LT, '1gb')},
+                               bslist=self.index)
+        self.assertEqual(d, {'Resource_List.mem<1048576': ['2.s']})
+        d = self.server.counter(JOB, {'Resource_List.ncpus': (LE, 4),
+                                      'queue': 'workq'},
+                                attrop=PTL_AND, bslist=self.index)
+        self.assertEqual(d, {'Resource_List.ncpus<=4': 2, 'queue=workq': 2})
+
+    def test_mismatch_counts_zero(self):
+        """
+        Test that an attribute set on objects that do not match
+        is reported with a count of 0
+        """
+        d = self.server.counter(JOB, {'job_state': 'E'}, bslist=self.index)
+        self.assertEqual(d, {'job_state=E': 0})
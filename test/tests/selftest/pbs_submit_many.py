@@ -0,0 +1,82 @@
+# coding: utf-8
+
+# Copyright (C) 1994-2018 Altair Engineering, Inc.
+# For more information, contact Altair at www.altair.com.
+#
+# This file is part of the PBS Professional ("PBS Pro") software.
+#
+# Open Source License Information:
+#
+# PBS Pro is free software. You can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# PBS Pro is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Commercial License Information:
+#
+# For a copy of the commercial license terms and conditions,
+# go to: (http://www.pbspro.com/UserArea/agreement.html)
+# or contact the Altair Legal Department.
+#
+# Altair’s dual-license business model allows companies, individuals, and
+# organizations to create proprietary derivative works of PBS Pro and
+# distribute them - whether embedded or bundled with other software -
+# under a commercial license agreement.
+#
+# Use of Altair’s trademarks, including but not limited to "PBS™",
+# "PBS Professional®", and "PBS Pro™" and Altair’s logos is subject to Altair's
+# trademark licensing policies.
+
+
+from tests.selftest import *
+
+
+class TestSubmitMany(TestSelf):
+    """
+    Tests to test Server().submit_many()
+    """
+
+    def test_submit_many_order(self):
+        """
+        Test that concurrent submissions return job ids in the order
+        of the jobs and report their latencies
+        """
+        self.server.manager(MGR_CMD_SET, SERVER, {'scheduling': 'False'})
+        jobs = []
+        for i in range(20):
+            jobs.append(Job(TEST_USER, attrs={ATTR_N: 'many%d' % i}))
+        jids = self.server.submit_many(jobs, concurrency=4)
+        self.assertEqual(len(jids), 20)
+        for i, jid in enumerate(jids):
+            self.server.expect(JOB, {ATTR_N: 'many%d' % i}, id=jid)
+        stats = self.server.last_submit_stats
+        self.assertEqual(stats['count'], 20)
+        self.assertTrue(stats['min'] <= stats['p50'] <= stats['max'])
+
+    def test_submit_many_shared_script(self):
+        """
+        Test that jobs with identical script bodies share one script
+        file and keep separate output files
+        """
+        self.server.manager(MGR_CMD_SET, SERVER, {'scheduling': 'False'})
+        jobs = []
+        for _ in range(3):
+            j = Job(TEST_USER)
+            j.script_body = '#!/bin/sh\nsleep 100\n'
+            jobs.append(j)
+        jids = self.server.submit_many(jobs, concurrency=3)
+        self.assertEqual(len(set(j.script for j in jobs)), 1)
+        self.assertEqual(len(set(jids)), 3)
+        paths = set()
+        for jid in jids:
+            st = self.server.status(JOB, ATTR_o, id=jid)
+            paths.add(st[0][ATTR_o])
+        self.assertEqual(len(paths), 3)